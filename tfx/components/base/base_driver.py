@@ -238,7 +238,8 @@ class BaseDriver(object):
         exec_properties=exec_properties,
         pipeline_info=pipeline_info,
         component_info=component_info,
-        run_context_id=run_context_id)
+        run_context_id=run_context_id,
+        input_artifacts=input_artifacts)
     tf.logging.info('Execution id of the upcoming component execution is %s',
                     execution_id)
     output_artifacts = {}
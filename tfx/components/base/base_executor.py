@@ -26,6 +26,7 @@ from typing import Any, Dict, List, Optional, Text
 from tfx import types
 from tfx.types import artifact_utils
 from tfx.utils import dependency_utils
+from tfx.utils import result_cache
 
 
 class BaseExecutor(with_metaclass(abc.ABCMeta, object)):
@@ -36,12 +37,15 @@ class BaseExecutor(with_metaclass(abc.ABCMeta, object)):
 
     def __init__(self, beam_pipeline_args: Optional[List[Text]] = None,
                  tmp_dir: Optional[Text] = None,
-                 unique_id: Optional[Text] = None):
+                 unique_id: Optional[Text] = None,
+                 cache_dir: Optional[Text] = None):
       self.beam_pipeline_args = beam_pipeline_args
       # Base temp directory for the pipeline
       self._tmp_dir = tmp_dir
       # A unique id to distinguish every execution run
       self._unique_id = unique_id
+      # Directory of the result cache for the pipeline
+      self.cache_dir = cache_dir
 
     def get_tmp_path(self) -> Text:
       if not self._tmp_dir or not self._unique_id:
@@ -96,6 +100,16 @@ class BaseExecutor(with_metaclass(abc.ABCMeta, object)):
       tf.io.gfile.makedirs(tmp_path)
     return tmp_path
 
+  def _get_result_cache(self) -> Optional[result_cache.ResultCache]:
+    """Gets the result cache of the pipeline, None if not available.
+
+    Executors whose outputs are a pure function of the content of their inputs
+    and their execution properties can restore outputs from the cache.
+    """
+    if not self._context or not self._context.cache_dir:
+      return None
+    return result_cache.ResultCache(self._context.cache_dir)
+
   def _log_startup(self, inputs: Dict[Text, List[types.Artifact]],
                    outputs: Dict[Text, List[types.Artifact]],
                    exec_properties: Dict[Text, Any]) -> None:
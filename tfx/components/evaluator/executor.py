@@ -103,10 +103,15 @@ class Executor(base_executor.BaseExecutor):
     tf.logging.info('Evaluating model.')
     with beam.Pipeline(argv=self._get_beam_pipeline_args()) as pipeline:
       # pylint: disable=expression-not-assigned
-      (pipeline
-       | 'ReadData' >> beam.io.ReadFromTFRecord(
-           file_pattern=io_utils.all_files_pattern(
-               artifact_utils.get_split_uri(input_dict['examples'], 'eval')))
+      # The eval split has an examples artifact for each span if a range of
+      # spans is generated, see example_gen_pb2.RangeConfig.
+      ([
+          pipeline | 'ReadData[{}]'.format(index) >> beam.io.ReadFromTFRecord(
+              file_pattern=io_utils.all_files_pattern(uri))
+          for index, uri in enumerate(
+              artifact_utils.get_split_uris(input_dict['examples'], 'eval'))
+      ]
+       | 'FlattenData' >> beam.Flatten()
        |
        'ExtractEvaluateAndWriteResults' >> tfma.ExtractEvaluateAndWriteResults(
            eval_shared_model=eval_shared_model,
@@ -21,10 +21,11 @@ import abc
 import bisect
 import hashlib
 import os
+import struct
 import apache_beam as beam
 from six import with_metaclass
 import tensorflow as tf
-from typing import Any, Dict, List, Text
+from typing import Any, Dict, List, Optional, Text, Tuple, Union
 from tfx import types
 from tfx.components.base import base_executor
 from tfx.components.example_gen import utils
@@ -35,11 +36,76 @@ from google.protobuf import json_format
 # Default file name for TFRecord output file prefix.
 DEFAULT_FILE_NAME = 'data_tfrecord'
 
+# Beam compression type and file name suffix of each output compression.
+_COMPRESSIONS = {
+    example_gen_pb2.Output.GZIP:
+        (beam.io.filesystem.CompressionTypes.GZIP, '.gz'),
+    example_gen_pb2.Output.UNCOMPRESSED:
+        (beam.io.filesystem.CompressionTypes.UNCOMPRESSED, ''),
+    # Beam's DEFLATE writes zlib format streams, i.e. TF's ZLIB.
+    example_gen_pb2.Output.ZLIB:
+        (beam.io.filesystem.CompressionTypes.DEFLATE, '.deflate'),
+}
 
-def _PartitionFn(record: bytes, num_partitions: int, buckets: List[int]) -> int:
+
+# A record output by converters: an example, a serialized example, or a
+# (partition key, serialized example) pair if partitioned by a feature.
+_Record = Union[bytes, tf.train.Example, Tuple[bytes, bytes]]
+
+
+def _GetPartitionKey(record: _Record, feature_name: Text) -> bytes:
+  """Returns serialized value of the partition feature of a record."""
+  if isinstance(record, tuple):
+    return record[0]
+  # Serialized examples without partition key are parsed as a fallback.
+  example = (
+      tf.train.Example.FromString(record)
+      if isinstance(record, bytes) else record)
+  return utils.get_partition_key(example, feature_name)
+
+
+def _ToSerializedExample(record: _Record) -> bytes:
+  """Returns the deterministically serialized example of a record."""
+  if isinstance(record, tuple):
+    return record[1]
+  if isinstance(record, bytes):
+    return record
+  return record.SerializeToString(deterministic=True)
+
+
+def _PartitionFn(record: _Record,
+                 num_partitions: int,
+                 buckets: List[int],
+                 split_config: Optional[example_gen_pb2.SplitConfig] = None
+                ) -> int:
+  """Assigns an example to a split based on hash buckets.
+
+  Args:
+    record: serialized example, or if split_config partitions by a feature,
+      example or (partition key, serialized example) pair.
+    num_partitions: number of splits.
+    buckets: cumulative hash bucket counts of the splits.
+    split_config: optional split config specifying hash function and partition
+      feature. By default the SHA-256 of the record is used.
+
+  Returns:
+    Index of the split.
+  """
   assert num_partitions == len(
       buckets), 'Partitions do not match bucket number.'
-  bucket = int(hashlib.sha256(record).hexdigest(), 16) % buckets[-1]
+  partition_key = record
+  if split_config and split_config.partition_feature_name:
+    partition_key = _GetPartitionKey(record,
+                                     split_config.partition_feature_name)
+  if (split_config and split_config.hash_function ==
+      example_gen_pb2.SplitConfig.BLAKE2B_64):
+    # The 8 byte digest is read as a big-endian integer, without hex encoding.
+    hash_value = struct.unpack(
+        '>Q',
+        hashlib.blake2b(partition_key, digest_size=8).digest())[0]
+  else:
+    hash_value = int(hashlib.sha256(partition_key).hexdigest(), 16)
+  bucket = hash_value % buckets[-1]
   # For example, if buckets is [10,50,80], there will be 3 splits:
   #   bucket >=0 && < 10, returns 0
   #   bucket >=10 && < 50, returns 1
@@ -51,15 +117,23 @@ def _PartitionFn(record: bytes, num_partitions: int, buckets: List[int]) -> int:
 @beam.typehints.with_input_types(bytes)
 @beam.typehints.with_output_types(beam.pvalue.PDone)
 def _WriteSplit(example_split: beam.pvalue.PCollection,
-                output_split_path: Text) -> beam.pvalue.PDone:
+                output_split_path: Text,
+                output_config: Optional[example_gen_pb2.Output] = None
+               ) -> beam.pvalue.PDone:
   """Shuffles and writes output split."""
+  output_config = output_config or example_gen_pb2.Output()
+  if not output_config.disable_shuffle:
+    example_split = (
+        example_split | 'Shuffle' >> beam.transforms.Reshuffle())
+  compression_type, file_name_suffix = _COMPRESSIONS[
+      output_config.compression]
+  # TODO(jyzhao): multiple output format.
   return (example_split
-          # TODO(jyzhao): make shuffle optional.
-          | 'Shuffle' >> beam.transforms.Reshuffle()
-          # TODO(jyzhao): multiple output format.
           | 'Write' >> beam.io.WriteToTFRecord(
               os.path.join(output_split_path, DEFAULT_FILE_NAME),
-              file_name_suffix='.gz'))
+              file_name_suffix=file_name_suffix,
+              num_shards=output_config.num_shards,
+              compression_type=compression_type))
 
 
 @beam.ptransform_fn
@@ -70,13 +144,92 @@ def _InputToSerializedExample(pipeline: beam.Pipeline,
                               input_dict: Dict[Text, List[types.Artifact]],
                               exec_properties: Dict[Text, Any],
                               split_pattern: Text) -> beam.pvalue.PCollection:
-  """Converts input to serialized TF examples."""
+  """Converts input to serialized TF examples.
+
+  The input_to_example PTransform may output either tf.Example protos or
+  already serialized tf.Example bytes, the latter are passed through as is.
+  """
   return (pipeline
           | 'InputSourceToExample' >> input_to_example(
               input_dict, exec_properties, split_pattern)
           # Returns deterministic string as partition is based on it.
-          | 'SerializeDeterministically' >>
-          beam.Map(lambda x: x.SerializeToString(deterministic=True)))
+          | 'SerializeDeterministically' >> beam.Map(_ToSerializedExample))
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(beam.Pipeline)
+def _GenerateSpanExamples(  # pylint: disable=invalid-name
+    pipeline: beam.Pipeline, executor: 'BaseExampleGenExecutor',
+    input_dict: Dict[Text, List[types.Artifact]],
+    exec_properties: Dict[Text, Any]) -> Dict[Text, beam.pvalue.PCollection]:
+  """Generates example splits of a span, scoping labels under the span."""
+  return executor.GenerateExamplesByBeam(pipeline, input_dict, exec_properties)
+
+
+def _GetSpanInputs(
+    input_dict: Dict[Text, List[types.Artifact]],
+    output_dict: Dict[Text, List[types.Artifact]],
+    exec_properties: Dict[Text, Any]
+) -> List[Tuple[Text, Dict[Text, List[types.Artifact]], Dict[Text, Any],
+                List[types.Artifact]]]:
+  """Returns inputs, exec properties and outputs of spans to generate.
+
+  Spans whose outputs all reuse examples of a previous execution are skipped.
+
+  Args:
+    input_dict: Input dict with an 'input_base' artifact for each span.
+    output_dict: Output dict with an 'examples' artifact for each split of each
+      span.
+    exec_properties: A dict of execution properties, whose input config has
+      split patterns containing '{SPAN}'.
+
+  Returns:
+    List of span number, input dict, exec properties with span resolved in
+    split patterns and output artifacts of each span.
+  """
+  input_config = example_gen_pb2.Input()
+  json_format.Parse(exec_properties['input_config'], input_config)
+  result = []
+  for span_input in input_dict['input_base']:
+    span = span_input.artifact.custom_properties[
+        utils.SPAN_PROPERTY_NAME].string_value
+    span_outputs = [
+        output for output in output_dict['examples']
+        if output.span == int(span)
+    ]
+    if all(utils.CACHED_FROM_PROPERTY_NAME in output.artifact.custom_properties
+           for output in span_outputs):
+      tf.logging.info('Examples of span {} are cached.'.format(span))
+      continue
+    span_input_config = example_gen_pb2.Input()
+    span_input_config.CopyFrom(input_config)
+    for split in span_input_config.splits:
+      split.pattern = split.pattern.replace(utils.SPAN_SPEC, span)
+    span_exec_properties = dict(exec_properties)
+    span_exec_properties['input_config'] = json_format.MessageToJson(
+        span_input_config, sort_keys=True)
+    span_input_dict = dict(input_dict)
+    span_input_dict['input_base'] = [span_input]
+    result.append((span, span_input_dict, span_exec_properties, span_outputs))
+  return result
+
+
+def _SetCompressionProperty(outputs: List[types.Artifact],
+                            output_config: example_gen_pb2.Output) -> None:
+  """Records the compression of written examples on the output artifacts.
+
+  Readers of the examples, e.g. trainer modules, need the compression of the
+  files, see artifact_utils.get_split_compression_type.
+
+  Args:
+    outputs: Examples artifacts the examples were written to.
+    output_config: example_gen_pb2.Output instance the examples were written
+      with.
+  """
+  for output in outputs:
+    output.set_string_custom_property(
+        artifact_utils.COMPRESSION_PROPERTY_NAME,
+        example_gen_pb2.Output.Compression.Name(output_config.compression))
 
 
 class BaseExampleGenExecutor(
@@ -112,6 +265,13 @@ class BaseExampleGenExecutor(
     Note that each input split will be transformed by this function separately.
     For complex use case, consider override 'GenerateExamplesByBeam' instead.
 
+    The PTransform may output serialized tf.Example bytes instead of
+    tf.Example protos, which avoids serializing them again. Serialization must
+    then be deterministic, as splits are partitioned based on it. If output
+    splits are partitioned by a feature, see utils.get_partition_feature_name,
+    it should output (utils.get_partition_key(example), serialized example)
+    pairs instead, so that examples are not parsed again for partitioning.
+
     Here is an example PTransform:
       @beam.ptransform_fn
       @beam.typehints.with_input_types(beam.Pipeline)
@@ -172,12 +332,34 @@ class BaseExampleGenExecutor(
       for split in output_config.split_config.splits:
         total_buckets += split.hash_buckets
         buckets.append(total_buckets)
-      example_splits = (
-          pipeline
-          | 'InputToSerializedExample' >> _InputToSerializedExample(  # pylint: disable=no-value-for-parameter
-              input_to_example, input_dict, exec_properties,
-              input_config.splits[0].pattern)
-          | 'SplitData' >> beam.Partition(_PartitionFn, len(buckets), buckets))
+      split_config = output_config.split_config
+      if (split_config.hash_function == example_gen_pb2.SplitConfig.BLAKE2B_64
+          and not hasattr(hashlib, 'blake2b')):
+        raise ValueError(
+            'BLAKE2B_64 hash function requires Python 3.6 or later.')
+      if split_config.partition_feature_name:
+        # Partitions before serialization so that examples produced as protos
+        # or with partition key need not be parsed again to read the partition
+        # feature.
+        example_splits = [
+            example_split
+            | 'Serialize[{}]'.format(split_names[index]) >> beam.Map(
+                _ToSerializedExample)
+            for index, example_split in enumerate(
+                pipeline
+                | 'InputSourceToExample' >> input_to_example(
+                    input_dict, exec_properties, input_config.splits[0].pattern)
+                | 'SplitData' >> beam.Partition(_PartitionFn, len(buckets),
+                                                buckets, split_config))
+        ]
+      else:
+        example_splits = (
+            pipeline
+            | 'InputToSerializedExample' >> _InputToSerializedExample(  # pylint: disable=no-value-for-parameter
+                input_to_example, input_dict, exec_properties,
+                input_config.splits[0].pattern)
+            | 'SplitData' >> beam.Partition(_PartitionFn, len(buckets),
+                                            buckets, split_config))
     else:
       # Use input splits.
       for split in input_config.splits:
@@ -215,16 +397,40 @@ class BaseExampleGenExecutor(
     """
     self._log_startup(input_dict, output_dict, exec_properties)
 
+    input_config = example_gen_pb2.Input()
+    json_format.Parse(exec_properties['input_config'], input_config)
+    output_config = example_gen_pb2.Output()
+    json_format.Parse(exec_properties['output_config'], output_config)
+
     tf.logging.info('Generating examples.')
     with beam.Pipeline(argv=self._get_beam_pipeline_args()) as pipeline:
-      example_splits = self.GenerateExamplesByBeam(pipeline, input_dict,
-                                                   exec_properties)
-
       # pylint: disable=expression-not-assigned, no-value-for-parameter
-      for split_name, example_split in example_splits.items():
-        (example_split
-         | 'WriteSplit[{}]'.format(split_name) >> _WriteSplit(
-             artifact_utils.get_split_uri(output_dict['examples'], split_name)))
+      generated_outputs = []
+      if input_config.HasField('range_config'):
+        # Each span is generated separately to its own output artifacts.
+        for span, span_input_dict, span_exec_properties, span_outputs in (
+            _GetSpanInputs(input_dict, output_dict, exec_properties)):
+          example_splits = (
+              pipeline
+              | 'GenerateSpan[{}]'.format(span) >> _GenerateSpanExamples(
+                  self, span_input_dict, span_exec_properties))
+          for split_name, example_split in example_splits.items():
+            (example_split
+             | 'WriteSplit[{}][{}]'.format(split_name, span) >> _WriteSplit(
+                 artifact_utils.get_split_uri(span_outputs, split_name),
+                 output_config))
+          generated_outputs.extend(span_outputs)
+      else:
+        example_splits = self.GenerateExamplesByBeam(pipeline, input_dict,
+                                                     exec_properties)
+        for split_name, example_split in example_splits.items():
+          (example_split
+           | 'WriteSplit[{}]'.format(split_name) >> _WriteSplit(
+               artifact_utils.get_split_uri(output_dict['examples'],
+                                            split_name), output_config))
+        generated_outputs = output_dict['examples']
       # pylint: enable=expression-not-assigned, no-value-for-parameter
 
+    _SetCompressionProperty(generated_outputs, output_config)
+
     tf.logging.info('Examples generated.')
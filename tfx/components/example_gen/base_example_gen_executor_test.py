@@ -17,12 +17,14 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import hashlib
 import os
 import random
 import apache_beam as beam
 import tensorflow as tf
 from tfx.components.example_gen import base_example_gen_executor
 from tfx.proto import example_gen_pb2
+from tfx.types import artifact_utils
 from tfx.types import standard_artifacts
 from google.protobuf import json_format
 
@@ -143,6 +145,128 @@ class BaseExampleGenExecutorTest(tf.test.TestCase):
         tf.gfile.GFile(self._train_output_file).size(),
         tf.gfile.GFile(self._eval_output_file).size())
 
+  def testDoOutputSplitByFeature(self):
+    # Create exec proterties.
+    exec_properties = {
+        'input_config':
+            json_format.MessageToJson(
+                example_gen_pb2.Input(splits=[
+                    example_gen_pb2.Input.Split(
+                        name='single', pattern='single/*'),
+                ])),
+        'output_config':
+            json_format.MessageToJson(
+                example_gen_pb2.Output(
+                    split_config=example_gen_pb2.SplitConfig(
+                        splits=[
+                            example_gen_pb2.SplitConfig.Split(
+                                name='train', hash_buckets=2),
+                            example_gen_pb2.SplitConfig.Split(
+                                name='eval', hash_buckets=1)
+                        ],
+                        hash_function=example_gen_pb2.SplitConfig.BLAKE2B_64,
+                        partition_feature_name='i')))
+    }
+
+    # Run executor.
+    example_gen = TestExampleGenExecutor()
+    example_gen.Do({}, self._output_dict, exec_properties)
+
+    # Check example gen outputs.
+    self.assertTrue(tf.gfile.Exists(self._train_output_file))
+    self.assertTrue(tf.gfile.Exists(self._eval_output_file))
+    # Output split ratio: train:eval=2:1.
+    self.assertGreater(
+        tf.gfile.GFile(self._train_output_file).size(),
+        tf.gfile.GFile(self._eval_output_file).size())
+
+  def testDoOutputFormat(self):
+    # Create exec proterties.
+    exec_properties = {
+        'input_config':
+            json_format.MessageToJson(
+                example_gen_pb2.Input(splits=[
+                    example_gen_pb2.Input.Split(
+                        name='train', pattern='train/*'),
+                    example_gen_pb2.Input.Split(name='eval', pattern='eval/*')
+                ])),
+        'output_config':
+            json_format.MessageToJson(
+                example_gen_pb2.Output(
+                    disable_shuffle=True,
+                    num_shards=2,
+                    compression=example_gen_pb2.Output.UNCOMPRESSED))
+    }
+
+    # Run executor.
+    example_gen = TestExampleGenExecutor()
+    example_gen.Do({}, self._output_dict, exec_properties)
+
+    # Check example gen outputs.
+    for split in self._output_dict['examples']:
+      self.assertItemsEqual(
+          ['data_tfrecord-00000-of-00002', 'data_tfrecord-00001-of-00002'],
+          tf.gfile.ListDirectory(split.uri))
+      num_examples = 0
+      for output_file in tf.gfile.Glob(os.path.join(split.uri, '*')):
+        num_examples += sum(
+            1 for _ in tf.python_io.tf_record_iterator(output_file))
+      self.assertEqual(10000 if split.split == 'eval' else 20000,
+                       num_examples)
+      self.assertEqual(
+          '', artifact_utils.get_split_compression_type([split], split.split))
+
+  def testPartitionFn(self):
+    example = tf.train.Example()
+    example.features.feature['id'].bytes_list.value.append(b'1')
+    other_example = tf.train.Example()
+    other_example.CopyFrom(example)
+    other_example.features.feature['f'].float_list.value.append(1.0)
+    buckets = [1000, 2000]
+    for hash_function in [
+        example_gen_pb2.SplitConfig.SHA256,
+        example_gen_pb2.SplitConfig.BLAKE2B_64
+    ]:
+      split_config = example_gen_pb2.SplitConfig(
+          hash_function=hash_function, partition_feature_name='id')
+      # Examples with the same partition feature go to the same split, whether
+      # they are serialized or not.
+      self.assertEqual(
+          base_example_gen_executor._PartitionFn(example, 2, buckets,
+                                                 split_config),
+          base_example_gen_executor._PartitionFn(
+              other_example.SerializeToString(), 2, buckets, split_config))
+      # Partition key given by the converter is used as is.
+      self.assertEqual(
+          base_example_gen_executor._PartitionFn(example, 2, buckets,
+                                                 split_config),
+          base_example_gen_executor._PartitionFn(
+              (example.features.feature['id'].SerializeToString(
+                  deterministic=True), b'unparsable'), 2, buckets,
+              split_config))
+
+    split_config = example_gen_pb2.SplitConfig(partition_feature_name='x')
+    with self.assertRaisesRegexp(RuntimeError, 'Partition feature x'):
+      base_example_gen_executor._PartitionFn(example, 2, buckets, split_config)
+
+  def testPartitionFnBuckets(self):
+    # A bucket for each split, so that the split is the hash bucket.
+    buckets = list(range(1, 101))
+    records = [b'example-%d' % i for i in range(5)]
+    hash_function_to_expected = [
+        (example_gen_pb2.SplitConfig.SHA256, [43, 43, 0, 26, 58]),
+    ]
+    if hasattr(hashlib, 'blake2b'):
+      hash_function_to_expected.append(
+          (example_gen_pb2.SplitConfig.BLAKE2B_64, [86, 0, 81, 95, 62]))
+    for hash_function, expected in hash_function_to_expected:
+      split_config = example_gen_pb2.SplitConfig(hash_function=hash_function)
+      self.assertEqual(expected, [
+          base_example_gen_executor._PartitionFn(record, len(buckets), buckets,
+                                                 split_config)
+          for record in records
+      ])
+
 
 if __name__ == '__main__':
   tf.test.main()
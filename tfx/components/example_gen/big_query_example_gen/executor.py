@@ -17,47 +17,134 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import base64
+import datetime
+import re
 import apache_beam as beam
 import tensorflow as tf
-from typing import Any, Dict, List, Text
+from typing import Any, Callable, Dict, List, Optional, Text, Tuple
 from google.cloud import bigquery
 from tfx import types
 from tfx.components.example_gen import base_example_gen_executor
 
+# Table spec accepted by BigQuerySource, [project:]dataset.table[$partition].
+# Domain-scoped project ids contain a colon too, e.g. example.com:project.
+_TABLE_SPEC_RE = re.compile(
+    r'^(?:(?:[\w.-]+:)?[\w.-]+:)?\w+\.\w+(?:\$\w+)?$')
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _IsTableSpec(split_pattern: Text) -> bool:
+  """Returns whether the split pattern names a table instead of a query."""
+  return bool(_TABLE_SPEC_RE.match(split_pattern.strip()))
+
+
+def _GetTableId(table_spec: Text) -> Text:
+  """Returns the project.dataset.table id of a table spec for the client."""
+  # Only the last colon separates the project from the dataset, as
+  # domain-scoped project ids contain a colon.
+  project, _, dataset_table = table_spec.strip().split('$')[0].rpartition(':')
+  return '{}.{}'.format(project, dataset_table) if project else dataset_table
+
+
+def _ToBool(value: Any) -> int:
+  # BigQuerySource may read booleans as 'true' / 'false' strings.
+  if isinstance(value, (str, bytes)):
+    return int(tf.compat.as_text(value).lower() == 'true')
+  return int(value)
+
+
+def _ToBytes(value: Any) -> bytes:
+  # BigQuerySource reads BYTES as base64 encoded strings.
+  if isinstance(value, bytes):
+    return value
+  return base64.b64decode(value)
+
+
+def _ToTimestampMicros(value: Any) -> int:
+  """Converts a TIMESTAMP value to microseconds since the Unix epoch."""
+  if isinstance(value, (int, float)):
+    # Seconds since the epoch, as in BigQuery JSON results.
+    return int(round(value * 1000000))
+  if isinstance(value, (str, bytes)):
+    # BigQuerySource formats timestamps as 'YYYY-MM-DD HH:MM:SS[.ffffff] UTC'.
+    value = tf.compat.as_text(value).replace(' UTC', '')
+    value = datetime.datetime.strptime(
+        value, '%Y-%m-%d %H:%M:%S.%f' if '.' in value else '%Y-%m-%d %H:%M:%S')
+  if value.tzinfo is not None:
+    value = value.replace(tzinfo=None) - value.utcoffset()
+  delta = value - _EPOCH
+  return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+# Feature kind and value conversion of each supported BigQuery column type,
+# both legacy and standard SQL names.
+_TYPE_CONVERTERS = {
+    'INTEGER': ('int64_list', int),
+    'INT64': ('int64_list', int),
+    'BOOLEAN': ('int64_list', _ToBool),
+    'BOOL': ('int64_list', _ToBool),
+    'TIMESTAMP': ('int64_list', _ToTimestampMicros),
+    'FLOAT': ('float_list', float),
+    'FLOAT64': ('float_list', float),
+    'NUMERIC': ('float_list', float),
+    'STRING': ('bytes_list', tf.compat.as_bytes),
+    'BYTES': ('bytes_list', _ToBytes),
+}
+
 
 class _BigQueryConverter(object):
-  """Help class for bigquery result row to tf example conversion."""
+  """Help class for bigquery result row to tf example conversion.
+
+  The conversion of each column is compiled once from the result schema, so
+  that converting a row needs no type name comparison.
+  """
 
-  def __init__(self, query: Text):
-    client = bigquery.Client()
-    # Dummy query to get the type information for each field.
-    query_job = client.query('SELECT * FROM ({}) LIMIT 0'.format(query))
-    results = query_job.result()
-    self._type_map = {}
-    for field in results.schema:
-      self._type_map[field.name] = field.field_type
+  def __init__(self,
+               split_pattern: Text,
+               client: Optional[bigquery.Client] = None):
+    """Construct a converter for the results of a query or table.
+
+    Args:
+      split_pattern: a BigQuery sql string, or a table spec of the form
+        [project:]dataset.table[$partition].
+      client: BigQuery client, by default a client of the default project.
+    """
+    client = client or bigquery.Client()
+    if _IsTableSpec(split_pattern):
+      # Table metadata holds the schema, no query is needed.
+      schema = client.get_table(_GetTableId(split_pattern)).schema
+    else:
+      # Dummy query to get the type information for each field.
+      query_job = client.query('SELECT * FROM ({}) LIMIT 0'.format(
+          split_pattern))
+      schema = query_job.result().schema
+    # Maps column name to feature kind, whether it's repeated and conversion.
+    self._converters = {
+    }  # type: Dict[Text, Tuple[Text, bool, Callable[[Any], Any]]]
+    for field in schema:
+      if field.field_type not in _TYPE_CONVERTERS:
+        # TODO(jyzhao): support more types.
+        raise RuntimeError('BigQuery column type {} is not supported.'.format(
+            field.field_type))
+      kind, convert = _TYPE_CONVERTERS[field.field_type]
+      self._converters[field.name] = (kind, field.mode == 'REPEATED', convert)
 
   def RowToExample(self, instance: Dict[Text, Any]) -> tf.train.Example:
     """Convert bigquery result row to tf example."""
-    feature = {}
+    example = tf.train.Example()
+    feature_map = example.features.feature
     for key, value in instance.items():
-      data_type = self._type_map[key]
+      kind, repeated, convert = self._converters[key]
+      feature = feature_map[key]
       if value is None:
-        feature[key] = tf.train.Feature()
-      elif data_type == 'INTEGER':
-        feature[key] = tf.train.Feature(
-            int64_list=tf.train.Int64List(value=[value]))
-      elif data_type == 'FLOAT':
-        feature[key] = tf.train.Feature(
-            float_list=tf.train.FloatList(value=[value]))
-      elif data_type == 'STRING':
-        feature[key] = tf.train.Feature(
-            bytes_list=tf.train.BytesList(value=[tf.compat.as_bytes(value)]))
+        continue
+      if repeated:
+        getattr(feature, kind).value.extend([convert(v) for v in value])
       else:
-        # TODO(jyzhao): support more types.
-        raise RuntimeError(
-            'BigQuery column type {} is not supported.'.format(data_type))
-    return tf.train.Example(features=tf.train.Features(feature=feature))
+        getattr(feature, kind).value.append(convert(value))
+    return example
 
 
 # Create this instead of inline in _BigQueryToExample for test mocking purpose.
@@ -71,6 +158,19 @@ def _ReadFromBigQuery(  # pylint: disable=invalid-name
               beam.io.BigQuerySource(query=query, use_standard_sql=True)))
 
 
+# Create this instead of inline in _BigQueryToExample for test mocking purpose.
+@beam.ptransform_fn
+@beam.typehints.with_input_types(beam.Pipeline)
+@beam.typehints.with_output_types(beam.typehints.Dict[Text, Any])
+def _ReadTableFromBigQuery(  # pylint: disable=invalid-name
+    pipeline: beam.Pipeline, table: Text) -> beam.pvalue.PCollection:
+  # Reading a table directly lets runners export it to files and read those in
+  # parallel, instead of running a query into a temporary table first.
+  return (pipeline
+          | 'ReadTable' >> beam.io.Read(
+              beam.io.BigQuerySource(table=table.strip())))
+
+
 @beam.ptransform_fn
 @beam.typehints.with_input_types(beam.Pipeline)
 @beam.typehints.with_output_types(tf.train.Example)
@@ -85,16 +185,20 @@ def _BigQueryToExample(  # pylint: disable=invalid-name
     pipeline: beam pipeline.
     input_dict: Input dict from input key to a list of Artifacts.
     exec_properties: A dict of execution properties.
-    split_pattern: Split.pattern in Input config, a BigQuery sql string.
+    split_pattern: Split.pattern in Input config, a BigQuery sql string, or a
+      table spec of the form [project:]dataset.table[$partition] to read a
+      table or one of its partitions as is.
 
   Returns:
     PCollection of TF examples.
   """
   converter = _BigQueryConverter(split_pattern)
 
-  return (pipeline
-          | 'QueryTable' >> _ReadFromBigQuery(split_pattern)  # pylint: disable=no-value-for-parameter
-          | 'ToTFExample' >> beam.Map(converter.RowToExample))
+  if _IsTableSpec(split_pattern):
+    rows = pipeline | 'ReadTable' >> _ReadTableFromBigQuery(split_pattern)  # pylint: disable=no-value-for-parameter
+  else:
+    rows = pipeline | 'QueryTable' >> _ReadFromBigQuery(split_pattern)  # pylint: disable=no-value-for-parameter
+  return rows | 'ToTFExample' >> beam.Map(converter.RowToExample)
 
 
 class Executor(base_example_gen_executor.BaseExampleGenExecutor):
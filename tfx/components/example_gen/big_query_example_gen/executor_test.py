@@ -17,6 +17,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import datetime
+import decimal
 import os
 import random
 import apache_beam as beam
@@ -53,6 +55,23 @@ def _MockReadFromBigQuery2(pipeline, query):  # pylint: disable=invalid-name, un
   return pipeline | beam.Create(mock_query_results)
 
 
+class _FakeBigQueryClient(object):
+  """Fake BigQuery client serving the schema of any query or table."""
+
+  def __init__(self, schema):
+    self._schema = schema
+    self.queries = []
+    self.tables = []
+
+  def query(self, query):
+    self.queries.append(query)
+    return mock.Mock(**{'result.return_value.schema': self._schema})
+
+  def get_table(self, table):
+    self.tables.append(table)
+    return mock.Mock(schema=self._schema)
+
+
 class ExecutorTest(tf.test.TestCase):
 
   def setUp(self):
@@ -89,6 +108,88 @@ class ExecutorTest(tf.test.TestCase):
           features=tf.train.Features(feature=feature))
       util.assert_that(examples, util.equal_to([example_proto]))
 
+  @mock.patch.multiple(
+      executor,
+      _ReadTableFromBigQuery=_MockReadFromBigQuery2,  # pylint: disable=invalid-name, unused-argument
+  )
+  @mock.patch.object(bigquery, 'Client')
+  def testBigQueryTableToExample(self, mock_client):
+    mock_client.return_value = _FakeBigQueryClient(self._schema)
+
+    with beam.Pipeline() as pipeline:
+      examples = (
+          pipeline | 'ToTFExample' >> executor._BigQueryToExample(
+              input_dict={},
+              exec_properties={},
+              split_pattern='project:dataset.table$20190101'))
+
+      feature = {}
+      feature['i'] = tf.train.Feature(int64_list=tf.train.Int64List(value=[1]))
+      feature['f'] = tf.train.Feature(
+          float_list=tf.train.FloatList(value=[2.0]))
+      feature['s'] = tf.train.Feature(
+          bytes_list=tf.train.BytesList(value=[tf.compat.as_bytes('abc')]))
+      example_proto = tf.train.Example(
+          features=tf.train.Features(feature=feature))
+      util.assert_that(examples, util.equal_to([example_proto]))
+
+    # Schema is read from table metadata, without any query.
+    self.assertEqual(['project.dataset.table'],
+                     mock_client.return_value.tables)
+    self.assertEqual([], mock_client.return_value.queries)
+
+  def testBigQueryConverter(self):
+    client = _FakeBigQueryClient([
+        bigquery.SchemaField('n', 'NUMERIC'),
+        bigquery.SchemaField('b', 'BOOLEAN'),
+        bigquery.SchemaField('t', 'TIMESTAMP'),
+        bigquery.SchemaField('r', 'INTEGER', mode='REPEATED'),
+        bigquery.SchemaField('y', 'BYTES'),
+        bigquery.SchemaField('s', 'STRING'),
+    ])
+    converter = executor._BigQueryConverter('SELECT * FROM `fake`', client)
+    self.assertEqual(['SELECT * FROM (SELECT * FROM `fake`) LIMIT 0'],
+                     client.queries)
+
+    example = converter.RowToExample({
+        'n': decimal.Decimal('1.5'),
+        'b': True,
+        't': datetime.datetime(1970, 1, 2, 0, 0, 0, 5),
+        'r': [1, 2, 3],
+        'y': b'\x00\x01',
+        's': None,
+    })
+    feature = example.features.feature
+    self.assertEqual([1.5], feature['n'].float_list.value)
+    self.assertEqual([1], feature['b'].int64_list.value)
+    self.assertEqual([86400000005], feature['t'].int64_list.value)
+    self.assertEqual([1, 2, 3], feature['r'].int64_list.value)
+    self.assertEqual([b'\x00\x01'], feature['y'].bytes_list.value)
+    self.assertEqual(tf.train.Feature(), feature['s'])
+
+    # Values as read by BigQuerySource.
+    example = converter.RowToExample({
+        'b': 'false',
+        't': '1970-01-01 00:00:01.5 UTC',
+        'y': 'AAE=',
+    })
+    feature = example.features.feature
+    self.assertEqual([0], feature['b'].int64_list.value)
+    self.assertEqual([1500000], feature['t'].int64_list.value)
+    self.assertEqual([b'\x00\x01'], feature['y'].bytes_list.value)
+
+  def testBigQueryConverterWithDomainScopedProject(self):
+    client = _FakeBigQueryClient([bigquery.SchemaField('i', 'INTEGER')])
+    executor._BigQueryConverter('example.com:project:dataset.table$20190101',
+                                client)
+    self.assertEqual(['example.com:project.dataset.table'], client.tables)
+    self.assertEqual([], client.queries)
+
+  def testBigQueryConverterUnsupportedType(self):
+    client = _FakeBigQueryClient([bigquery.SchemaField('g', 'GEOGRAPHY')])
+    with self.assertRaises(RuntimeError):
+      executor._BigQueryConverter('fake_dataset.fake_table', client)
+
   @mock.patch.multiple(
       executor,
       _ReadFromBigQuery=_MockReadFromBigQuery,  # pylint: disable=invalid-name, unused-argument
@@ -17,18 +17,33 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import csv
 import os
+import re
 import apache_beam as beam
 import numpy
 import tensorflow as tf
 import tensorflow_data_validation as tfdv
 from tensorflow_data_validation.coders import csv_decoder
-from typing import Any, Dict, List, Text
+from typing import Any, Dict, Iterable, List, Optional, Text, Tuple, Union
 from tfx import types
 from tfx.components.example_gen import base_example_gen_executor
+from tfx.components.example_gen import utils
 from tfx.types import artifact_utils
 from tfx.utils import io_utils
 
+# Column types of the fast path coder, ordered so that a column holding values
+# of different types gets the max of them.
+_INT = 0
+_FLOAT = 1
+_BYTES = 2
+_INT_REGEX = re.compile(r'^[-+]?[0-9]+$')
+_FLOAT_REGEX = re.compile(
+    r'^[-+]?([0-9]+(\.[0-9]*)?|\.[0-9]+)([eE][-+]?[0-9]+)?$')
+_INT64_MIN = -2**63
+_INT64_MAX = 2**63 - 1
+_DEFAULT_ENCODING = 'utf-8'
+
 
 def _dict_to_example(instance: tfdv.types.Example) -> tf.train.Example:
   """Decoded CSV to tf example."""
@@ -99,9 +114,176 @@ def _CsvToExample(  # pylint: disable=invalid-name
           | 'ToTFExample' >> beam.Map(_dict_to_example))
 
 
+def _get_value_type(value: Text) -> Optional[int]:
+  """Returns the column type of a single CSV value, None if it is empty."""
+  if not value:
+    return None
+  if _INT_REGEX.match(value) and _INT64_MIN <= int(value) <= _INT64_MAX:
+    return _INT
+  if _FLOAT_REGEX.match(value):
+    return _FLOAT
+  return _BYTES
+
+
+def _merge_column_types(left: List[Optional[int]],
+                        right: List[Optional[int]]) -> List[Optional[int]]:
+  return [
+      r if l is None else (l if r is None else max(l, r))
+      for l, r in zip(left, right)
+  ]
+
+
+def _check_row_length(row: List[Text], column_names: List[Text]) -> None:
+  if len(row) != len(column_names):
+    raise ValueError('Columns do not match specified csv headers: %s -> %s' %
+                     (column_names, row))
+
+
+class _ColumnTypeInferrer(beam.CombineFn):
+  """Infers the type of each CSV column from batches of lines."""
+
+  def __init__(self, column_names: List[Text]):
+    self._column_names = column_names
+
+  def create_accumulator(self) -> List[Optional[int]]:
+    return [None] * len(self._column_names)
+
+  def add_input(self, accumulator: List[Optional[int]],
+                lines: List[Text]) -> List[Optional[int]]:
+    for row in csv.reader(lines):
+      _check_row_length(row, self._column_names)
+      accumulator = _merge_column_types(accumulator,
+                                        [_get_value_type(v) for v in row])
+    return accumulator
+
+  def merge_accumulators(
+      self,
+      accumulators: Iterable[List[Optional[int]]]) -> List[Optional[int]]:
+    result = self.create_accumulator()
+    for accumulator in accumulators:
+      result = _merge_column_types(result, accumulator)
+    return result
+
+  def extract_output(self,
+                     accumulator: List[Optional[int]]) -> List[Optional[int]]:
+    return accumulator
+
+
+class _CsvLinesToSerializedExampleDoFn(beam.DoFn):
+  """Converts batches of CSV lines to serialized TF examples.
+
+  A single tf.Example is kept per DoFn instance and only the values of its
+  features are replaced for every row, so that no intermediate dict, numpy
+  array or new proto message is created per row. If a partition feature is
+  given, (partition key, serialized example) pairs are output.
+  """
+
+  def __init__(self,
+               column_names: List[Text],
+               partition_feature_name: Optional[Text] = None):
+    self._column_names = column_names
+    self._partition_feature_name = partition_feature_name
+    self._example = None
+
+  def start_bundle(self):
+    if self._example is None:
+      self._example = tf.train.Example()
+
+  def process(
+      self, lines: List[Text], column_types: List[Optional[int]]
+  ) -> Iterable[Union[bytes, Tuple[bytes, bytes]]]:
+    feature_map = self._example.features.feature
+    features = [feature_map[name] for name in self._column_names]
+    for row in csv.reader(lines):
+      _check_row_length(row, self._column_names)
+      for feature, column_type, value in zip(features, column_types, row):
+        feature.Clear()
+        if not value:
+          continue
+        if column_type == _INT:
+          feature.int64_list.value.append(int(value))
+        elif column_type == _FLOAT:
+          feature.float_list.value.append(float(value))
+        else:
+          feature.bytes_list.value.append(value.encode(_DEFAULT_ENCODING))
+      serialized_example = self._example.SerializeToString(deterministic=True)
+      if self._partition_feature_name:
+        yield (utils.get_partition_key(self._example,
+                                       self._partition_feature_name),
+               serialized_example)
+      else:
+        yield serialized_example
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(beam.Pipeline)
+@beam.typehints.with_output_types(
+    beam.typehints.Union[bytes, beam.typehints.Tuple[bytes, bytes]])
+def _CsvToSerializedExample(  # pylint: disable=invalid-name
+    pipeline: beam.Pipeline,
+    input_dict: Dict[Text, List[types.Artifact]],
+    exec_properties: Dict[Text, Any],
+    split_pattern: Text) -> beam.pvalue.PCollection:
+  """Read CSV files and transform to serialized TF examples.
+
+  Produces the same examples as _CsvToExample, but column types are inferred
+  once per split and lines are converted in batches straight to serialized
+  examples.
+
+  Args:
+    pipeline: beam pipeline.
+    input_dict: Input dict from input key to a list of Artifacts.
+      - input_base: input dir that contains csv data. csv files must have header
+        line.
+    exec_properties: A dict of execution properties.
+      - output_config: optional JSON string of example_gen_pb2.Output, whose
+        partition feature, if any, is extracted as partition key.
+    split_pattern: Split.pattern in Input config, glob relative file pattern
+      that maps to input files with root directory given by input_base.
+
+  Returns:
+    PCollection of serialized TF examples, or of (partition key, serialized TF
+    example) pairs if output splits are partitioned by a feature.
+
+  Raises:
+    RuntimeError: if split is empty or csv headers are not equal.
+  """
+  input_base_uri = artifact_utils.get_single_uri(input_dict['input_base'])
+  csv_pattern = os.path.join(input_base_uri, split_pattern)
+  tf.logging.info(
+      'Processing input csv data {} to TFExample.'.format(csv_pattern))
+
+  csv_files = tf.gfile.Glob(csv_pattern)
+  if not csv_files:
+    raise RuntimeError(
+        'Split pattern {} does not match any files.'.format(csv_pattern))
+
+  column_names = io_utils.load_csv_column_names(csv_files[0])
+  for csv_file in csv_files[1:]:
+    if io_utils.load_csv_column_names(csv_file) != column_names:
+      raise RuntimeError(
+          'Files in same split {} have different header.'.format(csv_pattern))
+
+  lines = (
+      pipeline
+      | 'ReadFromText' >> beam.io.ReadFromText(
+          file_pattern=csv_pattern, skip_header_lines=1)
+      | 'BatchLines' >> beam.BatchElements())
+  column_types = (
+      lines
+      | 'InferColumnTypes' >> beam.CombineGlobally(
+          _ColumnTypeInferrer(column_names)))
+  return (lines
+          | 'ToSerializedTFExample' >> beam.ParDo(
+              _CsvLinesToSerializedExampleDoFn(
+                  column_names,
+                  utils.get_partition_feature_name(exec_properties)),
+              beam.pvalue.AsSingleton(column_types)))
+
+
 class Executor(base_example_gen_executor.BaseExampleGenExecutor):
   """Generic TFX CSV example gen executor."""
 
   def GetInputSourceToExamplePTransform(self) -> beam.PTransform:
-    """Returns PTransform for CSV to TF examples."""
-    return _CsvToExample
+    """Returns PTransform for CSV to serialized TF examples."""
+    return _CsvToSerializedExample
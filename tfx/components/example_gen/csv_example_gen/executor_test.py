@@ -55,6 +55,73 @@ class ExecutorTest(tf.test.TestCase):
 
       util.assert_that(examples, check_result)
 
+  def testCsvToSerializedExample(self):
+    with beam.Pipeline() as pipeline:
+      examples = (
+          pipeline
+          | 'ToSerializedTFExample' >> executor._CsvToSerializedExample(
+              input_dict=self._input_dict,
+              exec_properties={},
+              split_pattern='csv/*'))
+      expected_examples = (
+          pipeline
+          | 'ToTFExample' >> executor._CsvToExample(
+              input_dict=self._input_dict,
+              exec_properties={},
+              split_pattern='csv/*')
+          | 'Serialize' >> beam.Map(
+              lambda x: x.SerializeToString(deterministic=True)))
+
+      # Counts each serialized example +1 from the fast path and -1 from the
+      # TFDV path, all counts must cancel out.
+      mismatches = (
+          (examples | 'CountFast' >> beam.Map(lambda x: (x, 1)),
+           expected_examples | 'CountExpected' >> beam.Map(lambda x: (x, -1)))
+          | 'Flatten' >> beam.Flatten()
+          | 'Sum' >> beam.CombinePerKey(sum)
+          | 'Mismatches' >> beam.Filter(lambda kv: kv[1] != 0))
+
+      def check_result(got):
+        assert (15000 == len(got)), 'Unexpected example count'
+        assert (18 == len(tf.train.Example.FromString(
+            got[0]).features.feature)), 'Example not match'
+
+      util.assert_that(examples, check_result)
+      util.assert_that(mismatches, util.is_empty(), label='NoMismatch')
+
+  def testCsvToSerializedExampleWithPartitionKey(self):
+    exec_properties = {
+        'output_config':
+            json_format.MessageToJson(
+                example_gen_pb2.Output(
+                    split_config=example_gen_pb2.SplitConfig(
+                        partition_feature_name='company')))
+    }
+    with beam.Pipeline() as pipeline:
+      examples = (
+          pipeline
+          | 'ToSerializedTFExample' >> executor._CsvToSerializedExample(
+              input_dict=self._input_dict,
+              exec_properties=exec_properties,
+              split_pattern='csv/*'))
+
+      def check_result(got):
+        assert (15000 == len(got)), 'Unexpected example count'
+        for partition_key, serialized_example in got[:10]:
+          feature = tf.train.Example.FromString(
+              serialized_example).features.feature['company']
+          assert (feature.SerializeToString(deterministic=True) ==
+                  partition_key), 'Partition key not match'
+
+      util.assert_that(examples, check_result)
+
+  def testGetValueType(self):
+    self.assertIsNone(executor._get_value_type(''))
+    self.assertEqual(executor._INT, executor._get_value_type('-12'))
+    self.assertEqual(executor._FLOAT, executor._get_value_type('1.5e3'))
+    self.assertEqual(executor._FLOAT, executor._get_value_type(str(2**64)))
+    self.assertEqual(executor._BYTES, executor._get_value_type('Cash'))
+
   def testDo(self):
     output_data_dir = os.path.join(
         os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
@@ -19,12 +19,22 @@ from __future__ import print_function
 
 import os
 import apache_beam as beam
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import tensorflow as tf
-from typing import Any, Dict, List, Text
+from typing import Any, Dict, Iterable, List, Optional, Text, Tuple, Union
 from tfx import types
 from tfx.components.example_gen import base_example_gen_executor
+from tfx.components.example_gen import utils
 from tfx.components.example_gen.utils import dict_to_example
+from tfx.proto import example_gen_pb2
 from tfx.types import artifact_utils
+from google.protobuf import json_format
+
+_DEFAULT_ENCODING = 'utf-8'
+# Number of rows of a row group converted at the same time.
+_BATCH_SIZE = 1024
 
 
 @beam.ptransform_fn
@@ -61,6 +71,187 @@ def _ParquetToExample(  # pylint: disable=invalid-name
           | 'ToTFExample' >> beam.Map(dict_to_example))
 
 
+def _GetColumns(exec_properties: Dict[Text, Any]) -> Optional[List[Text]]:
+  """Returns columns to read from ColumnarInputConfig, None for all."""
+  if not exec_properties.get('custom_config'):
+    return None
+  custom_config = example_gen_pb2.CustomConfig()
+  json_format.Parse(exec_properties['custom_config'], custom_config)
+  columnar_config = example_gen_pb2.ColumnarInputConfig()
+  if not custom_config.custom_config.Unpack(columnar_config):
+    return None
+  return list(columnar_config.columns) or None
+
+
+def _ListRowGroups(file_path: Text) -> Iterable[Tuple[Text, int]]:
+  """Lists (file, row group index) of a Parquet file from its footer."""
+  with beam.io.filesystems.FileSystems.open(
+      file_path,
+      compression_type=beam.io.filesystem.CompressionTypes.UNCOMPRESSED) as f:
+    num_row_groups = pq.ParquetFile(f).num_row_groups
+  for row_group in range(num_row_groups):
+    yield file_path, row_group
+
+
+def _EncodeStrings(value: Any) -> Any:
+  """Encodes a string or list of strings as bytes, keeping None."""
+  if value is None:
+    return None
+  if isinstance(value, list):
+    return [v.encode(_DEFAULT_ENCODING) for v in value]
+  return value.encode(_DEFAULT_ENCODING)
+
+
+def _GetFeatureKind(arrow_type: pa.DataType) -> Text:
+  """Maps an Arrow value type to the tf.train.Feature kind holding it."""
+  if pa.types.is_integer(arrow_type) or pa.types.is_boolean(arrow_type):
+    return 'int64_list'
+  if pa.types.is_floating(arrow_type):
+    return 'float_list'
+  if pa.types.is_string(arrow_type) or pa.types.is_binary(arrow_type):
+    return 'bytes_list'
+  raise RuntimeError('Column type {} is not supported.'.format(arrow_type))
+
+
+def _GetValidity(array: pa.Array) -> Optional[np.ndarray]:
+  """Returns whether each value of an Arrow array is not null, None if all."""
+  if not array.null_count:
+    return None
+  bits = np.unpackbits(np.frombuffer(array.buffers()[0], dtype=np.uint8))
+  # Arrow validity bitmaps are least significant bit first.
+  bits = bits.reshape(-1, 8)[:, ::-1].ravel()
+  return bits[array.offset:array.offset + len(array)].astype(bool)
+
+
+def _FillFeatures(features: List[tf.train.Feature], array: pa.Array,
+                  arrow_type: pa.DataType) -> None:
+  """Fills the feature of each row from an Arrow array of a column.
+
+  Values of the column are converted to Python at once, and each feature is
+  extended by the slice of values of its row, as given by the offsets of list
+  arrays. Features of null values are left empty.
+
+  Args:
+    features: the feature of the column of each row, empty.
+    array: Arrow array holding the column, with a value for each row.
+    arrow_type: type of the column.
+  """
+  is_list = pa.types.is_list(arrow_type)
+  value_type = arrow_type.value_type if is_list else arrow_type
+  kind = _GetFeatureKind(value_type)
+  if is_list:
+    offsets = np.frombuffer(
+        array.buffers()[1],
+        dtype=np.int32)[array.offset:array.offset + len(array) + 1]
+    start = int(offsets[0])
+    values = array.values.slice(start, int(offsets[-1]) - start).to_pylist()
+    offsets = (offsets - start).tolist()
+  else:
+    values = array.to_pylist()
+    offsets = list(range(len(array) + 1))
+  if pa.types.is_string(value_type):
+    values = [_EncodeStrings(v) for v in values]
+
+  validity = _GetValidity(array)
+  for row, feature in enumerate(features):
+    if validity is not None and not validity[row]:
+      continue
+    getattr(feature, kind).value.extend(values[offsets[row]:offsets[row + 1]])
+
+
+class _RowGroupToSerializedExampleDoFn(beam.DoFn):
+  """Converts a Parquet row group to serialized TF examples.
+
+  The row group is read as an Arrow table with only the configured columns,
+  and converted in batches of rows. The examples of a batch are filled column
+  by column, see _FillFeatures. If a partition feature is given,
+  (partition key, serialized example) pairs are output.
+  """
+
+  def __init__(self,
+               columns: Optional[List[Text]],
+               partition_feature_name: Optional[Text] = None):
+    self._columns = columns
+    self._partition_feature_name = partition_feature_name
+
+  def process(self, element: Tuple[Text, int]
+             ) -> Iterable[Union[bytes, Tuple[bytes, bytes]]]:
+    file_path, row_group = element
+    with beam.io.filesystems.FileSystems.open(
+        file_path,
+        compression_type=beam.io.filesystem.CompressionTypes.UNCOMPRESSED
+    ) as f:
+      table = pq.ParquetFile(f).read_row_group(row_group, columns=self._columns)
+
+    for batch in table.to_batches(chunksize=_BATCH_SIZE):
+      examples = [tf.train.Example() for _ in range(batch.num_rows)]
+      for index, field in enumerate(batch.schema):
+        _FillFeatures(
+            [example.features.feature[field.name] for example in examples],
+            batch.column(index), field.type)
+      for example in examples:
+        serialized_example = example.SerializeToString(deterministic=True)
+        if self._partition_feature_name:
+          yield (utils.get_partition_key(example,
+                                         self._partition_feature_name),
+                 serialized_example)
+        else:
+          yield serialized_example
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(beam.Pipeline)
+@beam.typehints.with_output_types(
+    beam.typehints.Union[bytes, beam.typehints.Tuple[bytes, bytes]])
+def _ParquetToSerializedExample(  # pylint: disable=invalid-name
+    pipeline: beam.Pipeline,
+    input_dict: Dict[Text, List[types.Artifact]],
+    exec_properties: Dict[Text, Any],
+    split_pattern: Text) -> beam.pvalue.PCollection:
+  """Read Parquet files by row group and transform to serialized TF examples.
+
+  Row groups of all files are distributed across workers, so that large files
+  are read in parallel as well.
+
+  Args:
+    pipeline: beam pipeline.
+    input_dict: Input dict from input key to a list of Artifacts.
+      - input_base: input dir that contains Parquet data.
+    exec_properties: A dict of execution properties.
+      - custom_config: optional JSON string of example_gen_pb2.CustomConfig
+        holding an example_gen_pb2.ColumnarInputConfig.
+      - output_config: optional JSON string of example_gen_pb2.Output, whose
+        partition feature, if any, is extracted as partition key.
+    split_pattern: Split.pattern in Input config, glob relative file pattern
+      that maps to input files with root directory given by input_base.
+
+  Returns:
+    PCollection of serialized TF examples, or of (partition key, serialized TF
+    example) pairs if output splits are partitioned by a feature.
+
+  Raises:
+    RuntimeError: if split is empty.
+  """
+  input_base_uri = artifact_utils.get_single_uri(input_dict['input_base'])
+  parquet_pattern = os.path.join(input_base_uri, split_pattern)
+  tf.logging.info(
+      'Processing input parquet data {} to TFExample.'.format(parquet_pattern))
+
+  parquet_files = tf.io.gfile.glob(parquet_pattern)
+  if not parquet_files:
+    raise RuntimeError(
+        'Split pattern {} does not match any files.'.format(parquet_pattern))
+
+  return (pipeline
+          | 'CreateFiles' >> beam.Create(parquet_files)
+          | 'ListRowGroups' >> beam.FlatMap(_ListRowGroups)
+          | 'DistributeRowGroups' >> beam.transforms.Reshuffle()
+          | 'ToSerializedTFExample' >> beam.ParDo(
+              _RowGroupToSerializedExampleDoFn(
+                  _GetColumns(exec_properties),
+                  utils.get_partition_feature_name(exec_properties))))
+
+
 class Executor(base_example_gen_executor.BaseExampleGenExecutor):
   """TFX example gen executor for processing parquet format.
 
@@ -75,7 +266,9 @@ class Executor(base_example_gen_executor.BaseExampleGenExecutor):
       Missing value will be converted to empty tf.train.Feature().
       Parquet data might lose precision, e.g., int96.
 
-    For details, check the dict_to_example function in example_gen.utils.
+    Parquet files are read by row group as Arrow tables and converted column by
+    column. Only the columns listed in an example_gen_pb2.ColumnarInputConfig
+    given as custom_config are read, if any.
 
 
   Example usage:
@@ -92,5 +285,5 @@ class Executor(base_example_gen_executor.BaseExampleGenExecutor):
   """
 
   def GetInputSourceToExamplePTransform(self) -> beam.PTransform:
-    """Returns PTransform for parquet to TF examples."""
-    return _ParquetToExample
+    """Returns PTransform for parquet to serialized TF examples."""
+    return _ParquetToSerializedExample
@@ -20,6 +20,7 @@ from __future__ import print_function
 import os
 import apache_beam as beam
 from apache_beam.testing import util
+import pyarrow as pa
 import tensorflow as tf
 from tfx.components.example_gen.custom_executors import parquet_executor
 from tfx.proto import example_gen_pb2
@@ -55,6 +56,81 @@ class ExecutorTest(tf.test.TestCase):
 
       util.assert_that(examples, check_result)
 
+  def testParquetToSerializedExample(self):
+    with beam.Pipeline() as pipeline:
+      examples = (
+          pipeline
+          | 'ToSerializedTFExample' >>
+          parquet_executor._ParquetToSerializedExample(
+              input_dict=self._input_dict,
+              exec_properties={},
+              split_pattern='parquet/*'))
+      expected_examples = (
+          pipeline
+          | 'ToTFExample' >> parquet_executor._ParquetToExample(
+              input_dict=self._input_dict,
+              exec_properties={},
+              split_pattern='parquet/*')
+          | 'Serialize' >> beam.Map(
+              lambda x: x.SerializeToString(deterministic=True)))
+
+      # Counts each serialized example +1 from the columnar path and -1 from
+      # the dict path, all counts must cancel out.
+      mismatches = (
+          (examples | 'CountColumnar' >> beam.Map(lambda x: (x, 1)),
+           expected_examples | 'CountExpected' >> beam.Map(lambda x: (x, -1)))
+          | 'Flatten' >> beam.Flatten()
+          | 'Sum' >> beam.CombinePerKey(sum)
+          | 'Mismatches' >> beam.Filter(lambda kv: kv[1] != 0))
+
+      def check_result(got):
+        assert (10000 == len(got)), 'Unexpected example count'
+        assert (18 == len(tf.train.Example.FromString(
+            got[0]).features.feature)), 'Example not match'
+
+      util.assert_that(examples, check_result)
+      util.assert_that(mismatches, util.is_empty(), label='NoMismatch')
+
+  def testParquetToSerializedExampleWithColumns(self):
+    custom_config = example_gen_pb2.CustomConfig()
+    custom_config.custom_config.Pack(
+        example_gen_pb2.ColumnarInputConfig(
+            columns=['company', 'trip_miles']))
+    with beam.Pipeline() as pipeline:
+      examples = (
+          pipeline
+          | 'ToSerializedTFExample' >>
+          parquet_executor._ParquetToSerializedExample(
+              input_dict=self._input_dict,
+              exec_properties={
+                  'custom_config': json_format.MessageToJson(custom_config)
+              },
+              split_pattern='parquet/*'))
+
+      def check_result(got):
+        assert (10000 == len(got)), 'Unexpected example count'
+        example = tf.train.Example.FromString(got[0])
+        assert (set(['company', 'trip_miles']) == set(
+            example.features.feature)), 'Example not match'
+
+      util.assert_that(examples, check_result)
+
+  def testFillFeatures(self):
+    features = [tf.train.Feature() for _ in range(3)]
+    # Slicing gives arrays with an offset, as batches of a row group do.
+    array = pa.array([[9], [1, 2], None, [3]], pa.list_(pa.int64())).slice(1)
+    parquet_executor._FillFeatures(features, array, array.type)
+    self.assertEqual([[1, 2], [], [3]],
+                     [list(f.int64_list.value) for f in features])
+
+    features = [tf.train.Feature() for _ in range(3)]
+    array = pa.array([u'a', None, u'c'])
+    parquet_executor._FillFeatures(features, array, array.type)
+    self.assertEqual([[b'a'], [], [b'c']],
+                     [list(f.bytes_list.value) for f in features])
+    self.assertEqual('bytes_list', features[0].WhichOneof('kind'))
+    self.assertIsNone(features[1].WhichOneof('kind'))
+
   def testDo(self):
     output_data_dir = os.path.join(
         os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
@@ -17,24 +17,35 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import copy
+import hashlib
+import json
 import os
 import re
 import tensorflow as tf
-from typing import Any, Dict, List, Text
+from typing import Any, Dict, List, Optional, Text
 from google.protobuf import json_format
 from tfx import types
 from tfx.components.base import base_driver
+from tfx.components.example_gen import utils
 from tfx.orchestration import data_types
+from tfx.orchestration import metadata
 from tfx.proto import example_gen_pb2
+from tfx.types import artifact_utils
 from tfx.types import channel_utils
 from tfx.utils import io_utils
 
 # Fingerprint custom property.
 _FINGERPRINT = 'input_fingerprint'
 # Span custom property.
-_SPAN = 'span'
+_SPAN = utils.SPAN_PROPERTY_NAME
 # Span spec used in split pattern.
-_SPAN_SPEC = '{SPAN}'
+_SPAN_SPEC = utils.SPAN_SPEC
+# Custom property of per span outputs, identifying the input span and the
+# configuration the examples are generated with.
+_GENERATION_KEY = 'generation_key'
+# Directory under pipeline root holding content digests of input files.
+_DIGEST_CACHE_DIR = '_input_digests'
 
 
 class Driver(base_driver.BaseDriver):
@@ -44,6 +55,13 @@ class Driver(base_driver.BaseDriver):
   an artifact, e.g., for CsvExampleGen and ImportExampleGen.
   """
 
+  def __init__(self, metadata_handler: metadata.Metadata):
+    super(Driver, self).__init__(metadata_handler)
+    # Input artifacts of each span if a range of spans is processed, and the
+    # execution properties, set when resolving inputs.
+    self._span_inputs = []  # type: List[types.Artifact]
+    self._exec_properties = {}  # type: Dict[Text, Any]
+
   def _glob_to_regex(self, glob_pattern: Text) -> Text:
     """Changes glob pattern to regex pattern."""
     regex_pattern = glob_pattern
@@ -55,6 +73,18 @@ class Driver(base_driver.BaseDriver):
     regex_pattern = regex_pattern.replace(')', '\\)')
     return regex_pattern
 
+  def _parse_span(self, path: Text, regex_pattern: Text) -> Text:
+    """Extracts the span number from a path matched by the span glob."""
+    result = re.search(regex_pattern, path)
+    assert result is not None, ('Glob pattern does not match regex pattern')
+    try:
+      int(result.group(1))
+    except ValueError:
+      raise ValueError('Cannot not find span number from %s based on %s' %
+                       (path, regex_pattern))
+    # Uses str instead of int because of zero padding digits.
+    return result.group(1)
+
   def _retrieve_latest_span(self, uri: Text,
                             split: example_gen_pb2.Input.Split) -> Text:
     split_pattern = os.path.join(uri, split.pattern)
@@ -62,6 +92,29 @@ class Driver(base_driver.BaseDriver):
         _SPAN_SPEC) == 1, 'Only one {SPAN} is allowed in %s' % (
             split_pattern)
 
+    # If {SPAN} is part of a directory name, only the directories are listed
+    # and files are only globbed under the latest span directory, so that the
+    # cost does not grow with the number of historical spans.
+    span_dir_end = split_pattern.find('/', split_pattern.index(_SPAN_SPEC))
+    if span_dir_end != -1:
+      span_dir_pattern = split_pattern[:span_dir_end]
+      remaining_pattern = split_pattern[span_dir_end:]
+      span_dir_regex_pattern = self._glob_to_regex(span_dir_pattern).replace(
+          _SPAN_SPEC, '(.*)')
+      tf.logging.info('Regex pattern for span directories of split %s: %s' %
+                      (split.name, span_dir_regex_pattern))
+      spans = {}
+      for span_dir in tf.io.gfile.glob(span_dir_pattern.replace(
+          _SPAN_SPEC, '*')):
+        spans[span_dir] = self._parse_span(span_dir, span_dir_regex_pattern)
+      # Latest span directory which contains files matching the split pattern.
+      for span_dir, span in sorted(
+          spans.items(), key=lambda item: int(item[1]), reverse=True):
+        if tf.io.gfile.glob(span_dir + remaining_pattern):
+          return span
+      raise ValueError('Cannot not find matching for split %s based on %s' %
+                       (split.name, split.pattern))
+
     split_glob_pattern = split_pattern.replace(_SPAN_SPEC, '*')
     tf.logging.info('Glob pattern for split %s: %s' %
                     (split.name, split_glob_pattern))
@@ -75,22 +128,150 @@ class Driver(base_driver.BaseDriver):
     files = tf.io.gfile.glob(split_glob_pattern)
     latest_span = None
     for file_path in files:
-      result = re.search(split_regex_pattern, file_path)
-      assert result is not None, ('Glob pattern does not match regex pattern')
-      try:
-        span = int(result.group(1))
-      except ValueError:
-        raise ValueError('Cannot not find span number from %s based on %s' %
-                         (file_path, split_regex_pattern))
-      if latest_span is None or span >= int(latest_span):
-        # Uses str instead of int because of zero padding digits.
-        latest_span = result.group(1)
+      span = self._parse_span(file_path, split_regex_pattern)
+      if latest_span is None or int(span) >= int(latest_span):
+        latest_span = span
 
     if latest_span is None:
       raise ValueError('Cannot not find matching for split %s based on %s' %
                        (split.name, split.pattern))
     return latest_span
 
+  def _retrieve_spans(self, uri: Text,
+                      split: example_gen_pb2.Input.Split) -> List[Text]:
+    """Returns all spans with files matching the split, ordered by number."""
+    split_pattern = os.path.join(uri, split.pattern)
+    assert split_pattern.count(
+        _SPAN_SPEC) == 1, 'Only one {SPAN} is allowed in %s' % (
+            split_pattern)
+    split_regex_pattern = self._glob_to_regex(split_pattern).replace(
+        _SPAN_SPEC, '(.*)')
+    assert re.compile(
+        split_regex_pattern).groups == 1, 'Regex should have only one group'
+
+    spans = set()
+    for file_path in tf.io.gfile.glob(split_pattern.replace(_SPAN_SPEC, '*')):
+      spans.add(self._parse_span(file_path, split_regex_pattern))
+    return sorted(spans, key=int)
+
+  def _select_spans(self, input_config: example_gen_pb2.Input,
+                    uri: Text) -> List[Text]:
+    """Selects spans in the range config, which all splits must contain."""
+    range_config = input_config.range_config
+    selected_spans = None
+    for split in input_config.splits:
+      if _SPAN_SPEC not in split.pattern:
+        raise ValueError('Range config requires {SPAN} in pattern of split %s' %
+                         split.name)
+      spans = self._retrieve_spans(uri, split)
+      if range_config.HasField('static_range'):
+        spans = [
+            span for span in spans
+            if range_config.static_range.start_span_number <= int(span) <=
+            range_config.static_range.end_span_number
+        ]
+      elif range_config.rolling_range.num_spans:
+        spans = spans[-range_config.rolling_range.num_spans:]
+      if selected_spans is None:
+        selected_spans = spans
+      if selected_spans != spans:
+        raise ValueError('Spans should be the same for each split: %s != %s' %
+                         (selected_spans, spans))
+    if not selected_spans:
+      raise ValueError('Cannot not find spans in range %s based on %s' %
+                       (range_config, [s.pattern for s in input_config.splits]))
+    return selected_spans
+
+  def _get_digest_cache_file(
+      self, pattern: Text,
+      pipeline_info: Optional[data_types.PipelineInfo]) -> Optional[Text]:
+    """Returns the content digest cache file of an input pattern if possible.
+
+    Each pattern has its own cache, which only holds the files matching it.
+
+    Args:
+      pattern: glob pattern of the input files.
+      pipeline_info: optional pipeline info, whose root holds the caches.
+
+    Returns:
+      Path of the cache file, or None without pipeline root.
+    """
+    if not pipeline_info or not pipeline_info.pipeline_root:
+      return None
+    return os.path.join(
+        pipeline_info.pipeline_root, _DIGEST_CACHE_DIR,
+        '%s.json' % hashlib.sha256(tf.compat.as_bytes(pattern)).hexdigest())
+
+  def _get_split_fingerprint(
+      self, input_config: example_gen_pb2.Input, split_name: Text,
+      pattern: Text,
+      pipeline_info: Optional[data_types.PipelineInfo]) -> Text:
+    """Fingerprints files of a split in the configured mode."""
+    if input_config.fingerprint_mode == example_gen_pb2.Input.CONTENT_HASH:
+      return io_utils.generate_content_fingerprint(
+          split_name, pattern,
+          self._get_digest_cache_file(pattern, pipeline_info))
+    return io_utils.generate_fingerprint(split_name, pattern)
+
+  def _register_input(self, single_input: types.Artifact, fingerprint: Text,
+                      span: Text) -> None:
+    """Sets input to the artifact of the same fingerprint and span if any.
+
+    Otherwise a new artifact is registered.
+
+    Args:
+      single_input: input artifact, updated in place.
+      fingerprint: fingerprint of input files.
+      span: span number of input files.
+    """
+    single_input.set_string_custom_property(_FINGERPRINT, fingerprint)
+    single_input.set_string_custom_property(_SPAN, span)
+
+    matched_artifacts = []
+    for artifact in self._metadata_handler.get_artifacts_by_uri(
+        single_input.uri):
+      if (artifact.custom_properties[_FINGERPRINT].string_value ==
+          fingerprint) and (artifact.custom_properties[_SPAN].string_value
+                            == span):
+        matched_artifacts.append(artifact)
+
+    if matched_artifacts:
+      # TODO(b/138845899): consider use span instead of id.
+      # If there are multiple matches, get the latest one for caching.
+      # Using id because spans are the same for matched artifacts.
+      latest_artifact = max(
+          matched_artifacts, key=lambda artifact: artifact.id)
+      tf.logging.info('latest_artifact %s.' % (latest_artifact))
+      tf.logging.info('type(latest_artifact) %s.' % (type(latest_artifact)))
+
+      single_input.set_artifact(latest_artifact)
+    else:
+      # TODO(jyzhao): whether driver should be read-only for metadata.
+      [new_artifact] = self._metadata_handler.publish_artifacts(
+          [single_input])  # pylint: disable=unbalanced-tuple-unpacking
+      tf.logging.info('Registered new input: %s' % (new_artifact))
+      single_input.set_artifact(new_artifact)
+
+  def _resolve_span_range(
+      self, single_input: types.Artifact, input_config: example_gen_pb2.Input,
+      pipeline_info: Optional[data_types.PipelineInfo]
+  ) -> List[types.Artifact]:
+    """Registers an input artifact for each span in the range config."""
+    span_inputs = []
+    for span in self._select_spans(input_config, single_input.uri):
+      span_input = copy.deepcopy(single_input)
+      split_fingerprints = []
+      for split in input_config.splits:
+        pattern = os.path.join(single_input.uri,
+                               split.pattern.replace(_SPAN_SPEC, span))
+        split_fingerprints.append(
+            self._get_split_fingerprint(input_config, split.name, pattern,
+                                        pipeline_info))
+      self._register_input(span_input, '\n'.join(split_fingerprints), span)
+      tf.logging.info('Resolved input of span %s: %s' % (span, span_input))
+      span_inputs.append(span_input)
+    return span_inputs
+
   def resolve_input_artifacts(
       self,
       input_channels: Dict[Text, types.Channel],
@@ -100,12 +281,24 @@ class Driver(base_driver.BaseDriver):
   ) -> Dict[Text, List[types.Artifact]]:
     """Overrides BaseDriver.resolve_input_artifacts()."""
     del driver_args  # unused
-    del pipeline_info  # unused
 
     input_config = example_gen_pb2.Input()
     json_format.Parse(exec_properties['input_config'], input_config)
 
     input_dict = channel_utils.unwrap_channel_dict(input_channels)
+    self._span_inputs = []
+    self._exec_properties = exec_properties
+    if input_config.HasField('range_config'):
+      # Patterns keep {SPAN}, the executor resolves it for each input span.
+      for key, input_list in input_dict.items():
+        input_dict[key] = [
+            span_input for single_input in input_list
+            for span_input in self._resolve_span_range(
+                single_input, input_config, pipeline_info)
+        ]
+        self._span_inputs.extend(input_dict[key])
+      return input_dict
+
     for input_list in input_dict.values():
       for single_input in input_list:
         tf.logging.info('Processing input %s.' % (single_input.uri))
@@ -131,38 +324,129 @@ class Driver(base_driver.BaseDriver):
 
           pattern = os.path.join(single_input.uri, split.pattern)
           split_fingerprints.append(
-              io_utils.generate_fingerprint(split.name, pattern))
+              self._get_split_fingerprint(input_config, split.name, pattern,
+                                          pipeline_info))
         fingerprint = '\n'.join(split_fingerprints)
-        single_input.set_string_custom_property(_FINGERPRINT, fingerprint)
         if select_span is None:
           select_span = '0'
-        single_input.set_string_custom_property(_SPAN, select_span)
-
-        matched_artifacts = []
-        for artifact in self._metadata_handler.get_artifacts_by_uri(
-            single_input.uri):
-          if (artifact.custom_properties[_FINGERPRINT].string_value ==
-              fingerprint) and (artifact.custom_properties[_SPAN].string_value
-                                == select_span):
-            matched_artifacts.append(artifact)
-
-        if matched_artifacts:
-          # TODO(b/138845899): consider use span instead of id.
-          # If there are multiple matches, get the latest one for caching.
-          # Using id because spans are the same for matched artifacts.
-          latest_artifact = max(
-              matched_artifacts, key=lambda artifact: artifact.id)
-          tf.logging.info('latest_artifact %s.' % (latest_artifact))
-          tf.logging.info('type(latest_artifact) %s.' % (type(latest_artifact)))
-
-          single_input.set_artifact(latest_artifact)
-        else:
-          # TODO(jyzhao): whether driver should be read-only for metadata.
-          [new_artifact] = self._metadata_handler.publish_artifacts(
-              [single_input])  # pylint: disable=unbalanced-tuple-unpacking
-          tf.logging.info('Registered new input: %s' % (new_artifact))
-          single_input.set_artifact(new_artifact)
+        self._register_input(single_input, fingerprint, select_span)
 
     exec_properties['input_config'] = json_format.MessageToJson(
         input_config, sort_keys=True)
     return input_dict
+
+  def _get_generation_key(self, span_input: types.Artifact,
+                          output: types.Artifact,
+                          pipeline_info: data_types.PipelineInfo,
+                          component_info: data_types.ComponentInfo) -> Text:
+    """Returns the key of examples generated for a split of an input span.
+
+    The key covers the pipeline and component identity, the input artifact,
+    which changes with input files, and all execution properties but the input
+    config, as the selected range of spans does not change the examples of each
+    span.
+    """
+    exec_properties = {
+        key: value
+        for key, value in self._exec_properties.items()
+        if key != 'input_config'
+    }
+    return hashlib.sha256(
+        tf.compat.as_bytes(
+            json.dumps({
+                'pipeline_name': pipeline_info.pipeline_name,
+                'pipeline_root': pipeline_info.pipeline_root,
+                'component_id': component_info.component_id,
+                'input_artifact_id': span_input.id,
+                'split': output.split,
+                'exec_properties': exec_properties,
+            },
+                       sort_keys=True,
+                       default=str))).hexdigest()
+
+  def _expand_outputs_by_span(
+      self, output_dict: Dict[Text, types.Channel]
+  ) -> Dict[Text, List[types.Artifact]]:
+    """Copies each output artifact for each input span."""
+    result = channel_utils.unwrap_channel_dict(output_dict)
+    if not self._span_inputs:
+      return result
+    for name, output_list in result.items():
+      span_outputs = []
+      for span_input in self._span_inputs:
+        for output in output_list:
+          span_output = copy.deepcopy(output)
+          span_output.span = int(
+              span_input.artifact.custom_properties[_SPAN].string_value)
+          span_outputs.append(span_output)
+      result[name] = span_outputs
+    return result
+
+  def _prepare_output_artifacts(
+      self,
+      output_dict: Dict[Text, types.Channel],
+      execution_id: int,
+      pipeline_info: data_types.PipelineInfo,
+      component_info: data_types.ComponentInfo,
+  ) -> Dict[Text, List[types.Artifact]]:
+    """Overrides BaseDriver._prepare_output_artifacts().
+
+    When a range of spans is processed, there is an output artifact for each
+    split of each span. Outputs of an input span which were generated by a
+    previous execution with the same configuration point to the previous
+    examples, so that only new or changed spans are generated. Previous
+    outputs are looked up among the outputs of previous executions of this
+    component.
+    """
+    result = super(Driver, self)._prepare_output_artifacts(
+        output_dict, execution_id, pipeline_info, component_info)
+    if not self._span_inputs:
+      return result
+
+    split_uris = {}
+    for name, output_list in result.items():
+      for output in output_list:
+        split_uris[(name, output.split)] = output.uri
+    span_inputs = {
+        int(span_input.artifact.custom_properties[_SPAN].string_value):
+        span_input for span_input in self._span_inputs
+    }
+    result = self._expand_outputs_by_span(output_dict)
+    for name, output_list in result.items():
+      if not output_list:
+        continue
+      # Artifacts are ordered by id, so the latest output of a key is kept.
+      previous_outputs = {
+          artifact.custom_properties[_GENERATION_KEY].string_value: artifact
+          for artifact in self._metadata_handler.get_previous_output_artifacts(
+              name, pipeline_info, component_info)
+      }
+      for output in output_list:
+        generation_key = self._get_generation_key(
+            span_inputs[output.span], output, pipeline_info, component_info)
+        output.set_string_custom_property(_GENERATION_KEY, generation_key)
+        previous_output = previous_outputs.get(generation_key)
+        if previous_output and tf.io.gfile.exists(previous_output.uri):
+          tf.logging.info('Reusing examples of span %s split %s from %s' %
+                          (output.span, output.split, previous_output.uri))
+          output.uri = previous_output.uri
+          output.set_int_custom_property(utils.CACHED_FROM_PROPERTY_NAME,
+                                         previous_output.id)
+          if (artifact_utils.COMPRESSION_PROPERTY_NAME in
+              previous_output.custom_properties):
+            output.set_string_custom_property(
+                artifact_utils.COMPRESSION_PROPERTY_NAME,
+                previous_output.custom_properties[
+                    artifact_utils.COMPRESSION_PROPERTY_NAME].string_value)
+        else:
+          output.uri = os.path.join(split_uris[(name, output.split)],
+                                    'span_%d' % output.span, '')
+          tf.io.gfile.makedirs(output.uri)
+    return result
+
+  def _fetch_cached_artifacts(
+      self, output_dict: Dict[Text, types.Channel],
+      cached_execution_id: int) -> Dict[Text, List[types.Artifact]]:
+    """Overrides BaseDriver._fetch_cached_artifacts()."""
+    return self._metadata_handler.fetch_previous_result_artifacts(
+        self._expand_outputs_by_span(output_dict), cached_execution_id)
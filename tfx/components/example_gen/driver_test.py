@@ -23,6 +23,7 @@ import tensorflow as tf
 from google.protobuf import json_format
 from ml_metadata.proto import metadata_store_pb2
 from tfx.components.example_gen import driver
+from tfx.orchestration import data_types
 from tfx.proto import example_gen_pb2
 from tfx.types import channel_utils
 from tfx.types import standard_artifacts
@@ -188,6 +189,152 @@ class DriverTest(tf.test.TestCase):
           pattern: "span02/split2/*"
         }""", updated_input_config)
 
+  def testRetrieveLatestSpanFromDirectories(self):
+    for span in ['01', '02', '10']:
+      io_utils.write_string_file(
+          os.path.join(self._input_base_path, 'span' + span, 'split1', 'data'),
+          'testing')
+    # Latest span directory without files matching the split is skipped.
+    io_utils.write_string_file(
+        os.path.join(self._input_base_path, 'span11', 'other', 'data'),
+        'testing')
+    split = example_gen_pb2.Input.Split(
+        name='s1', pattern='span{SPAN}/split1/*')
+
+    with tf.test.mock.patch.object(
+        tf.io.gfile, 'glob', wraps=tf.io.gfile.glob) as mock_glob:
+      self.assertEqual(
+          '10',
+          self._example_gen_driver._retrieve_latest_span(
+              self._input_base_path, split))
+      # One listing of span directories, then files of span 11 and span 10.
+      self.assertEqual(3, mock_glob.call_count)
+
+  def _createSpans(self, spans):
+    for span in spans:
+      for split in ['split1', 'split2']:
+        io_utils.write_string_file(
+            os.path.join(self._input_base_path, 'span' + span, split, 'data'),
+            'testing' + span)
+
+  def _resolveSpanRange(self, range_config):
+    input_config = example_gen_pb2.Input()
+    json_format.Parse(self._exec_properties['input_config'], input_config)
+    input_config.range_config.CopyFrom(range_config)
+    self._exec_properties['input_config'] = json_format.MessageToJson(
+        input_config)
+
+    # Registers a new input artifact with the next id for each span.
+    def publish_artifacts(artifacts):
+      for artifact in artifacts:
+        artifact.id = self._mock_metadata.publish_artifacts.call_count
+      return [artifact.artifact for artifact in artifacts]
+
+    self._mock_metadata.get_artifacts_by_uri.return_value = []
+    self._mock_metadata.publish_artifacts.side_effect = publish_artifacts
+    return self._example_gen_driver.resolve_input_artifacts(
+        self._input_channels, self._exec_properties, None, None)
+
+  def testResolveInputArtifactsWithSpanRange(self):
+    self._createSpans(['01', '02', '03'])
+
+    # Static range.
+    input_dict = self._resolveSpanRange(
+        example_gen_pb2.RangeConfig(
+            static_range=example_gen_pb2.RangeConfig.StaticRange(
+                start_span_number=1, end_span_number=2)))
+    self.assertEqual(['01', '02'], [
+        artifact.artifact.custom_properties['span'].string_value
+        for artifact in input_dict['input_base']
+    ])
+    self.assertEqual([1, 2],
+                     [artifact.id for artifact in input_dict['input_base']])
+    # Spans are fingerprinted separately.
+    self.assertIn(
+        'total_bytes:9', input_dict['input_base'][0].artifact
+        .custom_properties['input_fingerprint'].string_value)
+    # Patterns are resolved by the executor for each span.
+    input_config = example_gen_pb2.Input()
+    json_format.Parse(self._exec_properties['input_config'], input_config)
+    self.assertEqual('span{SPAN}/split1/*', input_config.splits[0].pattern)
+
+    # Rolling range.
+    input_dict = self._resolveSpanRange(
+        example_gen_pb2.RangeConfig(
+            rolling_range=example_gen_pb2.RangeConfig.RollingRange(
+                num_spans=2)))
+    self.assertEqual(['02', '03'], [
+        artifact.artifact.custom_properties['span'].string_value
+        for artifact in input_dict['input_base']
+    ])
+
+  def testResolveInputArtifactsWithSpanRangeNotAligned(self):
+    self._createSpans(['01', '02'])
+    io_utils.write_string_file(
+        os.path.join(self._input_base_path, 'span03', 'split1', 'data'),
+        'testing03')
+
+    with self.assertRaisesRegexp(ValueError,
+                                 'Spans should be the same for each split'):
+      self._resolveSpanRange(
+          example_gen_pb2.RangeConfig(
+              rolling_range=example_gen_pb2.RangeConfig.RollingRange(
+                  num_spans=2)))
+
+  def testPrepareOutputArtifactsWithSpanRange(self):
+    self._createSpans(['01', '02'])
+    self._resolveSpanRange(
+        example_gen_pb2.RangeConfig(
+            static_range=example_gen_pb2.RangeConfig.StaticRange(
+                start_span_number=1, end_span_number=2)))
+
+    pipeline_root = os.path.join(
+        os.path.dirname(self._input_base_path), 'pipeline_root')
+    pipeline_info = data_types.PipelineInfo(
+        pipeline_name='p', pipeline_root=pipeline_root, run_id='r')
+    component_info = data_types.ComponentInfo(
+        component_type='c', component_id='example_gen')
+    output_channels = {
+        'examples':
+            channel_utils.as_channel([
+                standard_artifacts.Examples(split='train'),
+                standard_artifacts.Examples(split='eval')
+            ])
+    }
+
+    # Examples of span 1 were generated by a previous execution.
+    self._mock_metadata.get_previous_output_artifacts.return_value = []
+    previous_outputs = self._example_gen_driver._prepare_output_artifacts(
+        output_channels, 1, pipeline_info, component_info)['examples']
+    self.assertEqual([(1, 'train'), (1, 'eval'), (2, 'train'), (2, 'eval')],
+                     [(output.span, output.split)
+                      for output in previous_outputs])
+    for index, output in enumerate(previous_outputs):
+      output.id = index + 1
+      output.state = 'published'
+    self._mock_metadata.get_previous_output_artifacts.return_value = [
+        output.artifact for output in previous_outputs[:2]
+    ]
+
+    outputs = self._example_gen_driver._prepare_output_artifacts(
+        output_channels, 2, pipeline_info, component_info)['examples']
+    self.assertEqual(previous_outputs[0].uri, outputs[0].uri)
+    self.assertEqual(
+        1, outputs[0].artifact.custom_properties['cached_from'].int_value)
+    self.assertEqual(
+        os.path.join(pipeline_root, 'example_gen', 'examples', '2', 'train',
+                     'span_2', ''), outputs[2].uri)
+    self.assertNotIn('cached_from', outputs[2].artifact.custom_properties)
+    self._mock_metadata.get_previous_output_artifacts.assert_called_with(
+        'examples', pipeline_info, component_info)
+
+    # Examples generated by another pipeline are not reused.
+    other_pipeline_info = data_types.PipelineInfo(
+        pipeline_name='other', pipeline_root=pipeline_root, run_id='r')
+    outputs = self._example_gen_driver._prepare_output_artifacts(
+        output_channels, 3, other_pipeline_info, component_info)['examples']
+    self.assertNotIn('cached_from', outputs[0].artifact.custom_properties)
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -41,6 +41,7 @@ class ImportExampleGen(component.FileBasedExampleGen):  # pylint: disable=protec
                input_base: types.Channel = None,
                input_config: Optional[example_gen_pb2.Input] = None,
                output_config: Optional[example_gen_pb2.Output] = None,
+               custom_config: Optional[example_gen_pb2.CustomConfig] = None,
                example_artifacts: Optional[types.Channel] = None,
                input: Optional[types.Channel] = None,  # pylint: disable=redefined-builtin
                instance_name: Optional[Text] = None):
@@ -56,6 +57,9 @@ class ImportExampleGen(component.FileBasedExampleGen):  # pylint: disable=protec
       output_config: An example_gen_pb2.Output instance, providing output
         configuration. If unset, default splits will be 'train' and 'eval' with
         size 2:1.
+      custom_config: An optional example_gen_pb2.CustomConfig instance holding
+        an example_gen_pb2.ImportConfig, e.g. to pass records through without
+        parsing them.
       example_artifacts: Optional channel of 'ExamplesPath' for output train and
         eval examples.
       input: Forwards compatibility alias for the 'input_base' argument.
@@ -66,6 +70,7 @@ class ImportExampleGen(component.FileBasedExampleGen):  # pylint: disable=protec
         input_base=input_base,
         input_config=input_config,
         output_config=output_config,
+        custom_config=custom_config,
         example_artifacts=example_artifacts,
         input=input,
         instance_name=instance_name)
@@ -19,36 +19,50 @@ from __future__ import print_function
 
 import os
 import apache_beam as beam
+from concurrent import futures
 import tensorflow as tf
 
-from typing import Any, Dict, List, Text
+from typing import Any, Dict, List, Optional, Text
 from tfx import types
 from tfx.components.example_gen import base_example_gen_executor
+from tfx.components.example_gen import utils
+from tfx.proto import example_gen_pb2
 from tfx.types import artifact_utils
+from google.protobuf import json_format
+
+# Maximum number of files copied concurrently.
+_MAX_COPY_WORKERS = 16
 
 
 @beam.ptransform_fn
 @beam.typehints.with_input_types(beam.Pipeline)
-@beam.typehints.with_output_types(tf.train.Example)
+@beam.typehints.with_output_types(
+    beam.typehints.Union[tf.train.Example, bytes])
 def _ImportExample(  # pylint: disable=invalid-name
     pipeline: beam.Pipeline,
     input_dict: Dict[Text, List[types.Artifact]],
-    exec_properties: Dict[Text, Any],  # pylint: disable=unused-argument
+    exec_properties: Dict[Text, Any],
     split_pattern: Text) -> beam.pvalue.PCollection:
   """Read TFRecord files to PCollection of TF examples.
 
   Note that each input split will be transformed by this function separately.
+  Records are parsed as TF examples, unless passthrough_records is set in an
+  example_gen_pb2.ImportConfig given as custom_config, in which case they are
+  output as read.
 
   Args:
     pipeline: beam pipeline.
     input_dict: Input dict from input key to a list of Artifacts.
       - input_base: input dir that contains tf example data.
     exec_properties: A dict of execution properties.
+      - custom_config: optional JSON string of example_gen_pb2.CustomConfig
+        holding an example_gen_pb2.ImportConfig.
     split_pattern: Split.pattern in Input config, glob relative file pattern
       that maps to input files with root directory given by input_base.
 
   Returns:
-    PCollection of TF examples.
+    PCollection of TF examples, or of serialized TF examples if records are
+    passed through.
   """
   input_base_uri = artifact_utils.get_single_uri(input_dict['input_base'])
   input_split_pattern = os.path.join(input_base_uri, split_pattern)
@@ -56,17 +70,144 @@ def _ImportExample(  # pylint: disable=invalid-name
       'Reading input TFExample data {}.'.format(input_split_pattern))
 
   # TODO(jyzhao): profile input examples.
-  return (pipeline
-          # TODO(jyzhao): support multiple input format.
-          | 'ReadFromTFRecord' >>
-          beam.io.ReadFromTFRecord(file_pattern=input_split_pattern)
-          # TODO(jyzhao): consider move serialization out of base example gen.
-          | 'ToTFExample' >> beam.Map(tf.train.Example.FromString))
+  # TODO(jyzhao): support multiple input format.
+  records = (
+      pipeline
+      | 'ReadFromTFRecord' >>
+      beam.io.ReadFromTFRecord(file_pattern=input_split_pattern))
+  if _GetImportConfig(exec_properties).passthrough_records:
+    return records
+  # TODO(jyzhao): consider move serialization out of base example gen.
+  return records | 'ToTFExample' >> beam.Map(tf.train.Example.FromString)
+
+
+def _GetImportConfig(
+    exec_properties: Dict[Text, Any]) -> example_gen_pb2.ImportConfig:
+  """Returns the ImportConfig given as custom_config, default if none."""
+  import_config = example_gen_pb2.ImportConfig()
+  if exec_properties.get('custom_config'):
+    custom_config = example_gen_pb2.CustomConfig()
+    json_format.Parse(exec_properties['custom_config'], custom_config)
+    custom_config.custom_config.Unpack(import_config)
+  return import_config
+
+
+def _GetFilesToCopy(input_base_uri: Text, input_config: example_gen_pb2.Input,
+                    output_config: example_gen_pb2.Output
+                   ) -> Optional[Dict[Text, List[Text]]]:
+  """Returns input files of each split if they can be copied as outputs.
+
+  Files can be copied when a single span is processed, output splits are the
+  input splits, and records need not be shuffled, re-sharded or re-compressed.
+
+  Args:
+    input_base_uri: input dir that contains tf example data.
+    input_config: example_gen_pb2.Input instance.
+    output_config: example_gen_pb2.Output instance.
+
+  Returns:
+    Dict from split name to sorted input files, or None if the files can not
+    be copied.
+  """
+  if (input_config.HasField('range_config') or
+      output_config.split_config.splits or not output_config.disable_shuffle or
+      output_config.num_shards):
+    return None
+  compression_type, _ = base_example_gen_executor._COMPRESSIONS[  # pylint: disable=protected-access
+      output_config.compression]
+  split_names = utils.generate_output_split_names(input_config, output_config)
+  result = {}
+  for split_name, split in zip(split_names, input_config.splits):
+    files = sorted(
+        tf.io.gfile.glob(os.path.join(input_base_uri, split.pattern)))
+    if not files or any(
+        beam.io.filesystem.CompressionTypes.detect_compression_type(f) !=
+        compression_type for f in files):
+      return None
+    result[split_name] = files
+  return result
+
+
+def _CopySplitFiles(files: List[Text], output_split_path: Text,
+                    file_name_suffix: Text) -> None:
+  """Copies files of a split in parallel, named like sharded Beam outputs."""
+  tf.io.gfile.makedirs(output_split_path)
+  num_shards = len(files)
+  with futures.ThreadPoolExecutor(
+      max_workers=min(num_shards, _MAX_COPY_WORKERS)) as pool:
+    copies = [
+        pool.submit(
+            tf.io.gfile.copy, f,
+            os.path.join(
+                output_split_path, '{}-{:05d}-of-{:05d}{}'.format(
+                    base_example_gen_executor.DEFAULT_FILE_NAME, shard,
+                    num_shards, file_name_suffix)), True)
+        for shard, f in enumerate(files)
+    ]
+    for copy in copies:
+      copy.result()
 
 
 class Executor(base_example_gen_executor.BaseExampleGenExecutor):
-  """Generic TFX import example gen executor."""
+  """Generic TFX import example gen executor.
+
+  Records are parsed and serialized again, see _ImportExample. If
+  passthrough_records is set in the ImportConfig, records are imported as
+  serialized bytes without parsing, and if in addition no output split config
+  is given, shuffle is disabled, the number of shards is not set and the input
+  files are compressed as configured for outputs, input files are copied as is
+  instead of running a Beam pipeline.
+  """
 
   def GetInputSourceToExamplePTransform(self) -> beam.PTransform:
-    """Returns PTransform for importing TF examples."""
+    """Returns PTransform for importing serialized TF examples."""
     return _ImportExample
+
+  def Do(self, input_dict: Dict[Text, List[types.Artifact]],
+         output_dict: Dict[Text, List[types.Artifact]],
+         exec_properties: Dict[Text, Any]) -> None:
+    """Imports TF examples, copying input files if allowed and possible.
+
+    Args:
+      input_dict: Input dict from input key to a list of Artifacts.
+        - input_base: input dir that contains tf example data.
+      output_dict: Output dict from output key to a list of Artifacts.
+        - examples: splits of tf examples.
+      exec_properties: A dict of execution properties.
+        - input: JSON string of example_gen_pb2.Input instance, providing input
+          configuration.
+        - output: JSON string of example_gen_pb2.Output instance, providing
+          output configuration.
+        - custom_config: optional JSON string of example_gen_pb2.CustomConfig
+          holding an example_gen_pb2.ImportConfig.
+
+    Returns:
+      None
+    """
+    input_config = example_gen_pb2.Input()
+    json_format.Parse(exec_properties['input_config'], input_config)
+    output_config = example_gen_pb2.Output()
+    json_format.Parse(exec_properties['output_config'], output_config)
+
+    files_to_copy = None
+    if _GetImportConfig(exec_properties).passthrough_records:
+      files_to_copy = _GetFilesToCopy(
+          artifact_utils.get_single_uri(input_dict['input_base']), input_config,
+          output_config)
+    if files_to_copy is None:
+      super(Executor, self).Do(input_dict, output_dict, exec_properties)
+      return
+
+    self._log_startup(input_dict, output_dict, exec_properties)
+    _, file_name_suffix = base_example_gen_executor._COMPRESSIONS[  # pylint: disable=protected-access
+        output_config.compression]
+    for split_name, files in files_to_copy.items():
+      tf.logging.info('Copying {} files of split {}.'.format(
+          len(files), split_name))
+      _CopySplitFiles(
+          files,
+          artifact_utils.get_split_uri(output_dict['examples'], split_name),
+          file_name_suffix)
+    base_example_gen_executor._SetCompressionProperty(  # pylint: disable=protected-access
+        output_dict['examples'], output_config)
+    tf.logging.info('Examples generated.')
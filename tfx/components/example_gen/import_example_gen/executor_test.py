@@ -23,7 +23,9 @@ from apache_beam.testing import util
 import tensorflow as tf
 from tfx.components.example_gen.import_example_gen import executor
 from tfx.proto import example_gen_pb2
+from tfx.types import artifact_utils
 from tfx.types import standard_artifacts
+from google.protobuf import any_pb2
 from google.protobuf import json_format
 
 
@@ -38,6 +40,12 @@ class ExecutorTest(tf.test.TestCase):
     input_base.uri = os.path.join(input_data_dir, 'external')
     self._input_dict = {'input_base': [input_base]}
 
+  def _MakePassthroughConfig(self):
+    custom_config = example_gen_pb2.CustomConfig(custom_config=any_pb2.Any())
+    custom_config.custom_config.Pack(
+        example_gen_pb2.ImportConfig(passthrough_records=True))
+    return json_format.MessageToJson(custom_config)
+
   def testImportExample(self):
     with beam.Pipeline() as pipeline:
       examples = (
@@ -55,6 +63,24 @@ class ExecutorTest(tf.test.TestCase):
 
       util.assert_that(examples, check_result)
 
+  def testImportExamplePassthrough(self):
+    with beam.Pipeline() as pipeline:
+      examples = (
+          pipeline
+          | 'ToSerializedTFExample' >> executor._ImportExample(
+              input_dict=self._input_dict,
+              exec_properties={'custom_config': self._MakePassthroughConfig()},
+              split_pattern='tfrecord/*'))
+
+      def check_result(got):
+        # We use Python assertion here to avoid Beam serialization error in
+        # pickling tf.test.TestCase.
+        assert (15000 == len(got)), 'Unexpected example count'
+        assert (18 == len(tf.train.Example.FromString(
+            got[0]).features.feature)), 'Example not match'
+
+      util.assert_that(examples, check_result)
+
   def testDo(self):
     output_data_dir = os.path.join(
         os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
@@ -101,6 +127,110 @@ class ExecutorTest(tf.test.TestCase):
         tf.gfile.GFile(train_output_file).size(),
         tf.gfile.GFile(eval_output_file).size())
 
+  def testDoCopyFiles(self):
+    output_data_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+
+    # Create output dict.
+    examples = standard_artifacts.Examples(split='tfrecord')
+    examples.uri = os.path.join(output_data_dir, 'tfrecord')
+    output_dict = {'examples': [examples]}
+
+    # Create exec proterties.
+    exec_properties = {
+        'input_config':
+            json_format.MessageToJson(
+                example_gen_pb2.Input(splits=[
+                    example_gen_pb2.Input.Split(
+                        name='tfrecord', pattern='tfrecord/*'),
+                ])),
+        'output_config':
+            json_format.MessageToJson(
+                example_gen_pb2.Output(disable_shuffle=True)),
+        'custom_config': self._MakePassthroughConfig()
+    }
+
+    # Run executor.
+    import_example_gen = executor.Executor()
+    import_example_gen.Do(self._input_dict, output_dict, exec_properties)
+
+    # Check input files are copied as is.
+    input_files = sorted(
+        tf.gfile.Glob(
+            os.path.join(self._input_dict['input_base'][0].uri,
+                         'tfrecord/*')))
+    self.assertEqual(2, len(input_files))
+    for shard, input_file in enumerate(input_files):
+      output_file = os.path.join(
+          examples.uri, 'data_tfrecord-{:05d}-of-00002.gz'.format(shard))
+      with tf.gfile.GFile(input_file, 'rb') as expected, tf.gfile.GFile(
+          output_file, 'rb') as got:
+        self.assertEqual(expected.read(), got.read())
+    self.assertEqual(
+        'GZIP', examples.artifact.custom_properties[
+            artifact_utils.COMPRESSION_PROPERTY_NAME].string_value)
+
+  def testDoCopyUncompressedFiles(self):
+    output_data_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+
+    # Create uncompressed input files.
+    input_base = standard_artifacts.ExternalArtifact()
+    input_base.uri = os.path.join(output_data_dir, 'input')
+    tf.gfile.MakeDirs(os.path.join(input_base.uri, 'tfrecord'))
+    options = tf.python_io.TFRecordOptions(
+        tf.python_io.TFRecordCompressionType.GZIP)
+    for shard, input_file in enumerate(
+        sorted(
+            tf.gfile.Glob(
+                os.path.join(self._input_dict['input_base'][0].uri,
+                             'tfrecord/*')))):
+      with tf.python_io.TFRecordWriter(
+          os.path.join(input_base.uri, 'tfrecord',
+                       'shard{}'.format(shard))) as writer:
+        for record in tf.python_io.tf_record_iterator(input_file, options):
+          writer.write(record)
+
+    # Create output dict.
+    examples = standard_artifacts.Examples(split='tfrecord')
+    examples.uri = os.path.join(output_data_dir, 'tfrecord')
+    output_dict = {'examples': [examples]}
+
+    # Create exec proterties.
+    exec_properties = {
+        'input_config':
+            json_format.MessageToJson(
+                example_gen_pb2.Input(splits=[
+                    example_gen_pb2.Input.Split(
+                        name='tfrecord', pattern='tfrecord/*'),
+                ])),
+        'output_config':
+            json_format.MessageToJson(
+                example_gen_pb2.Output(
+                    disable_shuffle=True,
+                    compression=example_gen_pb2.Output.UNCOMPRESSED)),
+        'custom_config': self._MakePassthroughConfig()
+    }
+
+    # Run executor.
+    import_example_gen = executor.Executor()
+    import_example_gen.Do({'input_base': [input_base]}, output_dict,
+                          exec_properties)
+
+    # Check input files are copied and readers see them as uncompressed.
+    self.assertItemsEqual(
+        ['data_tfrecord-00000-of-00002', 'data_tfrecord-00001-of-00002'],
+        tf.gfile.ListDirectory(examples.uri))
+    self.assertEqual(
+        'UNCOMPRESSED', examples.artifact.custom_properties[
+            artifact_utils.COMPRESSION_PROPERTY_NAME].string_value)
+    self.assertEqual(
+        '',
+        artifact_utils.get_split_compression_type(output_dict['examples'],
+                                                  'tfrecord'))
+
 
 if __name__ == '__main__':
   tf.test.main()
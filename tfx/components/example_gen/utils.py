@@ -19,12 +19,21 @@ from __future__ import print_function
 
 import six
 import tensorflow as tf
-from typing import Any, Dict, List, Text
+from typing import Any, Dict, List, Optional, Text
 from tfx.proto import example_gen_pb2
+from google.protobuf import json_format
 
 
 _DEFAULT_ENCODING = 'utf-8'
 
+# Span spec used in split pattern.
+SPAN_SPEC = '{SPAN}'
+# Custom property of input artifacts holding the span number.
+SPAN_PROPERTY_NAME = 'span'
+# Custom property of output artifacts which reuse the examples of a previous
+# execution, holding the id of the reused artifact.
+CACHED_FROM_PROPERTY_NAME = 'cached_from'
+
 
 def dict_to_example(instance: Dict[Text, Any]) -> tf.train.Example:
   """Converts dict to tf example."""
@@ -64,6 +73,38 @@ def dict_to_example(instance: Dict[Text, Any]) -> tf.train.Example:
   return tf.train.Example(features=tf.train.Features(feature=feature))
 
 
+def get_partition_feature_name(
+    exec_properties: Dict[Text, Any]) -> Optional[Text]:
+  """Returns the feature output splits are partitioned by, None if unset.
+
+  Converters producing serialized examples should then output
+  (partition key, serialized example) pairs, with the key computed by
+  get_partition_key before serialization, so that examples need not be parsed
+  again for partitioning.
+
+  Args:
+    exec_properties: A dict of execution properties, with an optional
+      'output_config' JSON string of example_gen_pb2.Output.
+
+  Returns:
+    Name of the partition feature, or None.
+  """
+  if not exec_properties.get('output_config'):
+    return None
+  output_config = example_gen_pb2.Output()
+  json_format.Parse(exec_properties['output_config'], output_config)
+  return output_config.split_config.partition_feature_name or None
+
+
+def get_partition_key(example: tf.train.Example, feature_name: Text) -> bytes:
+  """Returns serialized value of the partition feature of an example."""
+  if feature_name not in example.features.feature:
+    raise RuntimeError(
+        'Partition feature {} is missing in example.'.format(feature_name))
+  return example.features.feature[feature_name].SerializeToString(
+      deterministic=True)
+
+
 def generate_output_split_names(input_config: example_gen_pb2.Input,
                                 output_config: example_gen_pb2.Output
                                ) -> List[Text]:
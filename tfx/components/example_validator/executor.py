@@ -24,6 +24,7 @@ from typing import Any, Dict, List, Text
 from tfx import types
 from tfx.components.base import base_executor
 from tfx.components.example_validator import labels
+from tfx.components.statistics_gen import stats_utils
 from tfx.components.util import value_utils
 from tfx.types import artifact_utils
 from tfx.utils import io_utils
@@ -58,7 +59,31 @@ class Executor(base_executor.BaseExecutor):
     """
     self._log_startup(input_dict, output_dict, exec_properties)
 
+    output_uri = artifact_utils.get_single_uri(output_dict['output'])
+    # Anomalies are a pure function of the inputs, so they are restored from
+    # the result cache for inputs already seen.
+    cache = self._get_result_cache()
+    if cache:
+      cache_key = cache.get_key(
+          'ExampleValidator@tfdv-{}'.format(tfdv.__version__), input_dict,
+          exec_properties)
+      if cache.restore(cache_key, output_dict):
+        tf.logging.info(
+            'Anomalies restored from cache to {}.'.format(output_uri))
+        return
+
     tf.logging.info('Validating schema against the computed statistics.')
+    for artifact in input_dict['stats']:
+      if (artifact.split == 'eval' and
+          stats_utils.get_sample_fraction(artifact) < 1):
+        tf.logging.warning(
+            'Statistics are computed over a sample of {} of examples, '
+            'anomalies of rare values may be missed.'.format(
+                stats_utils.get_sample_fraction(artifact)))
+      if artifact.split == 'eval' and stats_utils.is_partial(artifact):
+        tf.logging.warning(
+            'Statistics are merged from several spans without top values and '
+            'histograms, anomalies based on them are not detected.')
     label_inputs = {
         labels.STATS:
             tfdv.load_statistics(
@@ -69,11 +94,12 @@ class Executor(base_executor.BaseExecutor):
                 io_utils.get_only_uri_in_dir(
                     artifact_utils.get_single_uri(input_dict['schema'])))
     }
-    output_uri = artifact_utils.get_single_uri(output_dict['output'])
     label_outputs = {labels.SCHEMA_DIFF_PATH: output_uri}
     self._Validate(label_inputs, label_outputs)
     tf.logging.info(
         'Validation complete. Anomalies written to {}.'.format(output_uri))
+    if cache:
+      cache.save(cache_key, output_dict)
 
   def _Validate(self, inputs: Dict[Text, Any], outputs: Dict[Text,
                                                              Any]) -> None:
@@ -18,6 +18,7 @@ from __future__ import division
 from __future__ import print_function
 
 import os
+import mock
 import tensorflow as tf
 from tensorflow_metadata.proto.v0 import anomalies_pb2
 from tfx import types
@@ -66,6 +67,52 @@ class ExecutorTest(tf.test.TestCase):
     self.assertNotEqual(0, len(anomalies.anomaly_info))
     # TODO(zhitaoli): Add comparison to expected anomolies.
 
+  def testDoWithResultCache(self):
+    source_data_dir = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'testdata')
+
+    eval_stats_artifact = types.Artifact('ExampleStatsPath', split='eval')
+    eval_stats_artifact.uri = os.path.join(source_data_dir,
+                                           'statistics_gen/eval/')
+
+    schema_artifact = standard_artifacts.Schema()
+    schema_artifact.uri = os.path.join(source_data_dir, 'schema_gen/')
+
+    output_data_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+
+    validation_output = standard_artifacts.ExampleAnomalies()
+    validation_output.uri = os.path.join(output_data_dir, 'output')
+
+    input_dict = {
+        'stats': [eval_stats_artifact],
+        'schema': [schema_artifact],
+    }
+    output_dict = {
+        'output': [validation_output],
+    }
+
+    exec_properties = {}
+
+    context = executor.Executor.Context(
+        cache_dir=os.path.join(output_data_dir, 'cache'))
+    executor.Executor(context).Do(input_dict, output_dict, exec_properties)
+
+    # Anomalies of the same statistics and schema are restored from the cache.
+    validation_output.uri = os.path.join(output_data_dir, 'output2')
+    with mock.patch.object(
+        executor.Executor,
+        '_Validate',
+        side_effect=AssertionError('Statistics are validated again')):
+      executor.Executor(context).Do(input_dict, output_dict, exec_properties)
+    self.assertEqual(['anomalies.pbtxt'],
+                     tf.gfile.ListDirectory(validation_output.uri))
+    anomalies = io_utils.parse_pbtxt_file(
+        os.path.join(validation_output.uri, 'anomalies.pbtxt'),
+        anomalies_pb2.Anomalies())
+    self.assertNotEqual(0, len(anomalies.anomaly_info))
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -88,7 +88,7 @@ class Executor(base_executor.BaseExecutor):
         return False
     return True
 
-  def _generate_blessing_result(self, eval_examples_uri: Text,
+  def _generate_blessing_result(self, eval_examples_uris: List[Text],
                                 slice_spec: List[tfma.slicer.SingleSliceSpec],
                                 current_model_dir: Text,
                                 blessed_model_dir: Text) -> bool:
@@ -98,9 +98,12 @@ class Executor(base_executor.BaseExecutor):
         self._temp_path, BLESSED_MODEL_EVAL_RESULT_PATH)
 
     with beam.Pipeline(argv=self._get_beam_pipeline_args()) as pipeline:
-      eval_data = (
-          pipeline | 'ReadData' >> beam.io.ReadFromTFRecord(
-              file_pattern=io_utils.all_files_pattern(eval_examples_uri)))
+      eval_data = ([
+          pipeline | 'ReadData[{}]'.format(index) >> beam.io.ReadFromTFRecord(
+              file_pattern=io_utils.all_files_pattern(uri))
+          for index, uri in enumerate(eval_examples_uris)
+      ]
+                   | 'FlattenData' >> beam.Flatten())
 
       current_model = tfma.default_eval_shared_model(
           eval_saved_model_path=path_utils.eval_model_path(current_model_dir))
@@ -162,8 +165,10 @@ class Executor(base_executor.BaseExecutor):
     self._temp_path = self._get_tmp_dir()
     tf.logging.info('Using temp path {} for tft.beam'.format(self._temp_path))
 
-    eval_examples_uri = artifact_utils.get_split_uri(input_dict['examples'],
-                                                     'eval')
+    # The eval split has an examples artifact for each span if a range of spans
+    # is generated, see example_gen_pb2.RangeConfig.
+    eval_examples_uris = artifact_utils.get_split_uris(input_dict['examples'],
+                                                       'eval')
     blessing = artifact_utils.get_single_instance(output_dict['blessing'])
 
     # Current model.
@@ -187,7 +192,7 @@ class Executor(base_executor.BaseExecutor):
     tf.logging.info('Validating model.')
     # TODO(b/125853306): support customized slice spec.
     blessed = self._generate_blessing_result(
-        eval_examples_uri=eval_examples_uri,
+        eval_examples_uris=eval_examples_uris,
         slice_spec=[tfma.slicer.slicer.SingleSliceSpec()],
         current_model_dir=current_model.uri,
         blessed_model_dir=blessed_model_dir)
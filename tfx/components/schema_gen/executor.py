@@ -24,6 +24,7 @@ from typing import Any, Dict, List, Text
 from tensorflow_metadata.proto.v0 import schema_pb2
 from tfx import types
 from tfx.components.base import base_executor
+from tfx.components.statistics_gen import stats_utils
 from tfx.types import artifact_utils
 from tfx.utils import io_utils
 
@@ -57,6 +58,17 @@ class Executor(base_executor.BaseExecutor):
         raise ValueError(
             'Schema is provided, but failed to read from %s.' % schema_uri)
 
+    for artifact in stats:
+      if (artifact.split == 'train' and
+          stats_utils.get_sample_fraction(artifact) < 1):
+        tf.logging.warning(
+            'Statistics are computed over a sample of {} of examples, '
+            'inferred schema is approximate.'.format(
+                stats_utils.get_sample_fraction(artifact)))
+      if artifact.split == 'train' and stats_utils.is_partial(artifact):
+        tf.logging.warning(
+            'Statistics are merged from several spans without top values and '
+            'histograms, inferred schema lacks domains of string features.')
     train_stats_uri = io_utils.get_only_uri_in_dir(
         artifact_utils.get_split_uri(stats, 'train'))
     infer_feature_shape = exec_properties['infer_feature_shape']
@@ -93,8 +105,21 @@ class Executor(base_executor.BaseExecutor):
         artifact_utils.get_single_uri(output_dict['output']),
         _DEFAULT_FILE_NAME)
 
+    # The schema is a pure function of the inputs, so it is restored from the
+    # result cache for inputs already seen.
+    cache = self._get_result_cache()
+    if cache:
+      cache_key = cache.get_key(
+          'SchemaGen@tfdv-{}'.format(tfdv.__version__), input_dict,
+          exec_properties)
+      if cache.restore(cache_key, output_dict):
+        tf.logging.info('Schema restored from cache to {}.'.format(output_uri))
+        return
+
     # Materializing schema as an output artifact from SchemaGen, in order to log
     # metadata of it in the same way regardless of inferred or fixed.
     io_utils.write_pbtxt_file(output_uri,
                               self._provide_schema(input_dict, exec_properties))
     tf.logging.info('Schema written to {}.'.format(output_uri))
+    if cache:
+      cache.save(cache_key, output_dict)
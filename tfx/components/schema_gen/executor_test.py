@@ -18,8 +18,10 @@ from __future__ import division
 from __future__ import print_function
 
 import os
+import mock
 import tensorflow as tf
 from tfx.components.schema_gen import executor
+from tfx.components.statistics_gen import stats_utils
 from tfx.types import standard_artifacts
 from tfx.utils import io_utils
 
@@ -74,6 +76,31 @@ class ExecutorTest(tf.test.TestCase):
     self.assertNotEqual(0, len(tf.gfile.ListDirectory(self.schema_output.uri)))
     self._assertSchemaEqual(self.expected_schema, self.schema_output)
 
+  def testDoWithPartialStatistics(self):
+    self.train_stats_artifact.set_int_custom_property(
+        stats_utils.PARTIAL_STATS_PROPERTY_NAME, 1)
+    with mock.patch.object(executor.tf.logging, 'warning') as mock_warning:
+      executor.Executor().Do(self.input_dict, self.output_dict,
+                             self.exec_properties)
+    mock_warning.assert_called_once()
+    self.assertIn('merged', mock_warning.call_args[0][0])
+
+  def testDoWithResultCache(self):
+    context = executor.Executor.Context(
+        cache_dir=os.path.join(self.output_data_dir, 'cache'))
+    executor.Executor(context).Do(self.input_dict, self.output_dict,
+                                  self.exec_properties)
+
+    # Schema of the same statistics is restored from the cache.
+    self.schema_output.uri = os.path.join(self.output_data_dir,
+                                          'schema_output2')
+    with mock.patch.object(
+        executor.tfdv, 'infer_schema',
+        side_effect=AssertionError('Schema is inferred again')):
+      executor.Executor(context).Do(self.input_dict, self.output_dict,
+                                    self.exec_properties)
+    self._assertSchemaEqual(self.expected_schema, self.schema_output)
+
   def testDoWithSchema(self):
     self.input_dict['schema'] = [self.schema]
     self.input_dict.pop('stats')
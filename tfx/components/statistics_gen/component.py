@@ -21,7 +21,9 @@ from typing import Optional, Text
 from tfx import types
 from tfx.components.base import base_component
 from tfx.components.base import executor_spec
+from tfx.components.statistics_gen import driver
 from tfx.components.statistics_gen import executor
+from tfx.proto import statistics_gen_pb2
 from tfx.types import artifact
 from tfx.types import standard_artifacts
 from tfx.types.standard_component_specs import StatisticsGenSpec
@@ -46,11 +48,15 @@ class StatisticsGen(base_component.BaseComponent):
 
   SPEC_CLASS = StatisticsGenSpec
   EXECUTOR_SPEC = executor_spec.ExecutorClassSpec(executor.Executor)
+  DRIVER_CLASS = driver.Driver
 
   def __init__(self,
                input_data: types.Channel = None,
                output: Optional[types.Channel] = None,
                examples: Optional[types.Channel] = None,
+               stats_options: Optional[statistics_gen_pb2.StatsOptions] = None,
+               single_pass: Optional[bool] = None,
+               incremental: Optional[bool] = None,
                instance_name: Optional[Text] = None):
     """Construct a StatisticsGen component.
 
@@ -61,6 +67,19 @@ class StatisticsGen(base_component.BaseComponent):
       output: `ExampleStatisticsPath` channel for statistics of each split
         provided in the input examples.
       examples: Forwards compatibility alias for the `input_data` argument.
+      stats_options: A statistics_gen_pb2.StatsOptions instance, providing
+        options of statistics computation, e.g., sample rate and features to
+        compute statistics for. If unset, the TFDV defaults are used.
+      single_pass: If true, examples of all splits are read and decoded by a
+        single stage, and then partitioned by split to compute statistics.
+      incremental: If true, splits with an examples artifact for each of
+        several spans have statistics computed for each span, reusing those
+        computed by the previous execution, and merged. Only statistics which
+        merge exactly are kept, see stats_utils: histograms, top values, rank
+        histograms and unique counts are missing, so schemas inferred by
+        SchemaGen lack string domains and ExampleValidator misses anomalies
+        based on them. Both warn on such statistics. Otherwise statistics of a
+        split are computed over the examples of all its spans.
       instance_name: Optional name assigned to this specific instance of
         StatisticsGen.  Required only if multiple StatisticsGen components are
         declared in the same pipeline.
@@ -73,5 +92,9 @@ class StatisticsGen(base_component.BaseComponent):
             for split in artifact.DEFAULT_EXAMPLE_SPLITS
         ])
     spec = StatisticsGenSpec(
-        input_data=input_data, output=output)
+        input_data=input_data,
+        output=output,
+        stats_options=stats_options,
+        single_pass=single_pass,
+        incremental=incremental)
     super(StatisticsGen, self).__init__(spec=spec, instance_name=instance_name)
@@ -19,6 +19,7 @@ from __future__ import print_function
 
 import tensorflow as tf
 from tfx.components.statistics_gen import component
+from tfx.proto import statistics_gen_pb2
 from tfx.types import channel_utils
 from tfx.types import standard_artifacts
 
@@ -33,6 +34,20 @@ class ComponentTest(tf.test.TestCase):
     self.assertEqual('ExampleStatisticsPath',
                      statistics_gen.outputs['output'].type_name)
 
+  def testConstructWithStatsOptions(self):
+    train_examples = standard_artifacts.Examples(split='train')
+    eval_examples = standard_artifacts.Examples(split='eval')
+    statistics_gen = component.StatisticsGen(
+        input_data=channel_utils.as_channel([train_examples, eval_examples]),
+        stats_options=statistics_gen_pb2.StatsOptions(
+            feature_allowlist=['trip_miles'], sample_rate=0.5),
+        single_pass=True,
+        incremental=True)
+    self.assertIn('feature_allowlist',
+                  statistics_gen.exec_properties['stats_options'])
+    self.assertTrue(statistics_gen.exec_properties['single_pass'])
+    self.assertTrue(statistics_gen.exec_properties['incremental'])
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -0,0 +1,78 @@
+# Copyright 2019 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""TFX StatisticsGen Driver."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import tensorflow as tf
+from typing import Any, Dict, List, Optional, Text
+from tfx import types
+from tfx.components.base import base_driver
+from tfx.orchestration import data_types
+from tfx.orchestration import metadata
+
+
+class Driver(base_driver.BaseDriver):
+  """Custom driver for StatisticsGen.
+
+  In incremental mode, the uri of the latest output of each split published by
+  a previous execution of this component is passed to the executor as the
+  'previous_output_uris' execution property, so that statistics of spans
+  computed by that execution are reused.
+  """
+
+  def __init__(self, metadata_handler: metadata.Metadata):
+    super(Driver, self).__init__(metadata_handler)
+    # Info of the current pipeline run, set when resolving inputs.
+    self._pipeline_info = None  # type: Optional[data_types.PipelineInfo]
+
+  def _fetch_previous_output_uris(
+      self, component_info: data_types.ComponentInfo) -> Dict[Text, Text]:
+    """Returns the uri of the latest existing previous output of each split."""
+    result = {}
+    for artifact in reversed(
+        self._metadata_handler.get_previous_output_artifacts(
+            'output', self._pipeline_info, component_info)):
+      split = artifact.properties['split'].string_value
+      if split not in result and tf.io.gfile.exists(artifact.uri):
+        result[split] = artifact.uri
+    return result
+
+  def resolve_input_artifacts(
+      self,
+      input_dict: Dict[Text, types.Channel],
+      exec_properties: Dict[Text, Any],
+      driver_args: data_types.DriverArgs,
+      pipeline_info: data_types.PipelineInfo,
+  ) -> Dict[Text, List[types.Artifact]]:
+    """Overrides BaseDriver.resolve_input_artifacts()."""
+    self._pipeline_info = pipeline_info
+    return super(Driver, self).resolve_input_artifacts(
+        input_dict, exec_properties, driver_args, pipeline_info)
+
+  def resolve_exec_properties(
+      self,
+      exec_properties: Dict[Text, Any],
+      component_info: data_types.ComponentInfo
+  ) -> Dict[Text, Any]:
+    """Overrides BaseDriver.resolve_exec_properties()."""
+    if exec_properties.get('incremental') and self._pipeline_info:
+      exec_properties['previous_output_uris'] = json.dumps(
+          self._fetch_previous_output_uris(component_info), sort_keys=True)
+      tf.logging.debug('Previous statistics outputs: {}'.format(
+          exec_properties['previous_output_uris']))
+    return exec_properties
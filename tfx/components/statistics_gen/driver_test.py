@@ -0,0 +1,69 @@
+# Copyright 2019 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.statistics_gen.driver."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+import tensorflow as tf
+from tfx.components.statistics_gen import driver
+from tfx.orchestration import data_types
+from tfx.types import standard_artifacts
+
+
+class DriverTest(tf.test.TestCase):
+
+  def testResolvePreviousOutputUris(self):
+    base_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+    artifacts = []
+    for aid, split in [(1, 'train'), (2, 'eval'), (3, 'train'), (4, 'train')]:
+      stats = standard_artifacts.ExampleStatistics(split=split)
+      stats.id = aid
+      stats.uri = os.path.join(base_dir, str(aid), split, '')
+      # Outputs of execution 4 were garbage collected.
+      if aid != 4:
+        tf.io.gfile.makedirs(stats.uri)
+      artifacts.append(stats.artifact)
+    mock_metadata = tf.test.mock.Mock()
+    mock_metadata.get_previous_output_artifacts.return_value = artifacts
+    pipeline_info = data_types.PipelineInfo(
+        pipeline_name='name', pipeline_root=base_dir, run_id='run')
+    component_info = data_types.ComponentInfo(
+        component_type='type', component_id='StatisticsGen')
+    statistics_gen_driver = driver.Driver(mock_metadata)
+    statistics_gen_driver.resolve_input_artifacts(
+        {}, {}, data_types.DriverArgs(enable_cache=True), pipeline_info)
+
+    exec_properties = statistics_gen_driver.resolve_exec_properties(
+        {'incremental': True}, component_info)
+    self.assertEqual(
+        {
+            'train': artifacts[2].uri,
+            'eval': artifacts[1].uri
+        }, json.loads(exec_properties['previous_output_uris']))
+    mock_metadata.get_previous_output_artifacts.assert_called_once_with(
+        'output', pipeline_info, component_info)
+
+    self.assertNotIn(
+        'previous_output_uris',
+        statistics_gen_driver.resolve_exec_properties({}, component_info))
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -17,21 +17,317 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+import hashlib
+import json
 import os
 import apache_beam as beam
 import tensorflow as tf
 from tensorflow_data_validation.api import stats_api
 from tensorflow_data_validation.coders import tf_example_decoder
 from tensorflow_data_validation.statistics import stats_options as options
-from typing import Any, Dict, List, Text
+from typing import Any, Dict, List, Optional, Text, Tuple
 from tensorflow_metadata.proto.v0 import statistics_pb2
 from tfx import types
 from tfx.components.base import base_executor
+from tfx.components.statistics_gen import stats_utils
+from tfx.proto import statistics_gen_pb2
 from tfx.types import artifact_utils
 from tfx.utils import io_utils
+from google.protobuf import json_format
 
 # Default file name for stats generated.
 _DEFAULT_FILE_NAME = 'stats_tfrecord'
+# Directory next to split outputs holding statistics of each span in
+# incremental mode, kept for later executions.
+_PARTIAL_STATS_DIR = '_partial_stats'
+# Directory next to split outputs holding the number of examples of each split
+# when sampling by count.
+_NUM_EXAMPLES_DIR = '_num_examples'
+# File name of the number of examples statistics are sampled from.
+_NUM_EXAMPLES_FILE_NAME = 'num_examples'
+# StatsOptions fields passed to TFDV as is if set. Sampling is done by the
+# executor instead of TFDV, so that it is deterministic.
+_STATS_OPTIONS_FIELDS = [
+    'num_top_values', 'num_rank_histogram_buckets',
+    'num_values_histogram_buckets', 'num_histogram_buckets',
+    'num_quantiles_histogram_buckets', 'epsilon', 'desired_batch_size'
+]
+
+
+def _GetStatsOptionsProto(exec_properties: Dict[Text, Any]
+                         ) -> statistics_gen_pb2.StatsOptions:
+  """Parses and validates StatsOptions of execution properties."""
+  stats_options = statistics_gen_pb2.StatsOptions()
+  if exec_properties.get('stats_options'):
+    json_format.Parse(exec_properties['stats_options'], stats_options)
+  if stats_options.sample_rate and stats_options.sample_count:
+    raise ValueError('Only one of sample_rate and sample_count can be set.')
+  # Zero sample_rate and sample_count mean unset.
+  if not 0 <= stats_options.sample_rate <= 1:
+    raise ValueError(
+        'sample_rate must be in (0, 1], or 0 if unset, got {}.'.format(
+            stats_options.sample_rate))
+  if stats_options.sample_count < 0:
+    raise ValueError(
+        'sample_count must be positive, or 0 if unset, got {}.'.format(
+            stats_options.sample_count))
+  return stats_options
+
+
+def _IsSampled(record: bytes,
+               sample_rate: float,
+               sample_count: int = 0,
+               num_examples: int = 0) -> bool:
+  """Returns whether a serialized example is in the deterministic sample.
+
+  An example is in the sample if its fingerprint, uniformly distributed in
+  [0, 1), is below the sample fraction: sample_count over num_examples if a
+  sample count is given, sample_rate otherwise.
+  """
+  fingerprint = int(hashlib.md5(record).hexdigest()[:16], 16) / float(1 << 64)
+  if sample_count:
+    return fingerprint * num_examples < sample_count
+  return fingerprint < sample_rate
+
+
+def _ToTfdvStatsOptions(stats_options: statistics_gen_pb2.StatsOptions
+                       ) -> options.StatsOptions:
+  """Converts StatsOptions proto to TFDV StatsOptions."""
+  kwargs = {}
+  if stats_options.feature_allowlist:
+    kwargs['feature_whitelist'] = list(stats_options.feature_allowlist)
+  for field in _STATS_OPTIONS_FIELDS:
+    if getattr(stats_options, field):
+      kwargs[field] = getattr(stats_options, field)
+  return options.StatsOptions(**kwargs)
+
+
+def _GetPartialStatsKey(examples: types.Artifact,
+                        stats_options: statistics_gen_pb2.StatsOptions) -> Text:
+  """Returns the key of partial statistics of an examples artifact.
+
+  Examples artifacts are immutable, and ExampleGen points unchanged spans to
+  examples generated previously, so statistics are keyed by uri and the
+  options they are computed with.
+  """
+  return hashlib.sha256(
+      tf.compat.as_bytes(examples.uri) +
+      stats_options.SerializeToString(deterministic=True)).hexdigest()
+
+
+def _GetExecutionDir(output_uri: Text) -> Text:
+  # Output uris are <component output>/<execution id>/<split>/.
+  return os.path.dirname(output_uri.rstrip('/'))
+
+
+def _GetPartialStatsPath(output_uri: Text, key: Text) -> Text:
+  """Returns the path of partial statistics of an execution's output."""
+  return os.path.join(
+      _GetExecutionDir(output_uri), _PARTIAL_STATS_DIR, key, _DEFAULT_FILE_NAME)
+
+
+def _FindPreviousPartialStats(previous_output_uri: Optional[Text],
+                              key: Text) -> Optional[Text]:
+  """Returns partial statistics persisted by a previous execution if any.
+
+  Args:
+    previous_output_uri: uri of the output of the split of the previous
+      execution, as resolved by the driver, if any.
+    key: key of the partial statistics.
+
+  Returns:
+    Path of the partial statistics, or None if not found.
+  """
+  if not previous_output_uri:
+    return None
+  previous_path = _GetPartialStatsPath(previous_output_uri, key)
+  return previous_path if tf.io.gfile.exists(previous_path) else None
+
+
+def _ReadStats(path: Text) -> statistics_pb2.DatasetFeatureStatisticsList:
+  stats = statistics_pb2.DatasetFeatureStatisticsList()
+  stats.ParseFromString(next(tf.compat.v1.io.tf_record_iterator(path)))
+  return stats
+
+
+def _ReadNumExamples(path: Text) -> int:
+  """Reads the number of examples written when sampling by count."""
+  if not tf.io.gfile.exists(path):
+    return 0
+  with tf.io.gfile.GFile(path) as f:
+    return int(f.read().strip() or 0)
+
+
+def _GetSampleFraction(stats_options: statistics_gen_pb2.StatsOptions,
+                       stats_and_num_examples_paths: List[Tuple[Text, Text]]
+                      ) -> float:
+  """Returns the fraction of examples of a split statistics are computed over.
+
+  Args:
+    stats_options: the statistics options, with sampling enabled.
+    stats_and_num_examples_paths: paths of the statistics of each part of the
+      split, and of the number of examples the part is sampled from.
+
+  Returns:
+    The sample rate, or the number of sampled examples over the number of
+    examples when sampling by count.
+  """
+  if not stats_options.sample_count:
+    return stats_options.sample_rate
+  num_sampled = 0
+  num_examples = 0
+  for stats_path, num_examples_path in stats_and_num_examples_paths:
+    num_sampled += sum(
+        dataset.num_examples for dataset in _ReadStats(stats_path).datasets)
+    num_examples += _ReadNumExamples(num_examples_path)
+  return num_sampled / num_examples if num_examples else 1.0
+
+
+def _WriteStats(stats: statistics_pb2.DatasetFeatureStatisticsList,
+                path: Text) -> None:
+  tf.io.gfile.makedirs(os.path.dirname(path))
+  with tf.io.TFRecordWriter(path) as writer:
+    writer.write(stats.SerializeToString())
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(beam.typehints.Dict[Text, Any])
+@beam.typehints.with_output_types(beam.pvalue.PDone)
+def _GenerateStatistics(  # pylint: disable=invalid-name
+    examples: beam.pvalue.PCollection, stats_options: options.StatsOptions,
+    output_path: Text) -> beam.pvalue.PDone:
+  """Computes statistics of decoded examples and writes them to output path."""
+  return (examples
+          | 'GenerateStatistics' >> stats_api.GenerateStatistics(stats_options)
+          | 'WriteStatsOutput' >> beam.io.WriteToTFRecord(
+              output_path,
+              shard_name_template='',
+              coder=beam.coders.ProtoCoder(
+                  statistics_pb2.DatasetFeatureStatisticsList)))
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(bytes)
+@beam.typehints.with_output_types(bytes)
+def _SampleExamples(  # pylint: disable=invalid-name
+    records: beam.pvalue.PCollection,
+    stats_options: statistics_gen_pb2.StatsOptions,
+    num_examples_path: Text) -> beam.pvalue.PCollection:
+  """Deterministically samples serialized examples.
+
+  Args:
+    records: PCollection of serialized examples.
+    stats_options: the statistics options, with sampling enabled.
+    num_examples_path: path to write the number of examples to when sampling
+      by count.
+
+  Returns:
+    PCollection of sampled serialized examples.
+  """
+  sample_rate = stats_options.sample_rate
+  sample_count = stats_options.sample_count
+  if not sample_count:
+    return records | 'Sample' >> beam.Filter(
+        lambda record: _IsSampled(record, sample_rate))
+
+  num_examples = records | 'CountExamples' >> beam.combiners.Count.Globally()
+  _ = num_examples | 'WriteNumExamples' >> beam.io.WriteToText(
+      num_examples_path, shard_name_template='')
+  return records | 'Sample' >> beam.Filter(
+      lambda record, num_examples: _IsSampled(record, 0, sample_count,
+                                              num_examples),
+      num_examples=beam.pvalue.AsSingleton(num_examples))
+
+
+def _ReadRecords(pipeline: beam.Pipeline, input_uris: List[Text],
+                 label: Text) -> beam.pvalue.PCollection:
+  """Reads serialized examples of one or more examples artifacts."""
+  if len(input_uris) == 1:
+    return pipeline | label >> beam.io.ReadFromTFRecord(
+        file_pattern=io_utils.all_files_pattern(input_uris[0]))
+  return ([
+      pipeline | '{}[{}]'.format(label, index) >> beam.io.ReadFromTFRecord(
+          file_pattern=io_utils.all_files_pattern(input_uri))
+      for index, input_uri in enumerate(input_uris)
+  ]
+          | 'Flatten' + label >> beam.Flatten())
+
+
+@beam.ptransform_fn
+@beam.typehints.with_input_types(beam.Pipeline)
+@beam.typehints.with_output_types(beam.typehints.Dict[Text, Any])
+def _ReadExamples(  # pylint: disable=invalid-name
+    pipeline: beam.Pipeline, input_uris: List[Text],
+    stats_options: statistics_gen_pb2.StatsOptions,
+    num_examples_path: Text) -> beam.pvalue.PCollection:
+  """Reads examples of all inputs, samples if enabled and decodes them."""
+  records = _ReadRecords(pipeline, input_uris, 'ReadData')
+  if stats_options.sample_rate or stats_options.sample_count:
+    records = records | 'SampleData' >> _SampleExamples(  # pylint: disable=no-value-for-parameter
+        stats_options, num_examples_path)
+  return records | 'DecodeData' >> tf_example_decoder.DecodeTFExample()
+
+
+def _ReadExamplesInSinglePass(pipeline: beam.Pipeline,
+                              inputs: List[Tuple[List[Text], Text]],
+                              stats_options: statistics_gen_pb2.StatsOptions
+                             ) -> List[beam.pvalue.PCollection]:
+  """Reads and decodes examples of several inputs in a single stage.
+
+  Records of each input are keyed by the index of the input, sampled if
+  enabled, decoded together and partitioned by the key afterwards.
+
+  Args:
+    pipeline: beam pipeline.
+    inputs: uris of the examples of each input, and path to write its number
+      of examples to when sampling by count.
+    stats_options: the statistics options.
+
+  Returns:
+    List of PCollections of decoded examples, one for each input.
+  """
+  records = (
+      [
+          _ReadRecords(pipeline, input_uris, 'ReadData[{}]'.format(index))
+          | 'KeyByInput[{}]'.format(index) >> beam.Map(
+              lambda record, index=index: (index, record))
+          for index, (input_uris, _) in enumerate(inputs)
+      ]
+      | 'FlattenInputs' >> beam.Flatten())
+
+  sample_rate = stats_options.sample_rate
+  sample_count = stats_options.sample_count
+  if sample_count:
+    num_examples = records | 'CountExamples' >> beam.combiners.Count.PerKey()
+    num_examples_partitions = (
+        num_examples
+        | 'PartitionNumExamples' >> beam.Partition(lambda kv, _: kv[0],
+                                                   len(inputs)))
+    for index, (_, num_examples_path) in enumerate(inputs):
+      _ = (
+          num_examples_partitions[index]
+          | 'DropNumExamplesKey[{}]'.format(index) >> beam.Map(
+              lambda kv: kv[1])
+          | 'WriteNumExamples[{}]'.format(index) >> beam.io.WriteToText(
+              num_examples_path, shard_name_template=''))
+    records = records | 'SampleData' >> beam.Filter(
+        lambda kv, num_examples: _IsSampled(kv[1], 0, sample_count,
+                                            num_examples[kv[0]]),
+        num_examples=beam.pvalue.AsDict(num_examples))
+  elif sample_rate:
+    records = records | 'SampleData' >> beam.Filter(
+        lambda kv: _IsSampled(kv[1], sample_rate))
+
+  decoder = tf_example_decoder.TFExampleDecoder()
+  partitions = (
+      records
+      | 'DecodeData' >> beam.Map(lambda kv: (kv[0], decoder.decode(kv[1])))
+      | 'PartitionByInput' >> beam.Partition(lambda kv, _: kv[0], len(inputs)))
+  return [
+      partition | 'DropKey[{}]'.format(index) >> beam.Map(lambda kv: kv[1])
+      for index, partition in enumerate(partitions)
+  ]
 
 
 class Executor(base_executor.BaseExecutor):
@@ -41,6 +337,25 @@ class Executor(base_executor.BaseExecutor):
   over training data, which can be used for visualization and validation.
   StatisticsGen uses Beam and appropriate algorithms to scale to large datasets.
 
+  A split may have an examples artifact for each of several spans, e.g. from an
+  ExampleGen processing a range of spans. Statistics of the split are computed
+  over the examples of all spans, unless incremental mode is enabled: then
+  statistics of each span are persisted next to the output, only spans without
+  statistics in the previous output resolved by the driver are computed, and
+  the statistics of all spans are merged. Merged statistics only hold the
+  statistics which merge exactly, see stats_utils, and their output artifact is
+  marked by the stats_utils.PARTIAL_STATS_PROPERTY_NAME custom property.
+
+  Statistics options, e.g. sampling and the features to compute statistics
+  for, are given by a statistics_gen_pb2.StatsOptions. In single pass mode,
+  examples of all splits are read and decoded by a single stage and then
+  partitioned by split, instead of a separate branch for each split.
+
+  Examples are sampled deterministically, by sample rate or by an approximate
+  number of examples. The fraction of examples statistics are computed over is
+  set as the stats_utils.SAMPLE_FRACTION_PROPERTY_NAME custom property of each
+  output artifact.
+
   To include StatisticsGen in a TFX pipeline, configure your pipeline similar to
   https://github.com/tensorflow/tfx/blob/master/tfx/examples/chicago_taxi_pipeline/taxi_pipeline_simple.py#L75.
   """
@@ -53,37 +368,125 @@ class Executor(base_executor.BaseExecutor):
     Args:
       input_dict: Input dict from input key to a list of Artifacts.
         - input_data: A list of 'ExamplesPath' type. This should contain both
-          'train' and 'eval' split.
+          'train' and 'eval' split, possibly with an artifact for each span.
       output_dict: Output dict from output key to a list of Artifacts.
         - output: A list of 'ExampleStatisticsPath' type. This should contain
           both 'train' and 'eval' split.
-      exec_properties: A dict of execution properties. Not used yet.
+      exec_properties: A dict of execution properties.
+        - stats_options: Optional JSON string of statistics_gen_pb2.StatsOptions
+          instance, providing options of statistics computation.
+        - single_pass: Optional bool, whether examples of all splits are read
+          and decoded in a single stage.
+        - incremental: Optional bool, whether statistics of splits with several
+          spans are computed for each span and merged.
+        - previous_output_uris: Optional JSON string of a dict from split to
+          uri of the output of the previous execution, set by the driver in
+          incremental mode.
 
     Returns:
       None
     """
     self._log_startup(input_dict, output_dict, exec_properties)
 
-    split_to_instance = {x.split: x for x in input_dict['input_data']}
-    with beam.Pipeline(argv=self._get_beam_pipeline_args()) as p:
-      # TODO(b/126263006): Support more stats_options through config.
-      stats_options = options.StatsOptions()
-      for split, instance in split_to_instance.items():
-        tf.logging.info('Generating statistics for split {}'.format(split))
-        input_uri = io_utils.all_files_pattern(instance.uri)
-        output_uri = artifact_utils.get_split_uri(output_dict['output'], split)
+    stats_options_proto = _GetStatsOptionsProto(exec_properties)
+    incremental = bool(exec_properties.get('incremental'))
+    previous_output_uris = json.loads(
+        exec_properties.get('previous_output_uris') or '{}')
+    split_to_instances = collections.OrderedDict()
+    for instance in input_dict['input_data']:
+      split_to_instances.setdefault(instance.split, []).append(instance)
+
+    # Label, input uris, output path and path of the number of examples of each
+    # statistics to compute.
+    stats_to_compute = []  # type: List[Tuple[Text, List[Text], Text, Text]]
+    # Paths of statistics and number of examples of each part of splits.
+    split_to_parts = collections.OrderedDict()
+    # Splits whose statistics are merged from statistics of each span.
+    merged_splits = set()
+    for split, instances in split_to_instances.items():
+      output_uri = artifact_utils.get_split_uri(output_dict['output'], split)
+      if len(instances) == 1 or not incremental:
         output_path = os.path.join(output_uri, _DEFAULT_FILE_NAME)
+        num_examples_path = os.path.join(
+            _GetExecutionDir(output_uri), _NUM_EXAMPLES_DIR, split)
+        stats_to_compute.append(
+            (split, sorted(set(instance.uri for instance in instances)),
+             output_path, num_examples_path))
+        split_to_parts[split] = [(output_path, num_examples_path)]
+        continue
+
+      merged_splits.add(split)
+
+      split_to_parts[split] = []
+      for instance in instances:
+        key = _GetPartialStatsKey(instance, stats_options_proto)
+        partial_stats_path = _GetPartialStatsPath(output_uri, key)
+        num_examples_path = os.path.join(
+            os.path.dirname(partial_stats_path), _NUM_EXAMPLES_FILE_NAME)
+        if (partial_stats_path, num_examples_path) in split_to_parts[split]:
+          continue
+        split_to_parts[split].append((partial_stats_path, num_examples_path))
+        previous_path = _FindPreviousPartialStats(
+            previous_output_uris.get(split), key)
+        if previous_path:
+          tf.logging.info('Reusing statistics of {} from {}.'.format(
+              instance.uri, previous_path))
+          tf.io.gfile.makedirs(os.path.dirname(partial_stats_path))
+          tf.io.gfile.copy(previous_path, partial_stats_path, overwrite=True)
+          previous_num_examples_path = os.path.join(
+              os.path.dirname(previous_path), _NUM_EXAMPLES_FILE_NAME)
+          if tf.io.gfile.exists(previous_num_examples_path):
+            tf.io.gfile.copy(
+                previous_num_examples_path, num_examples_path, overwrite=True)
+          continue
+        stats_to_compute.append(('{}.{}'.format(split, key), [instance.uri],
+                                 partial_stats_path, num_examples_path))
+
+    with beam.Pipeline(argv=self._get_beam_pipeline_args()) as p:
+      stats_options = _ToTfdvStatsOptions(stats_options_proto)
+      if exec_properties.get('single_pass') and stats_to_compute:
+        examples_list = _ReadExamplesInSinglePass(
+            p, [(input_uris, num_examples_path)
+                for _, input_uris, _, num_examples_path in stats_to_compute],
+            stats_options_proto)
+      else:
+        examples_list = [
+            p | 'ReadExamples.' + label >> _ReadExamples(  # pylint: disable=no-value-for-parameter
+                input_uris, stats_options_proto, num_examples_path)
+            for label, input_uris, _, num_examples_path in stats_to_compute
+        ]
+      for (label, _, output_path, _), examples in zip(stats_to_compute,
+                                                      examples_list):
+        tf.logging.info('Generating statistics for {}'.format(label))
         _ = (
-            p
-            | 'ReadData.' + split >>
-            beam.io.ReadFromTFRecord(file_pattern=input_uri)
-            | 'DecodeData.' + split >> tf_example_decoder.DecodeTFExample()
-            | 'GenerateStatistics.' + split >>
-            stats_api.GenerateStatistics(stats_options)
-            | 'WriteStatsOutput.' + split >> beam.io.WriteToTFRecord(
-                output_path,
-                shard_name_template='',
-                coder=beam.coders.ProtoCoder(
-                    statistics_pb2.DatasetFeatureStatisticsList)))
-        tf.logging.info('Statistics for split {} written to {}.'.format(
-            split, output_uri))
+            examples
+            | 'GenerateStatistics.' + label >> _GenerateStatistics(  # pylint: disable=no-value-for-parameter
+                stats_options, output_path))
+
+    for split, parts in split_to_parts.items():
+      if split not in merged_splits:
+        continue
+      output_uri = artifact_utils.get_split_uri(output_dict['output'], split)
+      _WriteStats(
+          stats_utils.merge_statistics(
+              [_ReadStats(stats_path) for stats_path, _ in parts]),
+          os.path.join(output_uri, _DEFAULT_FILE_NAME))
+      tf.logging.warning(
+          'Statistics of split {} are merged from {} spans, histograms, top '
+          'values, rank histograms and unique counts are not computed.'.format(
+              split, len(parts)))
+    for output in output_dict['output']:
+      if output.split in merged_splits:
+        output.set_int_custom_property(stats_utils.PARTIAL_STATS_PROPERTY_NAME,
+                                       1)
+
+    if stats_options_proto.sample_rate or stats_options_proto.sample_count:
+      for output in output_dict['output']:
+        sample_fraction = _GetSampleFraction(stats_options_proto,
+                                             split_to_parts[output.split])
+        tf.logging.info('Statistics of split {} are computed over {} of '
+                        'examples.'.format(output.split, sample_fraction))
+        output.set_string_custom_property(
+            stats_utils.SAMPLE_FRACTION_PROPERTY_NAME, str(sample_fraction))
+    tf.logging.info('Statistics written to {}.'.format(
+        [instance.uri for instance in output_dict['output']]))
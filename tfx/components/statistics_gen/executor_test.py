@@ -17,14 +17,19 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import json
 import os
 import tempfile
 
 from absl.testing import absltest
+import mock
 import tensorflow as tf
 import tensorflow_data_validation as tfdv
 from tfx.components.statistics_gen import executor
+from tfx.components.statistics_gen import stats_utils
+from tfx.proto import statistics_gen_pb2
 from tfx.types import standard_artifacts
+from google.protobuf import json_format
 
 
 # TODO(b/133421802): Investigate why tensorflow.TestCase could cause a crash
@@ -78,5 +83,227 @@ class ExecutorTest(absltest.TestCase):
     self._validate_stats_output(os.path.join(train_stats.uri, 'stats_tfrecord'))
     self._validate_stats_output(os.path.join(eval_stats.uri, 'stats_tfrecord'))
 
+  def testDoSinglePassWithStatsOptions(self):
+    source_data_dir = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'testdata')
+    output_data_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+    tf.io.gfile.makedirs(output_data_dir)
+
+    # Create input dict.
+    train_examples = standard_artifacts.Examples(split='train')
+    train_examples.uri = os.path.join(source_data_dir, 'csv_example_gen/train/')
+    eval_examples = standard_artifacts.Examples(split='eval')
+    eval_examples.uri = os.path.join(source_data_dir, 'csv_example_gen/eval/')
+
+    train_stats = standard_artifacts.ExampleStatistics(split='train')
+    train_stats.uri = os.path.join(output_data_dir, 'train', '')
+    eval_stats = standard_artifacts.ExampleStatistics(split='eval')
+    eval_stats.uri = os.path.join(output_data_dir, 'eval', '')
+    input_dict = {
+        'input_data': [train_examples, eval_examples],
+    }
+
+    output_dict = {
+        'output': [train_stats, eval_stats],
+    }
+
+    exec_properties = {
+        'stats_options':
+            json_format.MessageToJson(
+                statistics_gen_pb2.StatsOptions(
+                    feature_allowlist=['company', 'trip_miles'])),
+        'single_pass': True,
+    }
+
+    # Run executor.
+    executor.Executor().Do(input_dict, output_dict, exec_properties)
+
+    # Check statistics_gen outputs.
+    for stats in [train_stats, eval_stats]:
+      stats_path = os.path.join(stats.uri, 'stats_tfrecord')
+      self._validate_stats_output(stats_path)
+      self.assertCountEqual(['company', 'trip_miles'], [
+          feature.name for feature in tfdv.load_statistics(
+              stats_path).datasets[0].features
+      ])
+    self.assertGreater(
+        tfdv.load_statistics(os.path.join(
+            train_stats.uri, 'stats_tfrecord')).datasets[0].num_examples,
+        tfdv.load_statistics(os.path.join(
+            eval_stats.uri, 'stats_tfrecord')).datasets[0].num_examples)
+
+  def testDoSampled(self):
+    source_data_dir = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'testdata')
+    output_data_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+    tf.io.gfile.makedirs(output_data_dir)
+
+    train_examples = standard_artifacts.Examples(split='train')
+    train_examples.uri = os.path.join(source_data_dir, 'csv_example_gen/train/')
+    input_dict = {'input_data': [train_examples]}
+
+    def run(execution_id, stats_options, single_pass=False):
+      train_stats = standard_artifacts.ExampleStatistics(split='train')
+      train_stats.uri = os.path.join(output_data_dir, str(execution_id),
+                                     'train', '')
+      executor.Executor().Do(
+          input_dict, {'output': [train_stats]},
+          exec_properties={
+              'stats_options': json_format.MessageToJson(stats_options),
+              'single_pass': single_pass,
+          })
+      stats_path = os.path.join(train_stats.uri, 'stats_tfrecord')
+      self._validate_stats_output(stats_path)
+      return (tfdv.load_statistics(stats_path).datasets[0].num_examples,
+              stats_utils.get_sample_fraction(train_stats))
+
+    num_examples, sample_fraction = run(
+        1, statistics_gen_pb2.StatsOptions(sample_count=1000))
+    self.assertLess(0, sample_fraction)
+    self.assertGreater(1, sample_fraction)
+    self.assertAlmostEqual(1000, num_examples, delta=200)
+
+    # Sampling is deterministic, in single pass mode as well.
+    self.assertEqual((num_examples, sample_fraction),
+                     run(2, statistics_gen_pb2.StatsOptions(sample_count=1000),
+                         single_pass=True))
+
+    # Sampling by rate keeps about the same examples for the same fraction.
+    num_examples_by_rate, sample_fraction_by_rate = run(
+        3, statistics_gen_pb2.StatsOptions(sample_rate=sample_fraction))
+    self.assertAlmostEqual(sample_fraction, sample_fraction_by_rate, places=5)
+    self.assertAlmostEqual(num_examples, num_examples_by_rate, delta=10)
+
+  def testDoSampledWithRateAndCount(self):
+    with self.assertRaises(ValueError):
+      executor.Executor().Do(
+          {'input_data': []}, {'output': []},
+          exec_properties={
+              'stats_options':
+                  json_format.MessageToJson(
+                      statistics_gen_pb2.StatsOptions(
+                          sample_rate=0.5, sample_count=1000)),
+          })
+
+  def testGetStatsOptionsProto(self):
+
+    def parse(stats_options):
+      return executor._GetStatsOptionsProto(
+          {'stats_options': json_format.MessageToJson(stats_options)})
+
+    # Zero means unset.
+    self.assertEqual(0, parse(statistics_gen_pb2.StatsOptions()).sample_rate)
+    self.assertEqual(
+        1, parse(statistics_gen_pb2.StatsOptions(sample_rate=1)).sample_rate)
+    for stats_options in [
+        statistics_gen_pb2.StatsOptions(sample_rate=-0.5),
+        statistics_gen_pb2.StatsOptions(sample_rate=1.5),
+        statistics_gen_pb2.StatsOptions(sample_count=-1),
+    ]:
+      with self.assertRaises(ValueError):
+        parse(stats_options)
+
+  def testDoIncremental(self):
+    source_data_dir = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'testdata')
+    output_data_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+    tf.io.gfile.makedirs(output_data_dir)
+
+    # Create input dict with two spans of train examples.
+    input_dict = {'input_data': []}
+    for span, split in enumerate(['train', 'eval']):
+      examples = standard_artifacts.Examples(split='train')
+      examples.span = span
+      examples.uri = os.path.join(source_data_dir, 'csv_example_gen', split, '')
+      input_dict['input_data'].append(examples)
+
+    def run(execution_id, exec_properties):
+      train_stats = standard_artifacts.ExampleStatistics(split='train')
+      train_stats.uri = os.path.join(output_data_dir, str(execution_id),
+                                     'train', '')
+      executor.Executor().Do(input_dict, {'output': [train_stats]},
+                             exec_properties)
+      return train_stats
+
+    # Statistics of each span are computed and merged.
+    train_stats = run(1, {'incremental': True})
+    self.assertTrue(stats_utils.is_partial(train_stats))
+    stats_uri = train_stats.uri
+    self._validate_stats_output(os.path.join(stats_uri, 'stats_tfrecord'))
+    partial_stats_paths = tf.io.gfile.glob(
+        os.path.join(output_data_dir, '1', '_partial_stats', '*',
+                     'stats_tfrecord'))
+    self.assertLen(partial_stats_paths, 2)
+    self.assertEqual(
+        sum(
+            tfdv.load_statistics(path).datasets[0].num_examples
+            for path in partial_stats_paths),
+        tfdv.load_statistics(os.path.join(
+            stats_uri, 'stats_tfrecord')).datasets[0].num_examples)
+
+    # Statistics of both spans are reused by the next execution.
+    with mock.patch.object(
+        executor, '_GenerateStatistics',
+        side_effect=AssertionError('Statistics are recomputed')):
+      stats_uri = run(
+          2, {
+              'incremental': True,
+              'previous_output_uris': json.dumps({'train': stats_uri})
+          }).uri
+    self._validate_stats_output(os.path.join(stats_uri, 'stats_tfrecord'))
+    self.assertLen(
+        tf.io.gfile.glob(
+            os.path.join(output_data_dir, '2', '_partial_stats', '*',
+                         'stats_tfrecord')), 2)
+
+    # Merged statistics equal statistics computed over all spans at once, for
+    # the statistics which merge exactly.
+    merged = tfdv.load_statistics(os.path.join(stats_uri, 'stats_tfrecord'))
+    full_stats = run(3, {})
+    self.assertFalse(stats_utils.is_partial(full_stats))
+    full_stats_uri = full_stats.uri
+    self.assertEmpty(
+        tf.io.gfile.glob(os.path.join(output_data_dir, '3', '_partial_stats')))
+    expected = stats_utils.merge_statistics(
+        [tfdv.load_statistics(os.path.join(full_stats_uri, 'stats_tfrecord'))])
+    self.assertEqual(expected.datasets[0].num_examples,
+                     merged.datasets[0].num_examples)
+    self.assertLen(merged.datasets[0].features,
+                   len(expected.datasets[0].features))
+    expected_features = {
+        feature.name: feature for feature in expected.datasets[0].features
+    }
+    for feature in merged.datasets[0].features:
+      expected_feature = expected_features[feature.name]
+      self.assertEqual(expected_feature.type, feature.type)
+      stats_field = feature.WhichOneof('stats')
+      self.assertEqual(expected_feature.WhichOneof('stats'), stats_field)
+      stats = getattr(feature, stats_field)
+      expected_stats = getattr(expected_feature, stats_field)
+      self.assertEqual(expected_stats.common_stats, stats.common_stats)
+      if stats_field == 'num_stats':
+        self.assertEqual(expected_stats.min, stats.min)
+        self.assertEqual(expected_stats.max, stats.max)
+        self.assertEqual(expected_stats.num_zeros, stats.num_zeros)
+        # Sums are accumulated in a different order.
+        self.assertAlmostEqual(
+            expected_stats.mean,
+            stats.mean,
+            delta=1e-6 * max(1, abs(expected_stats.mean)))
+        self.assertAlmostEqual(
+            expected_stats.std_dev,
+            stats.std_dev,
+            delta=1e-6 * max(1, expected_stats.std_dev))
+      elif stats_field == 'string_stats':
+        self.assertAlmostEqual(
+            expected_stats.avg_length, stats.avg_length, places=4)
+
+
 if __name__ == '__main__':
   absltest.main()
@@ -0,0 +1,267 @@
+# Copyright 2019 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Utilities for merging statistics of disjoint parts of a dataset.
+
+Only statistics which merge exactly are kept: counts, number of values, min,
+max and number of zeros are combined, and averages, mean and standard deviation
+are recomputed from the sums they are derived from. Statistics estimated from
+the distribution of values, i.e. histograms, median, top values, rank
+histograms and number of unique values, as well as weighted and custom
+statistics, can not be merged exactly and are left unset. ExampleStatistics
+artifacts holding merged statistics are marked by the partial statistics custom
+property, so that consumers such as SchemaGen and ExampleValidator can warn
+that schemas and anomalies derived from them miss these statistics.
+
+Statistics computed over a sample of examples are marked by the sample fraction
+custom property of their ExampleStatistics artifact.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import math
+
+from typing import Sequence, Text, Tuple
+from tensorflow_metadata.proto.v0 import statistics_pb2
+from tfx import types
+
+# Custom property of ExampleStatistics artifacts computed over a sample of
+# examples, holding the fraction of examples in the sample.
+SAMPLE_FRACTION_PROPERTY_NAME = 'sample_fraction'
+# Custom property of ExampleStatistics artifacts holding merged statistics, set
+# to 1 as only statistics which merge exactly are kept.
+PARTIAL_STATS_PROPERTY_NAME = 'partial_stats'
+
+
+def _sum_products(values: Sequence[float], weights: Sequence[float]) -> float:
+  return sum(v * w for v, w in zip(values, weights))
+
+
+def _merge_common_stats(common_stats_list: Sequence[
+    statistics_pb2.CommonStatistics], num_missing_examples: int
+                       ) -> statistics_pb2.CommonStatistics:
+  """Merges common statistics.
+
+  Args:
+    common_stats_list: common statistics of the parts containing the feature.
+    num_missing_examples: number of examples in parts without the feature.
+
+  Returns:
+    Merged common statistics.
+  """
+  result = statistics_pb2.CommonStatistics()
+  result.num_non_missing = sum(c.num_non_missing for c in common_stats_list)
+  result.num_missing = num_missing_examples + sum(
+      c.num_missing for c in common_stats_list)
+  result.tot_num_values = sum(c.tot_num_values for c in common_stats_list)
+  present = [c for c in common_stats_list if c.num_non_missing]
+  if present:
+    result.min_num_values = min(c.min_num_values for c in present)
+    result.max_num_values = max(c.max_num_values for c in present)
+    result.avg_num_values = result.tot_num_values / result.num_non_missing
+  return result
+
+
+def _merge_num_stats(num_stats_list: Sequence[statistics_pb2.NumericStatistics],
+                     num_missing_examples: int
+                    ) -> statistics_pb2.NumericStatistics:
+  """Merges numeric statistics."""
+  result = statistics_pb2.NumericStatistics()
+  result.common_stats.CopyFrom(
+      _merge_common_stats([s.common_stats for s in num_stats_list],
+                          num_missing_examples))
+  result.num_zeros = sum(s.num_zeros for s in num_stats_list)
+  tot_num_values = result.common_stats.tot_num_values
+  if not tot_num_values:
+    return result
+  # Mean and standard deviation are over values, recomputed from the sum and
+  # sum of squares of values of each part.
+  weights = [s.common_stats.tot_num_values for s in num_stats_list]
+  total = _sum_products([s.mean for s in num_stats_list], weights)
+  total_squares = _sum_products(
+      [s.std_dev**2 + s.mean**2 for s in num_stats_list], weights)
+  result.mean = total / tot_num_values
+  result.std_dev = math.sqrt(
+      max(0.0, total_squares / tot_num_values - result.mean**2))
+  present = [s for s in num_stats_list if s.common_stats.tot_num_values]
+  result.min = min(s.min for s in present)
+  result.max = max(s.max for s in present)
+  return result
+
+
+def _merge_string_stats(string_stats_list: Sequence[
+    statistics_pb2.StringStatistics], num_missing_examples: int
+                       ) -> statistics_pb2.StringStatistics:
+  """Merges string statistics."""
+  result = statistics_pb2.StringStatistics()
+  result.common_stats.CopyFrom(
+      _merge_common_stats([s.common_stats for s in string_stats_list],
+                          num_missing_examples))
+  if result.common_stats.tot_num_values:
+    result.avg_length = _sum_products(
+        [s.avg_length for s in string_stats_list],
+        [s.common_stats.tot_num_values for s in string_stats_list]
+    ) / result.common_stats.tot_num_values
+  return result
+
+
+def _merge_bytes_stats(bytes_stats_list: Sequence[
+    statistics_pb2.BytesStatistics], num_missing_examples: int
+                      ) -> statistics_pb2.BytesStatistics:
+  """Merges bytes statistics."""
+  result = statistics_pb2.BytesStatistics()
+  result.common_stats.CopyFrom(
+      _merge_common_stats([s.common_stats for s in bytes_stats_list],
+                          num_missing_examples))
+  present = [s for s in bytes_stats_list if s.common_stats.tot_num_values]
+  if present:
+    result.avg_num_bytes = _sum_products(
+        [s.avg_num_bytes for s in present],
+        [s.common_stats.tot_num_values for s in present]
+    ) / result.common_stats.tot_num_values
+    result.min_num_bytes = min(s.min_num_bytes for s in present)
+    result.max_num_bytes = max(s.max_num_bytes for s in present)
+  return result
+
+
+def _merge_struct_stats(struct_stats_list: Sequence[
+    statistics_pb2.StructStatistics], num_missing_examples: int
+                       ) -> statistics_pb2.StructStatistics:
+  """Merges struct statistics."""
+  result = statistics_pb2.StructStatistics()
+  result.common_stats.CopyFrom(
+      _merge_common_stats([s.common_stats for s in struct_stats_list],
+                          num_missing_examples))
+  return result
+
+
+_STATS_MERGERS = {
+    'num_stats': _merge_num_stats,
+    'string_stats': _merge_string_stats,
+    'bytes_stats': _merge_bytes_stats,
+    'struct_stats': _merge_struct_stats,
+}
+
+
+def _feature_key(feature: statistics_pb2.FeatureNameStatistics
+                ) -> Tuple[Text, ...]:
+  if feature.HasField('path'):
+    return tuple(feature.path.step)
+  return (feature.name,)
+
+
+def _merge_datasets(datasets: Sequence[statistics_pb2.DatasetFeatureStatistics]
+                   ) -> statistics_pb2.DatasetFeatureStatistics:
+  """Merges statistics of disjoint parts of a dataset."""
+  result = statistics_pb2.DatasetFeatureStatistics()
+  result.name = datasets[0].name
+  result.num_examples = sum(d.num_examples for d in datasets)
+  result.weighted_num_examples = sum(d.weighted_num_examples for d in datasets)
+
+  features = collections.OrderedDict()
+  for dataset in datasets:
+    for feature in dataset.features:
+      features.setdefault(_feature_key(feature), []).append(
+          (dataset.num_examples, feature))
+
+  for key, feature_parts in features.items():
+    first = feature_parts[0][1]
+    stats_field = first.WhichOneof('stats')
+    for _, feature in feature_parts:
+      # As when computing statistics over the whole dataset, a feature must
+      # have the same type in all parts.
+      if (feature.type != first.type or
+          feature.WhichOneof('stats') != stats_field):
+        raise ValueError(
+            'Feature {} has different types in statistics to merge: {} and '
+            '{}.'.format('.'.join(key), first.type, feature.type))
+    merged = result.features.add()
+    if first.HasField('path'):
+      merged.path.CopyFrom(first.path)
+    else:
+      merged.name = first.name
+    merged.type = first.type
+    if not stats_field:
+      continue
+    # Examples of parts without the feature are missing the feature.
+    num_missing_examples = result.num_examples - sum(
+        num_examples for num_examples, _ in feature_parts)
+    getattr(merged, stats_field).CopyFrom(_STATS_MERGERS[stats_field](
+        [getattr(feature, stats_field) for _, feature in feature_parts],
+        num_missing_examples))
+  return result
+
+
+def merge_statistics(
+    stats_lists: Sequence[statistics_pb2.DatasetFeatureStatisticsList]
+) -> statistics_pb2.DatasetFeatureStatisticsList:
+  """Merges statistics of disjoint parts of a dataset, e.g., spans.
+
+  Only statistics which merge exactly are set in the result, see the module
+  docstring. Merging a single part keeps these statistics of the part, so that
+  merged statistics can be compared with statistics of the whole dataset.
+
+  Args:
+    stats_lists: statistics of each part, with the same datasets (slices) in
+      the same order.
+
+  Returns:
+    Statistics of the whole dataset.
+
+  Raises:
+    ValueError: if stats_lists is empty, parts have different datasets, or a
+      feature has different types in different parts.
+  """
+  if not stats_lists:
+    raise ValueError('No statistics to merge.')
+  if len(set(len(stats_list.datasets) for stats_list in stats_lists)) != 1:
+    raise ValueError('Statistics to merge have different number of datasets.')
+
+  result = statistics_pb2.DatasetFeatureStatisticsList()
+  for datasets in zip(*[stats_list.datasets for stats_list in stats_lists]):
+    result.datasets.add().CopyFrom(_merge_datasets(datasets))
+  return result
+
+
+def get_sample_fraction(stats: types.Artifact) -> float:
+  """Returns the fraction of examples statistics are computed over.
+
+  Args:
+    stats: an ExampleStatistics artifact.
+
+  Returns:
+    The sample fraction in (0, 1], 1.0 if statistics are computed over all
+    examples.
+  """
+  if SAMPLE_FRACTION_PROPERTY_NAME not in stats.artifact.custom_properties:
+    return 1.0
+  return float(stats.artifact.custom_properties[SAMPLE_FRACTION_PROPERTY_NAME]
+               .string_value)
+
+
+def is_partial(stats: types.Artifact) -> bool:
+  """Returns whether statistics are merged and miss inexact statistics.
+
+  Args:
+    stats: an ExampleStatistics artifact.
+
+  Returns:
+    True if the artifact holds merged statistics, without histograms, top
+    values, rank histograms and unique counts.
+  """
+  return bool(
+      PARTIAL_STATS_PROPERTY_NAME in stats.artifact.custom_properties and
+      stats.artifact.custom_properties[PARTIAL_STATS_PROPERTY_NAME].int_value)
@@ -0,0 +1,205 @@
+# Copyright 2019 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.statistics_gen.stats_utils."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import tensorflow as tf
+from google.protobuf import text_format
+from tensorflow_metadata.proto.v0 import statistics_pb2
+from tfx.components.statistics_gen import stats_utils
+from tfx.types import standard_artifacts
+
+
+class StatsUtilsTest(tf.test.TestCase):
+
+  def _parse(self, text):
+    return text_format.Parse(text,
+                             statistics_pb2.DatasetFeatureStatisticsList())
+
+  def testMergeStatistics(self):
+    # Values of f are [1, 3] in the first part and [5] in the second part.
+    stats1 = self._parse("""
+        datasets {
+          num_examples: 2
+          features {
+            name: 'f'
+            type: INT
+            num_stats {
+              common_stats {
+                num_non_missing: 2 min_num_values: 1 max_num_values: 1
+                avg_num_values: 1 tot_num_values: 2
+              }
+              mean: 2 std_dev: 1 min: 1 max: 3 median: 3
+              histograms {
+                type: STANDARD
+                buckets { low_value: 1 high_value: 2 sample_count: 1 }
+                buckets { low_value: 2 high_value: 3 sample_count: 1 }
+              }
+            }
+          }
+          features {
+            name: 's'
+            type: STRING
+            string_stats {
+              common_stats {
+                num_non_missing: 2 min_num_values: 1 max_num_values: 2
+                avg_num_values: 1.5 tot_num_values: 3
+              }
+              unique: 2
+              top_values { value: 'a' frequency: 2 }
+              top_values { value: 'b' frequency: 1 }
+              avg_length: 1
+            }
+          }
+        }""")
+    stats2 = self._parse("""
+        datasets {
+          num_examples: 1
+          features {
+            name: 'f'
+            type: INT
+            num_stats {
+              common_stats {
+                num_non_missing: 1 min_num_values: 1 max_num_values: 1
+                avg_num_values: 1 tot_num_values: 1
+              }
+              mean: 5 min: 5 max: 5 median: 5
+              histograms {
+                type: STANDARD
+                buckets { low_value: 5 high_value: 5 sample_count: 1 }
+              }
+            }
+          }
+        }""")
+
+    merged = stats_utils.merge_statistics([stats1, stats2])
+    self.assertLen(merged.datasets, 1)
+    dataset = merged.datasets[0]
+    self.assertEqual(3, dataset.num_examples)
+    self.assertLen(dataset.features, 2)
+
+    num_stats = dataset.features[0].num_stats
+    self.assertEqual(3, num_stats.common_stats.num_non_missing)
+    self.assertEqual(0, num_stats.common_stats.num_missing)
+    self.assertEqual(3, num_stats.common_stats.tot_num_values)
+    self.assertAlmostEqual(3, num_stats.mean)
+    self.assertAlmostEqual((8 / 3)**0.5, num_stats.std_dev)
+    self.assertEqual(1, num_stats.min)
+    self.assertEqual(5, num_stats.max)
+    # Statistics which can not be merged exactly are not set.
+    self.assertEmpty(num_stats.histograms)
+    self.assertEqual(0, num_stats.median)
+
+    # Examples of the second part are missing s.
+    string_stats = dataset.features[1].string_stats
+    self.assertEqual(2, string_stats.common_stats.num_non_missing)
+    self.assertEqual(1, string_stats.common_stats.num_missing)
+    self.assertAlmostEqual(1, string_stats.avg_length)
+    self.assertEqual(0, string_stats.unique)
+    self.assertEmpty(string_stats.top_values)
+
+  def testMergeStatisticsEqualsWholeDataset(self):
+    # Values of f are [1, 2] in the first part and [2, 7] in the second part.
+    part1 = self._parse("""
+        datasets {
+          num_examples: 2
+          features {
+            name: 'f'
+            type: FLOAT
+            num_stats {
+              common_stats {
+                num_non_missing: 2 min_num_values: 1 max_num_values: 1
+                avg_num_values: 1 tot_num_values: 2
+              }
+              mean: 1.5 std_dev: 0.5 min: 1 max: 2
+            }
+          }
+        }""")
+    part2 = self._parse("""
+        datasets {
+          num_examples: 2
+          features {
+            name: 'f'
+            type: FLOAT
+            num_stats {
+              common_stats {
+                num_non_missing: 1 num_missing: 1 min_num_values: 2
+                max_num_values: 2 avg_num_values: 2 tot_num_values: 2
+              }
+              mean: 4.5 std_dev: 2.5 min: 2 max: 7
+            }
+          }
+        }""")
+    # Statistics of the whole dataset, as computed over all examples.
+    whole = self._parse("""
+        datasets {
+          num_examples: 4
+          features {
+            name: 'f'
+            type: FLOAT
+            num_stats {
+              common_stats {
+                num_non_missing: 3 num_missing: 1 min_num_values: 1
+                max_num_values: 2 avg_num_values: 1.3333333333333333
+                tot_num_values: 4
+              }
+              mean: 3 std_dev: 2.345207879911715 min: 1 max: 7 median: 2
+              histograms {
+                type: STANDARD
+                buckets { low_value: 1 high_value: 7 sample_count: 4 }
+              }
+            }
+          }
+        }""")
+
+    merged = stats_utils.merge_statistics([part1, part2])
+    expected = stats_utils.merge_statistics([whole])
+    self.assertEmpty(expected.datasets[0].features[0].num_stats.histograms)
+    self.assertProtoEquals(expected, merged)
+
+  def testMergeStatisticsWithDifferentTypes(self):
+    stats1 = self._parse(
+        "datasets { num_examples: 1 features { name: 'f' type: INT } }")
+    stats2 = self._parse(
+        "datasets { num_examples: 1 features { name: 'f' type: FLOAT } }")
+    with self.assertRaises(ValueError):
+      stats_utils.merge_statistics([stats1, stats2])
+
+  def testMergeSingleStatistics(self):
+    stats = self._parse('datasets { num_examples: 2 }')
+    self.assertEqual(stats, stats_utils.merge_statistics([stats]))
+
+  def testMergeNoStatistics(self):
+    with self.assertRaises(ValueError):
+      stats_utils.merge_statistics([])
+
+  def testGetSampleFraction(self):
+    stats = standard_artifacts.ExampleStatistics(split='train')
+    self.assertEqual(1.0, stats_utils.get_sample_fraction(stats))
+    stats.set_string_custom_property(stats_utils.SAMPLE_FRACTION_PROPERTY_NAME,
+                                     '0.25')
+    self.assertEqual(0.25, stats_utils.get_sample_fraction(stats))
+
+  def testIsPartial(self):
+    stats = standard_artifacts.ExampleStatistics(split='train')
+    self.assertFalse(stats_utils.is_partial(stats))
+    stats.set_int_custom_property(stats_utils.PARTIAL_STATS_PROPERTY_NAME, 1)
+    self.assertTrue(stats_utils.is_partial(stats))
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -73,11 +73,10 @@ def _get_raw_feature_spec(schema):
   return schema_utils.schema_as_feature_spec(schema).feature_spec
 
 
-def _gzip_reader_fn():
-  """Small utility returning a record reader that can read gzip'ed files."""
-  return tf.TFRecordReader(
-      options=tf.python_io.TFRecordOptions(
-          compression_type=tf.python_io.TFRecordCompressionType.GZIP))
+def _make_reader_fn(compression_type):
+  """Returns a record reader that can read files of the compression type."""
+  return lambda: tf.TFRecordReader(  # pylint: disable=g-long-lambda
+      options=tf.python_io.TFRecordOptions(compression_type=compression_type))
 
 
 def _build_estimator(tf_transform_output,
@@ -195,13 +194,17 @@ def _eval_input_receiver_fn(tf_transform_output, schema):
       labels=transformed_features[_transformed_name(_LABEL_KEY)])
 
 
-def _input_fn(filenames, tf_transform_output, batch_size=200):
+def _input_fn(filenames,
+              tf_transform_output,
+              batch_size=200,
+              compression_type='GZIP'):
   """Generates features and labels for training or evaluation.
 
   Args:
     filenames: [str] list of CSV files to read data from.
     tf_transform_output: a TFTransformOutput.
     batch_size: int First dimension size of the Tensors returned by input_fn
+    compression_type: TFRecord compression type of the files.
 
   Returns:
     A (features, indices) tuple where features is a dictionary of
@@ -214,7 +217,7 @@ def _input_fn(filenames, tf_transform_output, batch_size=200):
       filenames,
       batch_size,
       transformed_feature_spec,
-      reader=_gzip_reader_fn)
+      reader=_make_reader_fn(compression_type))
 
   # We pop the label because we do not want to use it as a feature while we're
   # training.
@@ -250,12 +253,14 @@ def trainer_fn(hparams, schema):
   train_input_fn = lambda: _input_fn(  # pylint: disable=g-long-lambda
       hparams.train_files,
       tf_transform_output,
-      batch_size=train_batch_size)
+      batch_size=train_batch_size,
+      compression_type=hparams.compression_type)
 
   eval_input_fn = lambda: _input_fn(  # pylint: disable=g-long-lambda
       hparams.eval_files,
       tf_transform_output,
-      batch_size=eval_batch_size)
+      batch_size=eval_batch_size,
+      compression_type=hparams.compression_type)
 
   train_spec = tf.estimator.TrainSpec(  # pylint: disable=g-long-lambda
       train_input_fn,
@@ -81,7 +81,21 @@ class Trainer(base_component.BaseComponent):
       eval_args=trainer_pb2.EvalArgs(num_steps=5000))
   ```
 
-  ## Example 2: Training through a cloud provider
+  ## Example 2: Training on raw examples with the transform graph
+  ```
+  # Transform is configured with materialize=False, so it has no
+  # 'transformed_examples' output. The raw examples are passed explicitly and
+  # the trainer_fn applies the transform graph to them.
+  trainer = Trainer(
+      module_file=module_file,
+      examples=example_gen.outputs['examples'],
+      schema=infer_schema.outputs['output'],
+      transform_output=transform.outputs['transform_output'],
+      train_args=trainer_pb2.TrainArgs(num_steps=10000),
+      eval_args=trainer_pb2.EvalArgs(num_steps=5000))
+  ```
+
+  ## Example 3: Training through a cloud provider
   ```
   # Train using Google Cloud AI Platform.
   trainer = Trainer(
@@ -119,7 +133,10 @@ class Trainer(base_component.BaseComponent):
     Args:
       examples: A Channel of 'ExamplesPath' type, serving as the source of
         examples that are used in training (required). May be raw or
-        transformed.
+        transformed. Raw examples together with 'transform_output' let the
+        trainer_fn apply the transform graph itself; this is required when
+        Transform is configured with materialize=False, as it then has no
+        'transformed_examples' output to train on.
       transformed_examples: Deprecated field. Please set 'examples' instead.
       transform_output: An optional Channel of 'TransformPath' type, serving as
         the input transform graph if present.
@@ -19,6 +19,7 @@ from __future__ import print_function
 
 import tensorflow as tf
 from tfx.components.trainer import component
+from tfx.components.transform import component as transform_component
 from tfx.proto import trainer_pb2
 from tfx.types import channel_utils
 from tfx.types import standard_artifacts
@@ -74,6 +75,26 @@ class ComponentTest(tf.test.TestCase):
     self._verify_outputs(trainer)
     self.assertEqual(module_file, trainer.spec.exec_properties['module_file'])
 
+  def testConstructWithNonMaterializingTransform(self):
+    transform = transform_component.Transform(
+        input_data=self.examples,
+        schema=self.schema,
+        module_file='/path/to/preprocessing.py',
+        materialize=False)
+    with self.assertRaises(KeyError):
+      _ = transform.outputs['transformed_examples']
+    trainer = component.Trainer(
+        module_file='/path/to/module/file',
+        examples=self.examples,
+        transform_output=transform.outputs['transform_output'],
+        schema=self.schema,
+        train_args=self.train_args,
+        eval_args=self.eval_args)
+    self._verify_outputs(trainer)
+    self.assertIs(self.examples, trainer.inputs['examples'])
+    self.assertIs(transform.outputs['transform_output'],
+                  trainer.inputs['transform_output'])
+
   def testConstructDuplicateExamples(self):
     with self.assertRaises(ValueError):
       _ = component.Trainer(
@@ -139,17 +139,21 @@ class Executor(base_executor.BaseExecutor):
     trainer_fn = self._GetTrainerFn(exec_properties)
 
     # Set up training parameters
+    # A split has an examples artifact for each span if a range of spans is
+    # generated, see example_gen_pb2.RangeConfig.
     train_files = [
-        _all_files_pattern(
-            artifact_utils.get_split_uri(input_dict['examples'], 'train'))
+        _all_files_pattern(uri) for uri in artifact_utils.get_split_uris(
+            input_dict['examples'], 'train')
     ]
     transform_output = artifact_utils.get_single_uri(
         input_dict['transform_output']) if input_dict.get(
             'transform_output', None) else None
     eval_files = [
-        _all_files_pattern(
-            artifact_utils.get_split_uri(input_dict['examples'], 'eval'))
+        _all_files_pattern(uri) for uri in artifact_utils.get_split_uris(
+            input_dict['examples'], 'eval')
     ]
+    compression_type = artifact_utils.get_split_compression_type(
+        input_dict['examples'], 'train')
     schema_file = io_utils.get_only_uri_in_dir(
         artifact_utils.get_single_uri(input_dict['schema']))
 
@@ -190,6 +194,9 @@ class Executor(base_executor.BaseExecutor):
         serving_model_dir=serving_model_dir,
         # A list of uris for eval files.
         eval_files=eval_files,
+        # TFRecord compression type of train and eval files, one of 'GZIP',
+        # 'ZLIB' and '' as accepted by tf.data.TFRecordDataset.
+        compression_type=compression_type,
         # A single uri for schema file.
         schema_file=schema_file,
         # Number of train steps.
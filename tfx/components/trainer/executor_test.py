@@ -104,6 +104,19 @@ class ExecutorTest(tf.test.TestCase):
         exec_properties=self._exec_properties)
     self._verify_model_exports()
 
+  def testDoWithMultipleSpans(self):
+    # Examples of a range of spans have an artifact for each span of a split.
+    train_examples_span2 = standard_artifacts.Examples(split='train')
+    train_examples_span2.uri = os.path.join(
+        self._source_data_dir, 'transform/transformed_examples/eval/')
+    self._input_dict['examples'].append(train_examples_span2)
+    self._exec_properties['trainer_fn'] = self._trainer_fn
+    self._trainer_executor.Do(
+        input_dict=self._input_dict,
+        output_dict=self._output_dict,
+        exec_properties=self._exec_properties)
+    self._verify_model_exports()
+
   def testDoWithNoTrainerFn(self):
     with self.assertRaises(ValueError):
       self._trainer_executor.Do(
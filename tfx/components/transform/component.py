@@ -20,7 +20,9 @@ from typing import Optional, Text
 from tfx import types
 from tfx.components.base import base_component
 from tfx.components.base import executor_spec
+from tfx.components.transform import driver
 from tfx.components.transform import executor
+from tfx.components.transform import labels
 from tfx.types import artifact
 from tfx.types import standard_artifacts
 from tfx.types.standard_component_specs import TransformSpec
@@ -53,11 +55,59 @@ class Transform(base_component.BaseComponent):
       module_file=module_file)
   ```
 
+  ## Execution modes
+  By default, Transform analyzes the 'train' split and transforms both splits.
+  With `mode='analyze_only'`, only the transform graph is produced, without
+  transformed examples. With `mode='apply_only'`, the transform graph of a
+  previous Transform, e.g. of last week's data, is applied to both splits
+  without analysis:
+
+  ```
+  transform = Transform(
+      input_data=example_gen.outputs['examples'],
+      schema=infer_schema.outputs['output'],
+      input_transform_graph=previous_transform_graph,
+      mode='apply_only')
+  ```
+
+  ## Skipping materialization
+  When the Trainer consumes raw examples and applies the transform graph itself,
+  e.g. with `tft.TFTransformOutput.transform_raw_features` in its input_fn,
+  materialized transformed examples are not needed. With `materialize=False`,
+  only the transform graph and metadata are produced, and the
+  'transformed_examples' output is absent. Downstream components do not fall
+  back to raw examples on their own: looking up
+  `transform.outputs['transformed_examples']` raises a KeyError when the
+  pipeline is constructed, so the Trainer must be given the raw examples and
+  the transform graph explicitly:
+
+  ```
+  transform = Transform(
+      input_data=example_gen.outputs['examples'],
+      schema=infer_schema.outputs['output'],
+      module_file=module_file,
+      materialize=False)
+  trainer = Trainer(
+      module_file=module_file,
+      examples=example_gen.outputs['examples'],
+      schema=infer_schema.outputs['output'],
+      transform_output=transform.outputs['transform_output'],
+      train_args=trainer_pb2.TrainArgs(num_steps=10000),
+      eval_args=trainer_pb2.EvalArgs(num_steps=5000))
+  ```
+
+  ## Analyzer cache
+  With `analyzer_cache=True`, the results of analyzers are cached for each
+  dataset, e.g. each span of a rolling range of spans, and the most recent cache
+  produced with the same preprocessing function and schema is used by the next
+  execution, so that only new spans are analyzed.
+
   Please see https://www.tensorflow.org/tfx/transform for more details.
   """
 
   SPEC_CLASS = TransformSpec
   EXECUTOR_SPEC = executor_spec.ExecutorClassSpec(executor.Executor)
+  DRIVER_CLASS = driver.Driver
 
   def __init__(self,
                input_data: types.Channel = None,
@@ -67,6 +117,11 @@ class Transform(base_component.BaseComponent):
                transform_output: Optional[types.Channel] = None,
                transformed_examples: Optional[types.Channel] = None,
                examples: Optional[types.Channel] = None,
+               analyzer_cache: Optional[bool] = None,
+               cache_output_path: Optional[types.Channel] = None,
+               mode: Optional[Text] = None,
+               input_transform_graph: Optional[types.Channel] = None,
+               materialize: Optional[bool] = None,
                instance_name: Optional[Text] = None):
     """Construct a Transform component.
 
@@ -96,33 +151,75 @@ class Transform(base_component.BaseComponent):
         materialized transformed examples, which includes both 'train' and
         'eval' splits.
       examples: Forwards compatibility alias for the 'input_data' argument.
+      analyzer_cache: Optional bool, whether to cache the results of analyzers
+        and start from the most recent compatible cache of a previous
+        execution.
+      cache_output_path: Optional output 'TransformCachePath' channel for the
+        analyzer cache, only used if analyzer_cache is enabled.
+      mode: Optional execution mode, one of 'analyze_and_transform' (default),
+        'analyze_only' and 'apply_only'.
+      input_transform_graph: A Channel of 'TransformPath' type, the transform
+        graph of a previous Transform to apply. Required iff mode is
+        'apply_only', in which case neither 'module_file' nor
+        'preprocessing_fn' is needed.
+      materialize: Optional bool, whether to materialize transformed examples,
+        True by default. If False, the 'transformed_examples' output is not
+        produced, and consumers must read the raw examples instead. Must not
+        be False in 'apply_only' mode.
       instance_name: Optional unique instance name. Necessary iff multiple
         transform components are declared in the same pipeline.
 
     Raises:
       ValueError: When both or neither of 'module_file' and 'preprocessing_fn'
-        is supplied.
+        is supplied, unless in apply only mode, when the mode is unknown, or
+        when 'input_transform_graph' is supplied iff not in apply only mode, or
+        when materialize is False in apply only mode.
     """
     input_data = input_data or examples
-    if bool(module_file) == bool(preprocessing_fn):
+    mode = mode or labels.MODE_ANALYZE_AND_TRANSFORM
+    if mode not in labels.MODES:
+      raise ValueError('Unknown mode {}, expected one of {}.'.format(
+          mode, labels.MODES))
+    if (mode == labels.MODE_APPLY_ONLY) != bool(input_transform_graph):
+      raise ValueError(
+          "'input_transform_graph' must be supplied iff mode is 'apply_only'.")
+    if (mode != labels.MODE_APPLY_ONLY and
+        bool(module_file) == bool(preprocessing_fn)):
       raise ValueError(
           "Exactly one of 'module_file' or 'preprocessing_fn' must be supplied."
       )
+    if materialize is False and mode == labels.MODE_APPLY_ONLY:
+      raise ValueError(
+          "'materialize' must not be False in 'apply_only' mode.")
 
     transform_output = transform_output or types.Channel(
         type=standard_artifacts.TransformGraph,
         artifacts=[standard_artifacts.TransformGraph()])
-    transformed_examples = transformed_examples or types.Channel(
-        type=standard_artifacts.Examples,
-        artifacts=[
-            standard_artifacts.Examples(split=split)
-            for split in artifact.DEFAULT_EXAMPLE_SPLITS
-        ])
+    if mode == labels.MODE_ANALYZE_ONLY or materialize is False:
+      transformed_examples = None
+    else:
+      transformed_examples = transformed_examples or types.Channel(
+          type=standard_artifacts.Examples,
+          artifacts=[
+              standard_artifacts.Examples(split=split)
+              for split in artifact.DEFAULT_EXAMPLE_SPLITS
+          ])
+    if analyzer_cache:
+      cache_output_path = cache_output_path or types.Channel(
+          type=standard_artifacts.TransformCache,
+          artifacts=[standard_artifacts.TransformCache()])
+    else:
+      cache_output_path = None
     spec = TransformSpec(
         input_data=input_data,
         schema=schema,
         module_file=module_file,
         preprocessing_fn=preprocessing_fn,
+        analyzer_cache=analyzer_cache,
+        mode=mode,
+        materialize=materialize,
+        input_transform_graph=input_transform_graph,
         transform_output=transform_output,
-        transformed_examples=transformed_examples)
+        transformed_examples=transformed_examples,
+        cache_output_path=cache_output_path)
     super(Transform, self).__init__(spec=spec, instance_name=instance_name)
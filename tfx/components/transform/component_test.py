@@ -62,6 +62,72 @@ class ComponentTest(tf.test.TestCase):
     self.assertEqual(preprocessing_fn,
                      transform.spec.exec_properties['preprocessing_fn'])
 
+  def testConstructWithAnalyzerCache(self):
+    transform = component.Transform(
+        input_data=self.input_data,
+        schema=self.schema,
+        module_file='/path/to/preprocessing.py',
+        analyzer_cache=True,
+    )
+    self._verify_outputs(transform)
+    self.assertTrue(transform.spec.exec_properties['analyzer_cache'])
+    self.assertEqual('TransformCachePath',
+                     transform.outputs['cache_output_path'].type_name)
+
+  def testConstructAnalyzeOnly(self):
+    transform = component.Transform(
+        input_data=self.input_data,
+        schema=self.schema,
+        module_file='/path/to/preprocessing.py',
+        mode='analyze_only',
+    )
+    self.assertEqual('TransformPath',
+                     transform.outputs['transform_output'].type_name)
+    self.assertNotIn('transformed_examples', transform.outputs.get_all())
+
+  def testConstructApplyOnly(self):
+    transform = component.Transform(
+        input_data=self.input_data,
+        schema=self.schema,
+        input_transform_graph=channel_utils.as_channel(
+            [standard_artifacts.TransformGraph()]),
+        mode='apply_only',
+    )
+    self._verify_outputs(transform)
+    self.assertEqual('apply_only', transform.spec.exec_properties['mode'])
+
+  def testConstructApplyOnlyMissingTransformGraph(self):
+    with self.assertRaises(ValueError):
+      _ = component.Transform(
+          input_data=self.input_data,
+          schema=self.schema,
+          mode='apply_only',
+      )
+
+  def testConstructWithoutMaterialization(self):
+    transform = component.Transform(
+        input_data=self.input_data,
+        schema=self.schema,
+        module_file='/path/to/preprocessing.py',
+        materialize=False,
+    )
+    self.assertEqual('TransformPath',
+                     transform.outputs['transform_output'].type_name)
+    self.assertFalse(transform.spec.exec_properties['materialize'])
+    with self.assertRaises(KeyError):
+      _ = transform.outputs['transformed_examples']
+
+  def testConstructApplyOnlyWithoutMaterialization(self):
+    with self.assertRaises(ValueError):
+      _ = component.Transform(
+          input_data=self.input_data,
+          schema=self.schema,
+          input_transform_graph=channel_utils.as_channel(
+              [standard_artifacts.TransformGraph()]),
+          mode='apply_only',
+          materialize=False,
+      )
+
   def testConstructMissingUserModule(self):
     with self.assertRaises(ValueError):
       _ = component.Transform(
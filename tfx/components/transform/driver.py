@@ -0,0 +1,167 @@
+# Copyright 2019 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""TFX Transform Driver."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import hashlib
+import importlib
+import inspect
+import tensorflow as tf
+from typing import Any, Dict, List, Optional, Text
+from tfx import types
+from tfx.components.base import base_driver
+from tfx.orchestration import data_types
+from tfx.orchestration import metadata
+from tfx.types import artifact_utils
+from tfx.utils import io_utils
+
+# Custom property of analyzer cache artifacts, identifying the preprocessing
+# function and the schema the cache is compatible with.
+_CACHE_KEY = 'analyzer_cache_key'
+
+
+class Driver(base_driver.BaseDriver):
+  """Custom driver for Transform.
+
+  When analyzer cache is enabled, the uri of the most recent analyzer cache
+  produced by a previous execution of this component with the same
+  preprocessing function and schema is passed to the executor as the
+  'cache_input_uri' execution property, so that only datasets, e.g. spans, not
+  in the cache are analyzed. The 'cache_output_path' output is marked as
+  compatible with the preprocessing function and schema, so that later
+  executions can use it.
+
+  The cache is resolved only after the execution cache is checked, as it is not
+  an input of the execution: executions with the same examples, schema and
+  module are still cache hits.
+  """
+
+  def __init__(self, metadata_handler: metadata.Metadata):
+    super(Driver, self).__init__(metadata_handler)
+    # Key of the analyzer cache of this execution, set when resolving inputs.
+    self._cache_key = None  # type: Optional[Text]
+    # Info of the current pipeline run, set when resolving inputs.
+    self._pipeline_info = None  # type: Optional[data_types.PipelineInfo]
+
+  def _get_module_source(self, preprocessing_fn: Text) -> bytes:
+    """Returns the source of the module defining a preprocessing function.
+
+    Only the module named by the preprocessing function path is covered, not
+    modules it imports.
+
+    Args:
+      preprocessing_fn: <module>.<name> path of the preprocessing function.
+
+    Returns:
+      Content of the source file of the module, or the path if the source can
+      not be found.
+    """
+    module_name = preprocessing_fn.rpartition('.')[0]
+    try:
+      source_file = inspect.getsourcefile(
+          importlib.import_module(module_name))
+    except (ImportError, TypeError):
+      source_file = None
+    if not source_file:
+      tf.logging.warning(
+          'Source of module {} not found, analyzer cache is keyed by the '
+          'preprocessing_fn path only.'.format(module_name))
+      return tf.compat.as_bytes(preprocessing_fn)
+    with tf.io.gfile.GFile(source_file, 'rb') as f:
+      return f.read()
+
+  def _get_cache_key(self, input_dict: Dict[Text, List[types.Artifact]],
+                     exec_properties: Dict[Text, Any]) -> Text:
+    """Returns the digest of the preprocessing function and the schema."""
+    digest = hashlib.sha256()
+    if exec_properties.get('module_file'):
+      with tf.io.gfile.GFile(exec_properties['module_file'], 'rb') as f:
+        digest.update(f.read())
+    else:
+      preprocessing_fn = exec_properties.get('preprocessing_fn') or ''
+      digest.update(tf.compat.as_bytes(preprocessing_fn))
+      digest.update(self._get_module_source(preprocessing_fn))
+    schema_file = io_utils.get_only_uri_in_dir(
+        artifact_utils.get_single_uri(input_dict['schema']))
+    with tf.io.gfile.GFile(schema_file, 'rb') as f:
+      digest.update(f.read())
+    return digest.hexdigest()
+
+  def _fetch_latest_cache_uri(
+      self, component_info: data_types.ComponentInfo) -> Optional[Text]:
+    """Returns the uri of the most recent analyzer cache with the key if any.
+
+    Only analyzer caches output by previous executions of this component are
+    considered.
+
+    Args:
+      component_info: info of the current component.
+
+    Returns:
+      The uri of the latest existing analyzer cache with the key, or None.
+    """
+    for artifact in reversed(
+        self._metadata_handler.get_previous_output_artifacts(
+            'cache_output_path', self._pipeline_info, component_info)):
+      if (artifact.custom_properties[_CACHE_KEY].string_value ==
+          self._cache_key and tf.io.gfile.exists(artifact.uri)):
+        return artifact.uri
+    return None
+
+  def resolve_input_artifacts(
+      self,
+      input_dict: Dict[Text, types.Channel],
+      exec_properties: Dict[Text, Any],
+      driver_args: data_types.DriverArgs,
+      pipeline_info: data_types.PipelineInfo,
+  ) -> Dict[Text, List[types.Artifact]]:
+    """Overrides BaseDriver.resolve_input_artifacts()."""
+    result = super(Driver, self).resolve_input_artifacts(
+        input_dict, exec_properties, driver_args, pipeline_info)
+    self._pipeline_info = pipeline_info
+    if exec_properties.get('analyzer_cache'):
+      self._cache_key = self._get_cache_key(result, exec_properties)
+    return result
+
+  def resolve_exec_properties(
+      self,
+      exec_properties: Dict[Text, Any],
+      component_info: data_types.ComponentInfo
+  ) -> Dict[Text, Any]:
+    """Overrides BaseDriver.resolve_exec_properties()."""
+    if self._cache_key and self._pipeline_info:
+      latest_cache_uri = self._fetch_latest_cache_uri(component_info)
+      if latest_cache_uri:
+        tf.logging.info(
+            'Analyzer cache to start from: {}'.format(latest_cache_uri))
+        exec_properties['cache_input_uri'] = latest_cache_uri
+    return exec_properties
+
+  def _prepare_output_artifacts(
+      self,
+      output_dict: Dict[Text, types.Channel],
+      execution_id: int,
+      pipeline_info: data_types.PipelineInfo,
+      component_info: data_types.ComponentInfo,
+  ) -> Dict[Text, List[types.Artifact]]:
+    """Overrides BaseDriver._prepare_output_artifacts()."""
+    result = super(Driver, self)._prepare_output_artifacts(
+        output_dict, execution_id, pipeline_info, component_info)
+    if self._cache_key:
+      for artifact in result.get('cache_output_path', []):
+        artifact.set_string_custom_property(_CACHE_KEY, self._cache_key)
+    return result
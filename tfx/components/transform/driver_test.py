@@ -0,0 +1,162 @@
+# Copyright 2019 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.components.transform.driver."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import sys
+import tensorflow as tf
+from tfx.components.transform import driver
+from tfx.orchestration import data_types
+from tfx.orchestration import metadata
+from tfx.types import channel_utils
+from tfx.types import standard_artifacts
+from tfx.types.artifact import ArtifactState
+from tfx.utils import io_utils
+from ml_metadata.proto import metadata_store_pb2
+
+
+class DriverTest(tf.test.TestCase):
+
+  def setUp(self):
+    super(DriverTest, self).setUp()
+    self._base_dir = os.path.join(
+        os.environ.get('TEST_UNDECLARED_OUTPUTS_DIR', self.get_temp_dir()),
+        self._testMethodName)
+    self._schema = standard_artifacts.Schema()
+    self._schema.uri = os.path.join(self._base_dir, 'schema', '')
+    io_utils.write_string_file(
+        os.path.join(self._schema.uri, 'schema.pbtxt'), 'feature {}')
+    self._exec_properties = {
+        'preprocessing_fn': 'path.to.preprocessing_fn',
+        'analyzer_cache': True,
+    }
+    self._mock_metadata = tf.test.mock.Mock()
+    self._driver = driver.Driver(self._mock_metadata)
+    self._driver._metadata_handler.search_artifacts.return_value = [
+        self._schema
+    ]
+    self._pipeline_info = data_types.PipelineInfo(
+        pipeline_name='name', pipeline_root=self._base_dir, run_id='run')
+    self._component_info = data_types.ComponentInfo(
+        component_type='type', component_id='Transform')
+
+  def _create_cache(self, artifact_id, cache_key, state):
+    cache = standard_artifacts.TransformCache()
+    cache.id = artifact_id
+    cache.uri = os.path.join(self._base_dir, 'cache', str(artifact_id), '')
+    cache.state = state
+    cache.set_string_custom_property(driver._CACHE_KEY, cache_key)
+    tf.io.gfile.makedirs(cache.uri)
+    return cache.artifact
+
+  def _resolve(self):
+    self._driver.resolve_input_artifacts(
+        {'schema': channel_utils.as_channel([self._schema])},
+        self._exec_properties, data_types.DriverArgs(enable_cache=True),
+        self._pipeline_info)
+    return self._driver.resolve_exec_properties(
+        dict(self._exec_properties), self._component_info)
+
+  def testResolveLatestCompatibleCache(self):
+    cache_key = self._driver._get_cache_key({'schema': [self._schema]},
+                                            self._exec_properties)
+    self._mock_metadata.get_previous_output_artifacts.return_value = [
+        self._create_cache(1, cache_key, ArtifactState.PUBLISHED),
+        self._create_cache(2, cache_key, ArtifactState.PUBLISHED),
+        self._create_cache(3, 'other', ArtifactState.PUBLISHED),
+    ]
+
+    exec_properties = self._resolve()
+    self.assertEqual(
+        os.path.join(self._base_dir, 'cache', '2', ''),
+        exec_properties['cache_input_uri'])
+    self._mock_metadata.get_previous_output_artifacts.assert_called_once_with(
+        'cache_output_path', self._pipeline_info, self._component_info)
+
+    output_artifacts = self._driver._prepare_output_artifacts(
+        {
+            'cache_output_path':
+                channel_utils.as_channel(
+                    [standard_artifacts.TransformCache()])
+        }, 5, self._pipeline_info, self._component_info)
+    [cache_output] = output_artifacts['cache_output_path']
+    self.assertEqual(
+        cache_key,
+        cache_output.artifact.custom_properties[driver._CACHE_KEY].string_value)
+
+  def testResolveWithoutCache(self):
+    self._mock_metadata.get_previous_output_artifacts.return_value = []
+    self.assertNotIn('cache_input_uri', self._resolve())
+
+    self._exec_properties['analyzer_cache'] = False
+    self._driver = driver.Driver(self._mock_metadata)
+    self.assertNotIn('cache_input_uri', self._resolve())
+    self._mock_metadata.get_previous_output_artifacts.assert_called_once()
+
+  def testSecondRunWithSameInputsIsExecutionCacheHit(self):
+    connection_config = metadata_store_pb2.ConnectionConfig()
+    connection_config.sqlite.SetInParent()
+    with metadata.Metadata(connection_config=connection_config) as m:
+      m.publish_artifacts([self._schema])
+
+      def run(run_id):
+        pipeline_info = data_types.PipelineInfo(
+            pipeline_name='name', pipeline_root=self._base_dir, run_id=run_id)
+        return driver.Driver(m).pre_execution(
+            {'schema': channel_utils.as_channel([self._schema])}, {
+                'cache_output_path':
+                    channel_utils.as_channel(
+                        [standard_artifacts.TransformCache()])
+            }, dict(self._exec_properties),
+            data_types.DriverArgs(
+                enable_cache=True, interactive_resolution=True), pipeline_info,
+            self._component_info)
+
+      first_run = run('run1')
+      self.assertFalse(first_run.use_cached_results)
+      m.publish_execution(first_run.execution_id, first_run.input_dict,
+                          first_run.output_dict)
+
+      # The analyzer cache of the first run is not an input of the second run,
+      # so the second run reuses the outputs of the first one.
+      second_run = run('run2')
+      self.assertTrue(second_run.use_cached_results)
+      self.assertEqual(first_run.output_dict['cache_output_path'][0].id,
+                       second_run.output_dict['cache_output_path'][0].id)
+
+  def testCacheKeyCoversPreprocessingFnModule(self):
+    module_dir = os.path.join(self._base_dir, 'modules')
+    module_file = os.path.join(module_dir, 'transform_driver_test_module.py')
+    io_utils.write_string_file(module_file, 'def preprocessing_fn(x): return x')
+    sys.path.insert(0, module_dir)
+    self.addCleanup(sys.path.remove, module_dir)
+    self._exec_properties['preprocessing_fn'] = (
+        'transform_driver_test_module.preprocessing_fn')
+    cache_key = self._driver._get_cache_key({'schema': [self._schema]},
+                                            self._exec_properties)
+
+    io_utils.write_string_file(module_file,
+                               'def preprocessing_fn(x): return x + 1')
+    self.assertNotEqual(
+        cache_key,
+        self._driver._get_cache_key({'schema': [self._schema]},
+                                    self._exec_properties))
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -244,45 +244,111 @@ class Executor(base_executor.BaseExecutor):
     Args:
       input_dict: Input dict from input key to a list of artifacts, including:
         - input_data: A list of 'ExamplesPath' type which should contain two
-          splits 'train' and 'eval'.
+          splits 'train' and 'eval', possibly with an artifact for each span.
         - schema: A list of 'SchemaPath' type which should contain a single
           schema artifact.
+        - cache_input_path: Optional list of 'TransformCachePath' type which
+          should contain a single analyzer cache artifact.
+        - input_transform_graph: A list of 'TransformPath' type which should
+          contain a single transform graph artifact, only in apply only mode.
       output_dict: Output dict from key to a list of artifacts, including:
         - transform_output: Output of 'tf.Transform', which includes an exported
           Tensorflow graph suitable for both training and serving;
         - transformed_examples: Materialized transformed examples, which
-          includes both 'train' and 'eval' splits.
-      exec_properties: A dict of execution properties, including either one of:
+          includes both 'train' and 'eval' splits. Not used in analyze only
+          mode or without materialization.
+        - cache_output_path: Optional list of 'TransformCachePath' type which
+          should contain a single artifact the analyzer cache is written to.
+      exec_properties: A dict of execution properties, including either one of
+        the following, unless in apply only mode:
         - module_file: The file path to a python module file, from which the
           'preprocessing_fn' function will be loaded.
         - preprocessing_fn: The module path to a python function that
           implements 'preprocessing_fn'.
+        and optionally:
+        - mode: One of labels.MODES, labels.MODE_ANALYZE_AND_TRANSFORM by
+          default.
+        - materialize: Whether to materialize transformed examples, True by
+          default. If False, only the transform graph is produced, as in
+          analyze only mode.
+        - cache_input_uri: Uri of the analyzer cache to start from, set by the
+          driver when analyzer cache is enabled. Used if no cache_input_path
+          input is given.
+
+    Raises:
+      ValueError: If mode is unknown, or if materialize is False in apply only
+        mode.
 
     Returns:
       None
     """
     self._log_startup(input_dict, output_dict, exec_properties)
-    train_data_uri = artifact_utils.get_split_uri(input_dict['input_data'],
-                                                  'train')
-    eval_data_uri = artifact_utils.get_split_uri(input_dict['input_data'],
-                                                 'eval')
+    # Each span of a split is a separate dataset, so that analysis of spans
+    # already in the analyzer cache is skipped.
+    train_data_uris = [
+        artifact.uri
+        for artifact in input_dict['input_data']
+        if artifact.split == 'train'
+    ]
+    eval_data_uris = [
+        artifact.uri
+        for artifact in input_dict['input_data']
+        if artifact.split == 'eval'
+    ]
+    mode = exec_properties.get('mode') or labels.MODE_ANALYZE_AND_TRANSFORM
+    if mode not in labels.MODES:
+      raise ValueError('Unknown mode {}, expected one of {}.'.format(
+          mode, labels.MODES))
+    materialize = exec_properties.get('materialize') is not False
+    if not materialize:
+      if mode == labels.MODE_APPLY_ONLY:
+        raise ValueError(
+            "'materialize' must not be False in 'apply_only' mode, which only "
+            'produces transformed examples.')
+      # Without materialization, transformed data is neither written nor used
+      # for statistics, so the transform phase is skipped altogether.
+      mode = labels.MODE_ANALYZE_ONLY
     schema_file = io_utils.get_only_uri_in_dir(
         artifact_utils.get_single_uri(input_dict['schema']))
     transform_output = artifact_utils.get_single_uri(
         output_dict['transform_output'])
-    transformed_train_output = artifact_utils.get_split_uri(
-        output_dict['transformed_examples'], 'train')
-    transformed_eval_output = artifact_utils.get_split_uri(
-        output_dict['transformed_examples'], 'eval')
     temp_path = os.path.join(transform_output, _TEMP_DIR_IN_TRANSFORM_OUTPUT)
     tf.logging.debug('Using temp path %s for tft.beam', temp_path)
 
     def _GetCachePath(label, params_dict):
-      if label not in params_dict:
+      if not params_dict.get(label):
         return None
       else:
         return artifact_utils.get_single_uri(params_dict[label])
 
+    def _GetMaterializeOutputPaths(data_uris, output_uri):
+      if len(data_uris) == 1:
+        return [os.path.join(output_uri, _DEFAULT_TRANSFORMED_EXAMPLES_PREFIX)]
+      return [
+          os.path.join(output_uri, '{}_{}'.format(
+              _DEFAULT_TRANSFORMED_EXAMPLES_PREFIX, index))
+          for index in range(len(data_uris))
+      ]
+
+    if mode == labels.MODE_APPLY_ONLY:
+      analyze_data_uris = []
+    else:
+      analyze_data_uris = train_data_uris
+    if mode == labels.MODE_ANALYZE_ONLY:
+      transform_data_uris = []
+      materialize_output_paths = []
+    else:
+      transform_data_uris = train_data_uris + eval_data_uris
+      materialize_output_paths = (
+          _GetMaterializeOutputPaths(
+              train_data_uris,
+              artifact_utils.get_split_uri(output_dict['transformed_examples'],
+                                           'train')) +
+          _GetMaterializeOutputPaths(
+              eval_data_uris,
+              artifact_utils.get_split_uri(output_dict['transformed_examples'],
+                                           'eval')))
+
     label_inputs = {
         labels.COMPUTE_STATISTICS_LABEL:
             False,
@@ -290,17 +356,16 @@ class Executor(base_executor.BaseExecutor):
             schema_file,
         labels.EXAMPLES_DATA_FORMAT_LABEL:
             labels.FORMAT_TF_EXAMPLE,
-        labels.ANALYZE_DATA_PATHS_LABEL:
-            io_utils.all_files_pattern(train_data_uri),
+        labels.ANALYZE_DATA_PATHS_LABEL: [
+            io_utils.all_files_pattern(uri) for uri in analyze_data_uris
+        ],
         labels.ANALYZE_PATHS_FILE_FORMATS_LABEL:
-            labels.FORMAT_TFRECORD,
+            [labels.FORMAT_TFRECORD] * len(analyze_data_uris),
         labels.TRANSFORM_DATA_PATHS_LABEL: [
-            io_utils.all_files_pattern(train_data_uri),
-            io_utils.all_files_pattern(eval_data_uri)
-        ],
-        labels.TRANSFORM_PATHS_FILE_FORMATS_LABEL: [
-            labels.FORMAT_TFRECORD, labels.FORMAT_TFRECORD
+            io_utils.all_files_pattern(uri) for uri in transform_data_uris
         ],
+        labels.TRANSFORM_PATHS_FILE_FORMATS_LABEL:
+            [labels.FORMAT_TFRECORD] * len(transform_data_uris),
         labels.TFT_STATISTICS_USE_TFDV_LABEL:
             True,
         labels.MODULE_FILE:
@@ -308,18 +373,19 @@ class Executor(base_executor.BaseExecutor):
         labels.PREPROCESSING_FN:
             exec_properties.get('preprocessing_fn', None),
     }
-    cache_input = _GetCachePath('cache_input_path', input_dict)
+    cache_input = (
+        _GetCachePath('cache_input_path', input_dict) or
+        exec_properties.get('cache_input_uri'))
     if cache_input is not None:
       label_inputs[labels.CACHE_INPUT_PATH_LABEL] = cache_input
+    if mode == labels.MODE_APPLY_ONLY:
+      label_inputs[labels.INPUT_TRANSFORM_OUTPUT_PATH_LABEL] = (
+          artifact_utils.get_single_uri(input_dict['input_transform_graph']))
 
     label_outputs = {
         labels.TRANSFORM_METADATA_OUTPUT_PATH_LABEL: transform_output,
-        labels.TRANSFORM_MATERIALIZE_OUTPUT_PATHS_LABEL: [
-            os.path.join(transformed_train_output,
-                         _DEFAULT_TRANSFORMED_EXAMPLES_PREFIX),
-            os.path.join(transformed_eval_output,
-                         _DEFAULT_TRANSFORMED_EXAMPLES_PREFIX),
-        ],
+        labels.TRANSFORM_MATERIALIZE_OUTPUT_PATHS_LABEL:
+            materialize_output_paths,
         labels.TEMP_OUTPUT_LABEL: str(temp_path),
     }
     cache_output = _GetCachePath('cache_output_path', output_dict)
@@ -397,15 +463,14 @@ class Executor(base_executor.BaseExecutor):
 
   @staticmethod
   @beam.ptransform_fn
-  @beam.typehints.with_input_types(
-      beam.typehints.KV[bytes, example_pb2.Example])
+  @beam.typehints.with_input_types(bytes)
   @beam.typehints.with_output_types(beam.pvalue.PDone)
   def _WriteExamples(pcollection: beam.pvalue.PCollection, file_format: Text,
                      transformed_example_path: Text) -> beam.pvalue.PDone:
     """Writes transformed examples compressed in gzip format.
 
     Args:
-      pcollection: PCollection of transformed examples.
+      pcollection: PCollection of serialized transformed examples.
       file_format: The output file format.
       transformed_example_path: path to write to.
 
@@ -416,11 +481,10 @@ class Executor(base_executor.BaseExecutor):
       raise ValueError('Unsupported output file format: {}'.format(file_format))
 
     return (pcollection
-            | 'DropNoneKeys' >> beam.Values()
             | 'Write' >> beam.io.WriteToTFRecord(
                 transformed_example_path,
                 file_name_suffix='.gz',
-                coder=beam.coders.ProtoCoder(example_pb2.Example)))
+                coder=beam.coders.BytesCoder()))
 
   def _GetSchema(self, schema_path: Text) -> schema_pb2.Schema:
     """Gets a tf.metadata schema.
@@ -620,12 +684,55 @@ class Executor(base_executor.BaseExecutor):
         self._coder = tft.coders.ExampleProtoCoder(
             metadata.schema, serialized=False)
 
-      # Make sure that the synthetic key feature doesn't get encoded.
+      # The coder only encodes features of the schema, so the synthetic key
+      # feature doesn't get encoded without copying the element to remove it.
       assert _TRANSFORM_INTERNAL_FEATURE_FOR_KEY in element
       key = element[_TRANSFORM_INTERNAL_FEATURE_FOR_KEY]
-      element_copy = element.copy()
-      del element_copy[_TRANSFORM_INTERNAL_FEATURE_FOR_KEY]
-      yield (key, self._coder.encode(element_copy))
+      yield (key, self._coder.encode(element))
+
+  @beam.typehints.with_input_types(
+      beam.typehints.List[beam.typehints.Dict[str, beam.typehints.Any]],
+      metadata=beam.typehints.Any)
+  @beam.typehints.with_output_types(bytes)
+  class _EncodeBatchAsSerializedExamples(beam.DoFn):
+    """Encodes batches of data as serialized tf.Examples.
+
+    Used for materialization, where the synthetic key is not needed. Serialized
+    examples are encoded directly from the coder's reused example, without
+    creating an example proto for each element.
+    """
+
+    def __init__(self):
+      self._coder = None
+
+    def process(self, batch: List[Dict[Text, Any]],
+                metadata: Any) -> List[bytes]:
+      if self._coder is None:
+        self._coder = tft.coders.ExampleProtoCoder(
+            metadata.schema, serialized=True)
+      encode = self._coder.encode
+      return [encode(element) for element in batch]
+
+  @staticmethod
+  @beam.ptransform_fn
+  @beam.typehints.with_input_types(
+      beam.typehints.Dict[str, beam.typehints.Any])
+  @beam.typehints.with_output_types(bytes)
+  def _EncodeAsSerializedExamples(pcollection: beam.pvalue.PCollection,
+                                  metadata: Any) -> beam.pvalue.PCollection:
+    """Encodes data as serialized tf.Examples based on the given metadata.
+
+    Args:
+      pcollection: PCollection of transformed instance dicts.
+      metadata: Metadata of the transformed data.
+
+    Returns:
+      PCollection of serialized tf.Examples.
+    """
+    return (pcollection
+            | 'BatchElements' >> beam.BatchElements()
+            | 'EncodeBatch' >> beam.ParDo(
+                Executor._EncodeBatchAsSerializedExamples(), metadata))
 
   @staticmethod
   @beam.ptransform_fn
@@ -734,6 +841,9 @@ class Executor(base_executor.BaseExecutor):
           preprocessing_fn, optional.
         - labels.PREPROCESSING_FN: Path to a Python function that implements
           preprocessing_fn, optional.
+        - labels.INPUT_TRANSFORM_OUTPUT_PATH_LABEL: Path to the output of a
+          previous Transform, optional. If given, its transform graph is
+          applied to the transform data and nothing is analyzed.
       outputs: A dictionary of labelled output values, including:
         - labels.PER_SET_STATS_OUTPUT_PATHS_LABEL: Paths to statistics output,
           optional.
@@ -771,6 +881,15 @@ class Executor(base_executor.BaseExecutor):
         not self._ShouldDecodeAsRawExample(raw_examples_data_format)):
       raise ValueError(messages.SCHEMA_EMPTY)
 
+    input_transform_output_path = value_utils.GetSoleValue(
+        inputs, labels.INPUT_TRANSFORM_OUTPUT_PATH_LABEL, strict=False)
+    if input_transform_output_path:
+      self._RunApplyImpl(inputs, outputs, input_dataset_metadata,
+                         raw_examples_data_format, transform_output_path,
+                         input_transform_output_path)
+      # TODO(b/122478841): Writes status to status file.
+      return
+
     preprocessing_fn = self._GetPreprocessingFn(inputs, outputs)
 
     materialize_output_paths = value_utils.GetValues(
@@ -1062,11 +1181,19 @@ class Executor(base_executor.BaseExecutor):
                  transform_fn)
                 | 'Transform[{}]'.format(infix) >> tft_beam.TransformDataset())
 
-            if materialize_output_paths or not stats_use_tfdv:
+            if not stats_use_tfdv:
               dataset.transformed_and_encoded = (
                   dataset.transformed | 'Encode[{}]'.format(infix) >>
                   beam.ParDo(self._EncodeAsExamples(), metadata))
 
+            if materialize_output_paths:
+              (dataset.transformed
+               | 'EncodeSerialized[{}]'.format(infix) >>
+               self._EncodeAsSerializedExamples(metadata)
+               | 'Materialize[{}]'.format(infix) >> self._WriteExamples(
+                   transform_paths_file_formats[-1],
+                   dataset.materialize_output_path))
+
           if compute_statistics:
             # Aggregated feature stats after transformation.
             _, metadata = transform_fn
@@ -1104,13 +1231,80 @@ class Executor(base_executor.BaseExecutor):
                     transformed_schema_proto,
                     use_tfdv=stats_use_tfdv)
 
-          if materialize_output_paths:
-            for dataset in transform_data_list:
-              infix = 'TransformIndex{}'.format(dataset.index)
-              (dataset.transformed_and_encoded
-               | 'Materialize[{}]'.format(infix) >> self._WriteExamples(
-                   transform_paths_file_formats[-1],
-                   dataset.materialize_output_path))
+    return _Status.OK()
+
+  def _RunApplyImpl(self, inputs: Mapping[Text, Any],
+                    outputs: Mapping[Text, Any],
+                    input_dataset_metadata: dataset_metadata.DatasetMetadata,
+                    raw_examples_data_format: Text, transform_output_path: Text,
+                    input_transform_output_path: Text) -> _Status:
+    """Transforms data with the transform graph of a previous Transform.
+
+    The previous output is copied as the output, and the transform data is
+    transformed with its transform graph and materialized, without analysis.
+
+    Args:
+      inputs: A dictionary of labelled input values.
+      outputs: A dictionary of labelled output values.
+      input_dataset_metadata: A DatasetMetadata object for the input data.
+      raw_examples_data_format: A string describing the raw data format.
+      transform_output_path: An absolute path to write the output to.
+      input_transform_output_path: An absolute path to the previous output.
+
+    Returns:
+      Status of the execution.
+    """
+    tf.logging.info('Applying the transform graph in %s',
+                    input_transform_output_path)
+    transform_data_paths = value_utils.GetValues(
+        inputs, labels.TRANSFORM_DATA_PATHS_LABEL)
+    transform_paths_file_formats = value_utils.GetValues(
+        inputs, labels.TRANSFORM_PATHS_FILE_FORMATS_LABEL)
+    materialize_output_paths = value_utils.GetValues(
+        outputs, labels.TRANSFORM_MATERIALIZE_OUTPUT_PATHS_LABEL)
+    temp_path = value_utils.GetSoleValue(outputs, labels.TEMP_OUTPUT_LABEL)
+    if len(transform_data_paths) != len(materialize_output_paths):
+      return _Status.Error(
+          'size of transform_data_paths and '
+          'materialize_output_paths do not match: {} v.s {}'.format(
+              len(transform_data_paths), len(materialize_output_paths)))
+
+    io_utils.copy_dir(input_transform_output_path, transform_output_path)
+
+    transform_data_list = self._MakeDatasetList(
+        transform_data_paths, transform_paths_file_formats,
+        raw_examples_data_format, input_dataset_metadata, False, None,
+        materialize_output_paths)
+    decode_fn = self._GetDecodeFunction(raw_examples_data_format,
+                                        input_dataset_metadata.schema)
+
+    with self._CreatePipeline(outputs) as p:
+      with tft_beam.Context(
+          temp_dir=temp_path,
+          desired_batch_size=self._GetDesiredBatchSize(
+              raw_examples_data_format),
+          passthrough_keys={_TRANSFORM_INTERNAL_FEATURE_FOR_KEY},
+          use_deep_copy_optimization=True):
+        # pylint: disable=expression-not-assigned
+        # pylint: disable=no-value-for-parameter
+        transform_fn = (
+            p | 'ReadTransformFn' >> tft_beam.ReadTransformFn(
+                input_transform_output_path))
+        for dataset in transform_data_list:
+          infix = 'TransformIndex{}'.format(dataset.index)
+          dataset.encoded = (
+              p | 'ReadDataset[{}]'.format(infix) >> self._ReadExamples(dataset))
+          dataset.decoded = (
+              dataset.encoded
+              | 'Decode[{}]'.format(infix) >> self._DecodeInputs(decode_fn))
+          (dataset.transformed, metadata) = (
+              ((dataset.decoded, input_dataset_metadata), transform_fn)
+              | 'Transform[{}]'.format(infix) >> tft_beam.TransformDataset())
+          (dataset.transformed
+           | 'EncodeSerialized[{}]'.format(infix) >>
+           self._EncodeAsSerializedExamples(metadata)
+           | 'Materialize[{}]'.format(infix) >> self._WriteExamples(
+               dataset.file_format, dataset.materialize_output_path))
 
     return _Status.OK()
 
@@ -1318,5 +1512,7 @@ class Executor(base_executor.BaseExecutor):
 
   @staticmethod
   def _CopyCache(src, dst):
-    # TODO(b/37788560): Make this more efficient.
-    io_utils.copy_dir(src, dst)
+    # Analyzer caches have many small files, which copy_dir copies in parallel.
+    # Cache files are never modified in place, so entries already in the
+    # destination are kept and local files are hard linked.
+    io_utils.copy_dir(src, dst, sync=True, hard_link=True)
@@ -19,8 +19,12 @@ from __future__ import print_function
 
 import os
 import tempfile
+import apache_beam as beam
+from apache_beam.testing import util
 import tensorflow as tf
 import tensorflow_transform as tft
+from tensorflow_transform.tf_metadata import dataset_metadata
+from tensorflow_transform.tf_metadata import schema_utils
 from tfx import types
 from tfx.components.testdata.module_file import transform_module
 from tfx.components.transform import executor
@@ -100,11 +104,80 @@ class ExecutorTest(tf.test.TestCase):
         0, len(tf.gfile.ListDirectory(self._transformed_train_examples.uri)))
     self.assertNotEqual(
         0, len(tf.gfile.ListDirectory(self._transformed_eval_examples.uri)))
+    # Materialized examples are parseable and don't contain the synthetic key.
+    options = tf.python_io.TFRecordOptions(
+        tf.python_io.TFRecordCompressionType.GZIP)
+    for output_file in tf.gfile.Glob(
+        os.path.join(self._transformed_train_examples.uri, '*')):
+      for record in tf.python_io.tf_record_iterator(output_file, options):
+        example = tf.train.Example.FromString(record)
+        self.assertNotEqual(0, len(example.features.feature))
+        self.assertNotIn(executor._TRANSFORM_INTERNAL_FEATURE_FOR_KEY,
+                         example.features.feature)
     path_to_saved_model = os.path.join(
         self._transformed_output.uri, tft.TFTransformOutput.TRANSFORM_FN_DIR,
         tf.saved_model.constants.SAVED_MODEL_FILENAME_PB)
     self.assertTrue(tf.gfile.Exists(path_to_saved_model))
 
+  def _make_encode_inputs(self):
+    metadata = dataset_metadata.DatasetMetadata(
+        schema_utils.schema_from_feature_spec({
+            'x': tf.io.FixedLenFeature([], tf.float32),
+            's': tf.io.VarLenFeature(tf.string),
+        }))
+    instances = [{
+        'x': float(i),
+        's': [b'a'] * i,
+        executor._TRANSFORM_INTERNAL_FEATURE_FOR_KEY: str(i).encode(),
+    } for i in range(5)]
+    return metadata, instances
+
+  def testEncodeAsExamples(self):
+    metadata, instances = self._make_encode_inputs()
+    with beam.Pipeline() as pipeline:
+      examples = (
+          pipeline
+          | beam.Create(instances)
+          | beam.ParDo(executor.Executor._EncodeAsExamples(), metadata))
+
+      def check_result(got):
+        # We use Python assertion here to avoid Beam serialization error in
+        # pickling tf.test.TestCase.
+        assert len(got) == 5, 'Unexpected example count'
+        for key, example in got:
+          i = int(key)
+          feature = example.features.feature
+          assert sorted(feature.keys()) == ['s', 'x'], 'Unexpected features'
+          assert list(feature['x'].float_list.value) == [float(i)]
+          assert list(feature['s'].bytes_list.value) == [b'a'] * i
+
+      util.assert_that(examples, check_result)
+
+  def testEncodeAsSerializedExamples(self):
+    metadata, instances = self._make_encode_inputs()
+    with beam.Pipeline() as pipeline:
+      examples = (
+          pipeline
+          | beam.Create(instances)
+          | executor.Executor._EncodeAsSerializedExamples(metadata)
+          | beam.Map(tf.train.Example.FromString))
+
+      def check_result(got):
+        # We use Python assertion here to avoid Beam serialization error in
+        # pickling tf.test.TestCase.
+        assert len(got) == 5, 'Unexpected example count'
+        got_values = []
+        for example in got:
+          feature = example.features.feature
+          assert sorted(feature.keys()) == ['s', 'x'], 'Unexpected features'
+          got_values.append((list(feature['x'].float_list.value),
+                             list(feature['s'].bytes_list.value)))
+        assert sorted(got_values) == [
+            ([float(i)], [b'a'] * i) for i in range(5)
+        ], 'Examples do not round-trip'
+
+      util.assert_that(examples, check_result)
+
   def testDoWithModuleFile(self):
     self._exec_properties['module_file'] = self._module_file
     self._transform_executor.Do(self._input_dict, self._output_dict,
@@ -129,6 +202,52 @@ class ExecutorTest(tf.test.TestCase):
       self._transform_executor.Do(self._input_dict, self._output_dict,
                                   self._exec_properties)
 
+  def testDoAnalyzeOnlyThenApplyOnly(self):
+    # Analyze only run produces the transform graph without examples.
+    del self._output_dict['transformed_examples']
+    self._exec_properties['module_file'] = self._module_file
+    self._exec_properties['mode'] = 'analyze_only'
+    self._transform_executor.Do(self._input_dict, self._output_dict,
+                                self._exec_properties)
+    path_to_saved_model = os.path.join(
+        self._transformed_output.uri, tft.TFTransformOutput.TRANSFORM_FN_DIR,
+        tf.saved_model.constants.SAVED_MODEL_FILENAME_PB)
+    self.assertTrue(tf.gfile.Exists(path_to_saved_model))
+    self.assertFalse(tf.gfile.Exists(self._transformed_train_examples.uri))
+
+    # Apply only run transforms examples with the graph, without analysis.
+    input_transform_graph = self._transformed_output
+    self._output_data_dir = self._get_output_data_dir('apply_only')
+    self._make_base_do_params(self._source_data_dir, self._output_data_dir)
+    self._input_dict['input_transform_graph'] = [input_transform_graph]
+    self._exec_properties = {'mode': 'apply_only'}
+    self._transform_executor.Do(self._input_dict, self._output_dict,
+                                self._exec_properties)
+    self._verify_transform_outputs()
+
+  def testDoWithoutMaterialization(self):
+    del self._output_dict['transformed_examples']
+    self._exec_properties['module_file'] = self._module_file
+    self._exec_properties['materialize'] = False
+    self._transform_executor.Do(self._input_dict, self._output_dict,
+                                self._exec_properties)
+    path_to_saved_model = os.path.join(
+        self._transformed_output.uri, tft.TFTransformOutput.TRANSFORM_FN_DIR,
+        tf.saved_model.constants.SAVED_MODEL_FILENAME_PB)
+    self.assertTrue(tf.gfile.Exists(path_to_saved_model))
+    self.assertTrue(
+        tf.gfile.Exists(
+            os.path.join(self._transformed_output.uri,
+                         tft.TFTransformOutput.TRANSFORMED_METADATA_DIR)))
+    self.assertFalse(tf.gfile.Exists(self._transformed_train_examples.uri))
+
+  def testDoWithUnknownMode(self):
+    self._exec_properties['module_file'] = self._module_file
+    self._exec_properties['mode'] = 'unknown'
+    with self.assertRaises(ValueError):
+      self._transform_executor.Do(self._input_dict, self._output_dict,
+                                  self._exec_properties)
+
   def testDoWithCache(self):
     # First run that creates cache.
     output_cache_artifact = types.Artifact('OutputCache')
@@ -28,6 +28,9 @@ BEAM_PIPELINE_ARGS = 'pipeline_args'
 # This label is currently not used externally.
 EXAMPLES_METADATA_LABEL = 'examples_metadata'
 CACHE_INPUT_PATH_LABEL = 'cache_input_path'
+# Path to the output of a previous Transform, whose transform graph is applied
+# to the transform data without analysis.
+INPUT_TRANSFORM_OUTPUT_PATH_LABEL = 'input_transform_output_path'
 
 # Output labels.
 # TODO(b/72214804): Ideally per-set stats and materialization output paths
@@ -40,6 +43,15 @@ TRANSFORM_METADATA_OUTPUT_PATH_LABEL = 'transform_output_path'
 CACHE_OUTPUT_PATH_LABEL = 'cache_output_path'
 TEMP_OUTPUT_LABEL = 'temp_path'
 
+# Execution modes.
+# Analyzes data to produce the transform graph and transforms data with it.
+MODE_ANALYZE_AND_TRANSFORM = 'analyze_and_transform'
+# Only analyzes data to produce the transform graph.
+MODE_ANALYZE_ONLY = 'analyze_only'
+# Only transforms data with the transform graph of a previous Transform.
+MODE_APPLY_ONLY = 'apply_only'
+MODES = (MODE_ANALYZE_AND_TRANSFORM, MODE_ANALYZE_ONLY, MODE_APPLY_ONLY)
+
 # Examples File Format
 FORMAT_TFRECORD = 'FORMAT_TFRECORD'
 
@@ -76,11 +76,10 @@ def _get_raw_feature_spec(schema):
   return schema_utils.schema_as_feature_spec(schema).feature_spec
 
 
-def _gzip_reader_fn(filenames):
-  """Small utility returning a record reader that can read gzip'ed files."""
-  return tf.data.TFRecordDataset(
-      filenames,
-      compression_type='GZIP')
+def _make_reader_fn(compression_type):
+  """Returns a record reader that can read files of the compression type."""
+  return lambda filenames: tf.data.TFRecordDataset(  # pylint: disable=g-long-lambda
+      filenames, compression_type=compression_type)
 
 
 def _fill_in_missing(x):
@@ -258,13 +257,17 @@ def _eval_input_receiver_fn(tf_transform_output, schema):
       labels=transformed_features[_transformed_name(_LABEL_KEY)])
 
 
-def _input_fn(filenames, tf_transform_output, batch_size=200):
+def _input_fn(filenames,
+              tf_transform_output,
+              batch_size=200,
+              compression_type='GZIP'):
   """Generates features and labels for training or evaluation.
 
   Args:
     filenames: [str] list of CSV files to read data from.
     tf_transform_output: A TFTransformOutput.
     batch_size: int First dimension size of the Tensors returned by input_fn
+    compression_type: TFRecord compression type of the files.
 
   Returns:
     A (features, indices) tuple where features is a dictionary of
@@ -274,7 +277,10 @@ def _input_fn(filenames, tf_transform_output, batch_size=200):
       tf_transform_output.transformed_feature_spec().copy())
 
   dataset = tf.data.experimental.make_batched_features_dataset(
-      filenames, batch_size, transformed_feature_spec, reader=_gzip_reader_fn)
+      filenames,
+      batch_size,
+      transformed_feature_spec,
+      reader=_make_reader_fn(compression_type))
 
   transformed_features = dataset.make_one_shot_iterator().get_next()
   # We pop the label because we do not want to use it as a feature while we're
@@ -311,12 +317,14 @@ def trainer_fn(hparams, schema):
   train_input_fn = lambda: _input_fn(  # pylint: disable=g-long-lambda
       hparams.train_files,
       tf_transform_output,
-      batch_size=train_batch_size)
+      batch_size=train_batch_size,
+      compression_type=hparams.compression_type)
 
   eval_input_fn = lambda: _input_fn(  # pylint: disable=g-long-lambda
       hparams.eval_files,
       tf_transform_output,
-      batch_size=eval_batch_size)
+      batch_size=eval_batch_size,
+      compression_type=hparams.compression_type)
 
   train_spec = tf.estimator.TrainSpec(  # pylint: disable=g-long-lambda
       train_input_fn,
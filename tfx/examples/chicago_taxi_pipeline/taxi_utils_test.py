@@ -127,6 +127,7 @@ class TaxiUtilsTest(tf.test.TestCase):
         eval_files=os.path.join(self._testdata_path,
                                 'transform/transformed_examples/eval/*.gz'),
         schema_file=schema_file,
+        compression_type='GZIP',
         train_steps=1,
         eval_steps=1,
         verbosity='INFO',
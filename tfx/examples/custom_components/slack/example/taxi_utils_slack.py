@@ -81,11 +81,10 @@ def _get_raw_feature_spec(schema):
   return schema_utils.schema_as_feature_spec(schema).feature_spec
 
 
-def _gzip_reader_fn():
-  """Small utility returning a record reader that can read gzip'ed files."""
-  return tf.TFRecordReader(
-      options=tf.python_io.TFRecordOptions(
-          compression_type=tf.python_io.TFRecordCompressionType.GZIP))
+def _make_reader_fn(compression_type):
+  """Returns a record reader that can read files of the compression type."""
+  return lambda: tf.TFRecordReader(  # pylint: disable=g-long-lambda
+      options=tf.python_io.TFRecordOptions(compression_type=compression_type))
 
 
 def _fill_in_missing(x):
@@ -267,7 +266,10 @@ def _eval_input_receiver_fn(transform_output, schema):
       labels=transformed_features[_transformed_name(_LABEL_KEY)])
 
 
-def _input_fn(filenames, transform_output, batch_size=200):
+def _input_fn(filenames,
+              transform_output,
+              batch_size=200,
+              compression_type='GZIP'):
   """Generates features and labels for training or evaluation.
 
   Args:
@@ -275,6 +277,7 @@ def _input_fn(filenames, transform_output, batch_size=200):
     transform_output: directory in which the tf-transform model was written
       during the preprocessing step.
     batch_size: int First dimension size of the Tensors returned by input_fn
+    compression_type: TFRecord compression type of the files.
 
   Returns:
     A (features, indices) tuple where features is a dictionary of
@@ -286,7 +289,10 @@ def _input_fn(filenames, transform_output, batch_size=200):
   transformed_feature_spec = transformed_metadata.schema.as_feature_spec()
 
   transformed_features = tf.contrib.learn.io.read_batch_features(
-      filenames, batch_size, transformed_feature_spec, reader=_gzip_reader_fn)
+      filenames,
+      batch_size,
+      transformed_feature_spec,
+      reader=_make_reader_fn(compression_type))
 
   # We pop the label because we do not want to use it as a feature while we're
   # training.
@@ -320,12 +326,14 @@ def trainer_fn(hparams, schema):
   train_input_fn = lambda: _input_fn(  # pylint: disable=g-long-lambda
       hparams.train_files,
       hparams.transform_output,
-      batch_size=train_batch_size)
+      batch_size=train_batch_size,
+      compression_type=hparams.compression_type)
 
   eval_input_fn = lambda: _input_fn(  # pylint: disable=g-long-lambda
       hparams.eval_files,
       hparams.transform_output,
-      batch_size=eval_batch_size)
+      batch_size=eval_batch_size,
+      compression_type=hparams.compression_type)
 
   train_spec = tf.estimator.TrainSpec(  # pylint: disable=g-long-lambda
       train_input_fn,
@@ -17,15 +17,18 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from concurrent import futures
 import datetime
 import os
+import time
 
 import apache_beam as beam
 import tensorflow as tf
-from typing import Any, Iterable, List, Optional, Text, Type
+from typing import Any, Dict, Iterable, List, Optional, Set, Text, Type
 
 from tfx.components.base import base_component
 from tfx.orchestration import data_types
+from tfx.orchestration import metadata
 from tfx.orchestration import pipeline
 from tfx.orchestration import tfx_runner
 from tfx.orchestration.launcher import base_component_launcher
@@ -88,29 +91,61 @@ class BeamDagRunner(tfx_runner.TfxRunner):
       in_process_component_launcher.InProcessComponentLauncher
   ]
 
-  def __init__(self, beam_orchestrator_args: Optional[List[Text]] = None):
+  def __init__(self,
+               beam_orchestrator_args: Optional[List[Text]] = None,
+               max_parallelism: Optional[int] = None):
     """Initializes BeamDagRunner as a TFX orchestrator.
 
     Args:
       beam_orchestrator_args: beam args for the beam orchestrator. Note that
         this is different from the beam_pipeline_args within
         additional_pipeline_args, which is for beam pipelines in components.
+      max_parallelism: optional maximum number of components running at the
+        same time. If set, the pipeline is run by a local scheduler which
+        launches every component as soon as all its upstream components are
+        finished, instead of by a Beam orchestration pipeline.
+        beam_orchestrator_args is ignored in this mode.
+
+    Raises:
+      ValueError: if max_parallelism is not positive.
     """
     super(BeamDagRunner, self).__init__()
+    if max_parallelism is not None and max_parallelism < 1:
+      raise ValueError(
+          'max_parallelism must be positive, got %s' % max_parallelism)
     self._beam_orchestrator_args = beam_orchestrator_args
+    self._max_parallelism = max_parallelism
 
-  def run(self, tfx_pipeline: pipeline.Pipeline) -> None:
+  def run(self,
+          tfx_pipeline: pipeline.Pipeline,
+          resume_run_id: Optional[Text] = None) -> Optional[Dict[Text, float]]:
     """Deploys given logical pipeline on Beam.
 
     Args:
       tfx_pipeline: Logical pipeline containing pipeline args and components.
+      resume_run_id: optional run id of a previous run of the pipeline to
+        resume. Components which completed in that run, and whose upstream
+        components all completed as well, are not run again; their published
+        outputs are used by the downstream components instead.
+
+    Returns:
+      When max_parallelism is set, a dict of component id to the wall clock
+      seconds spent running the component. None otherwise.
     """
     # For CLI, while creating or updating pipeline, pipeline_args are extracted
     # and hence we avoid deploying the pipeline.
     if 'TFX_JSON_EXPORT_PIPELINE_ARGS_PATH' in os.environ:
-      return
+      return None
+
+    completed_components = set()
+    if resume_run_id:
+      tfx_pipeline.pipeline_info.run_id = resume_run_id
+      completed_components = self._get_completed_components(tfx_pipeline)
+    else:
+      tfx_pipeline.pipeline_info.run_id = datetime.datetime.now().isoformat()
 
-    tfx_pipeline.pipeline_info.run_id = datetime.datetime.now().isoformat()
+    if self._max_parallelism:
+      return self._run_in_parallel(tfx_pipeline, completed_components)
 
     with beam.Pipeline(argv=self._beam_orchestrator_args) as p:
       # Uses for triggering the component DoFns.
@@ -121,11 +156,17 @@ class BeamDagRunner(tfx_runner.TfxRunner):
       # pipeline.components are in topological order.
       for component in tfx_pipeline.components:
         component_id = component.id
+        if component in completed_components:
+          tf.logging.info('Component %s completed in run %s, skipped.',
+                          component_id, resume_run_id)
+          continue
 
         # Signals from upstream components.
         signals_to_wait = []
         if component.upstream_nodes:
           for upstream_node in component.upstream_nodes:
+            if upstream_node in completed_components:
+              continue
             assert upstream_node in signal_map, ('Components is not in '
                                                  'topological order')
             signals_to_wait.append(signal_map[upstream_node])
@@ -143,3 +184,112 @@ class BeamDagRunner(tfx_runner.TfxRunner):
                                  tfx_pipeline),
                 *[beam.pvalue.AsIter(s) for s in signals_to_wait]))
         tf.logging.info('Component %s is scheduled.', component_id)
+    return None
+
+  def _get_completed_components(
+      self, tfx_pipeline: pipeline.Pipeline
+  ) -> Set[base_component.BaseComponent]:
+    """Gets components which need not run again in the current run.
+
+    Args:
+      tfx_pipeline: Logical pipeline whose pipeline_info holds the run to
+        resume.
+
+    Returns:
+      Components whose latest execution in the run is complete or cached and
+      whose upstream components are all completed as well.
+    """
+    with metadata.Metadata(
+        tfx_pipeline.metadata_connection_config,
+        pool=metadata.get_default_pool()) as m:
+      states = m.get_execution_states(tfx_pipeline.pipeline_info)
+    if not states:
+      tf.logging.warning('No execution found for run %s, nothing to resume.',
+                         tfx_pipeline.pipeline_info.run_id)
+    result = set()
+    # pipeline.components are in topological order.
+    for component in tfx_pipeline.components:
+      if (states.get(component.id) in (metadata.EXECUTION_STATE_COMPLETE,
+                                       metadata.EXECUTION_STATE_CACHED) and
+          component.upstream_nodes.issubset(result)):
+        result.add(component)
+    return result
+
+  def _run_in_parallel(
+      self, tfx_pipeline: pipeline.Pipeline,
+      completed_components: Set[base_component.BaseComponent]
+  ) -> Dict[Text, float]:
+    """Runs components on a local worker pool as soon as they are ready.
+
+    Args:
+      tfx_pipeline: Logical pipeline containing pipeline args and components.
+      completed_components: components which are not run again.
+
+    Returns:
+      A dict of component id to the wall clock seconds spent running it.
+
+    Raises:
+      Exception: the first failure of a component, after all components already
+        running are finished. No new component is launched after a failure.
+    """
+
+    def _run(component_as_do_fn: _ComponentAsDoFn) -> float:
+      start_time = time.time()
+      component_as_do_fn._run_component()  # pylint: disable=protected-access
+      return time.time() - start_time
+
+    # Upstream components each component is still waiting for.
+    waiting_for = {
+        c: c.upstream_nodes - completed_components
+        for c in tfx_pipeline.components
+    }
+    # pipeline.components are in topological order, which is kept as the
+    # launch order among ready components.
+    pending = [
+        c for c in tfx_pipeline.components if c not in completed_components
+    ]
+    running = {}
+    wall_clock_secs = {}
+    failures = []
+    start_time = time.time()
+    with futures.ThreadPoolExecutor(
+        max_workers=self._max_parallelism) as executor:
+      while (pending and not failures) or running:
+        ready = [] if failures else [c for c in pending if not waiting_for[c]]
+        for component in ready:
+          pending.remove(component)
+          component_launcher_class = self.find_component_launcher_class(
+              component)
+          running[executor.submit(
+              _run,
+              _ComponentAsDoFn(component, component_launcher_class,
+                               tfx_pipeline))] = component
+          tf.logging.info('Component %s is scheduled.', component.id)
+        done, _ = futures.wait(
+            list(running.keys()), return_when=futures.FIRST_COMPLETED)
+        # Every completed component is accounted for before a failure is
+        # raised. Components already running are waited for, but no new
+        # component is launched.
+        for future in done:
+          component = running.pop(future)
+          error = future.exception()
+          if error is not None:
+            tf.logging.error('Component %s failed: %s', component.id, error)
+            failures.append(error)
+            continue
+          wall_clock_secs[component.id] = future.result()
+          tf.logging.info('Component %s finished in %.2f seconds.',
+                          component.id, wall_clock_secs[component.id])
+          for downstream_node in component.downstream_nodes:
+            if downstream_node in waiting_for:
+              waiting_for[downstream_node].discard(component)
+
+    if failures:
+      tf.logging.error('Components %s were not run due to failures.',
+                       [c.id for c in pending])
+      raise failures[0]
+    tf.logging.info(
+        'Pipeline %s finished in %.2f seconds, sum of components is %.2f '
+        'seconds.', tfx_pipeline.pipeline_info.pipeline_name,
+        time.time() - start_time, sum(wall_clock_secs.values()))
+    return wall_clock_secs
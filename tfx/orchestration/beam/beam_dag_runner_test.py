@@ -17,6 +17,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import threading
+import time
 import mock
 import tensorflow as tf
 from ml_metadata.proto import metadata_store_pb2
@@ -24,11 +26,15 @@ from tfx import types
 from tfx.components.base import base_component
 from tfx.components.base import base_executor
 from tfx.components.base import executor_spec
+from tfx.orchestration import metadata
 from tfx.orchestration import pipeline
 from tfx.orchestration.beam import beam_dag_runner
 from tfx.types.component_spec import ChannelParameter
 
 _executed_components = []
+# Component id -> (start time, end time) of its run.
+_run_intervals = {}
+_lock = threading.Lock()
 
 
 class _FakeComponentAsDoFn(beam_dag_runner._ComponentAsDoFn):
@@ -37,6 +43,24 @@ class _FakeComponentAsDoFn(beam_dag_runner._ComponentAsDoFn):
     _executed_components.append(self._component_id)
 
 
+class _SlowFakeComponentAsDoFn(beam_dag_runner._ComponentAsDoFn):
+
+  def _run_component(self):
+    start_time = time.time()
+    time.sleep(0.2)
+    with _lock:
+      _executed_components.append(self._component_id)
+      _run_intervals[self._component_id] = (start_time, time.time())
+
+
+class _FailingFakeComponentAsDoFn(_SlowFakeComponentAsDoFn):
+
+  def _run_component(self):
+    if self._component_id == '_FakeComponent.c':
+      raise RuntimeError('Component c failed')
+    super(_FailingFakeComponentAsDoFn, self)._run_component()
+
+
 # We define fake component spec classes below for testing. Note that we can't
 # programmatically generate component using anonymous classes for testing
 # because of a limitation in the "dill" pickler component used by Apache Beam.
@@ -96,11 +120,12 @@ class _FakeComponent(base_component.BaseComponent):
 
 class BeamDagRunnerTest(tf.test.TestCase):
 
-  @mock.patch.multiple(
-      beam_dag_runner,
-      _ComponentAsDoFn=_FakeComponentAsDoFn,
-  )
-  def testRun(self):
+  def setUp(self):
+    super(BeamDagRunnerTest, self).setUp()
+    del _executed_components[:]
+    _run_intervals.clear()
+
+  def _createPipeline(self) -> pipeline.Pipeline:
     component_a = _FakeComponent(
         _FakeComponentSpecA(output=types.Channel(type_name='a')))
     component_b = _FakeComponent(
@@ -123,7 +148,7 @@ class BeamDagRunnerTest(tf.test.TestCase):
             d=component_d.outputs['output'],
             output=types.Channel(type_name='e')))
 
-    test_pipeline = pipeline.Pipeline(
+    return pipeline.Pipeline(
         pipeline_name='x',
         pipeline_root='y',
         metadata_connection_config=metadata_store_pb2.ConnectionConfig(),
@@ -131,7 +156,27 @@ class BeamDagRunnerTest(tf.test.TestCase):
             component_d, component_c, component_a, component_b, component_e
         ])
 
-    beam_dag_runner.BeamDagRunner().run(test_pipeline)
+  @mock.patch.multiple(
+      beam_dag_runner,
+      _ComponentAsDoFn=_FakeComponentAsDoFn,
+  )
+  def testRun(self):
+    beam_dag_runner.BeamDagRunner().run(self._createPipeline())
+    self.assertItemsEqual(_executed_components, [
+        '_FakeComponent.a', '_FakeComponent.b', '_FakeComponent.c',
+        '_FakeComponent.d', '_FakeComponent.e'
+    ])
+    self.assertEqual(_executed_components[0], '_FakeComponent.a')
+    self.assertEqual(_executed_components[3], '_FakeComponent.d')
+    self.assertEqual(_executed_components[4], '_FakeComponent.e')
+
+  @mock.patch.multiple(
+      beam_dag_runner,
+      _ComponentAsDoFn=_FakeComponentAsDoFn,
+  )
+  def testRunInParallel(self):
+    wall_clock_secs = beam_dag_runner.BeamDagRunner(max_parallelism=2).run(
+        self._createPipeline())
     self.assertItemsEqual(_executed_components, [
         '_FakeComponent.a', '_FakeComponent.b', '_FakeComponent.c',
         '_FakeComponent.d', '_FakeComponent.e'
@@ -139,6 +184,66 @@ class BeamDagRunnerTest(tf.test.TestCase):
     self.assertEqual(_executed_components[0], '_FakeComponent.a')
     self.assertEqual(_executed_components[3], '_FakeComponent.d')
     self.assertEqual(_executed_components[4], '_FakeComponent.e')
+    self.assertItemsEqual(wall_clock_secs.keys(), _executed_components)
+
+  @mock.patch.multiple(
+      beam_dag_runner,
+      _ComponentAsDoFn=_SlowFakeComponentAsDoFn,
+  )
+  def testRunInParallelOverlapsIndependentComponents(self):
+    beam_dag_runner.BeamDagRunner(max_parallelism=2).run(
+        self._createPipeline())
+    # b and c only depend on a, so they run at the same time.
+    b_start, b_end = _run_intervals['_FakeComponent.b']
+    c_start, c_end = _run_intervals['_FakeComponent.c']
+    self.assertLess(max(b_start, c_start), min(b_end, c_end))
+    # d starts after both b and c are finished.
+    self.assertGreaterEqual(_run_intervals['_FakeComponent.d'][0],
+                            max(b_end, c_end))
+
+  @mock.patch.multiple(
+      beam_dag_runner,
+      _ComponentAsDoFn=_FailingFakeComponentAsDoFn,
+  )
+  def testRunInParallelWithFailure(self):
+    with self.assertRaisesRegexp(RuntimeError, 'Component c failed'):
+      beam_dag_runner.BeamDagRunner(max_parallelism=2).run(
+          self._createPipeline())
+    # b, running at the same time as c, still finishes, and no downstream
+    # component is launched.
+    self.assertItemsEqual(_executed_components,
+                          ['_FakeComponent.a', '_FakeComponent.b'])
+
+  @mock.patch.multiple(
+      beam_dag_runner,
+      _ComponentAsDoFn=_FakeComponentAsDoFn,
+  )
+  @mock.patch.object(metadata, 'Metadata')
+  def testResumeRun(self, mock_metadata):
+    mock_metadata.return_value.__enter__.return_value.get_execution_states.\
+        return_value = {
+            '_FakeComponent.a': metadata.EXECUTION_STATE_COMPLETE,
+            '_FakeComponent.b': metadata.EXECUTION_STATE_NEW,
+            '_FakeComponent.c': metadata.EXECUTION_STATE_CACHED,
+        }
+    test_pipeline = self._createPipeline()
+    beam_dag_runner.BeamDagRunner().run(
+        test_pipeline, resume_run_id='failed_run')
+    self.assertEqual('failed_run', test_pipeline.pipeline_info.run_id)
+    self.assertEqual(_executed_components, [
+        '_FakeComponent.b', '_FakeComponent.d', '_FakeComponent.e'
+    ])
+
+    del _executed_components[:]
+    beam_dag_runner.BeamDagRunner(max_parallelism=2).run(
+        self._createPipeline(), resume_run_id='failed_run')
+    self.assertEqual(_executed_components, [
+        '_FakeComponent.b', '_FakeComponent.d', '_FakeComponent.e'
+    ])
+
+  def testInvalidMaxParallelism(self):
+    with self.assertRaises(ValueError):
+      beam_dag_runner.BeamDagRunner(max_parallelism=0)
 
 
 if __name__ == '__main__':
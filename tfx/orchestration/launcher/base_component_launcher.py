@@ -129,7 +129,9 @@ class BaseComponentLauncher(with_metaclass(abc.ABCMeta, object)):
       exec_properties: Dict[Text, Any]) -> data_types.ExecutionDecision:
     """Prepare inputs, outputs and execution properties for actual execution."""
 
-    with metadata.Metadata(self._metadata_connection_config) as m:
+    with metadata.Metadata(
+        self._metadata_connection_config,
+        pool=metadata.get_default_pool()) as m:
       driver = self._driver_class(metadata_handler=m)
 
       execution_decision = driver.pre_execution(
@@ -156,7 +158,9 @@ class BaseComponentLauncher(with_metaclass(abc.ABCMeta, object)):
                      output_dict: Dict[Text, List[types.Artifact]]) -> None:
     """Publish execution result to ml metadata."""
 
-    with metadata.Metadata(self._metadata_connection_config) as m:
+    with metadata.Metadata(
+        self._metadata_connection_config,
+        pool=metadata.get_default_pool()) as m:
       p = publisher.Publisher(metadata_handler=m)
       p.publish_execution(
           execution_id=execution_id,
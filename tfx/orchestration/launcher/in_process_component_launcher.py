@@ -48,7 +48,9 @@ class InProcessComponentLauncher(base_component_launcher.BaseComponentLauncher):
     executor_context = base_executor.BaseExecutor.Context(
         beam_pipeline_args=self._beam_pipeline_args,
         tmp_dir=os.path.join(self._pipeline_info.pipeline_root, '.temp', ''),
-        unique_id=str(execution_id))
+        unique_id=str(execution_id),
+        cache_dir=os.path.join(self._pipeline_info.pipeline_root, '.cache',
+                               ''))
 
     executor_class_spec = cast(executor_spec.ExecutorClassSpec,
                                self._component_executor_spec)
@@ -20,7 +20,10 @@ from __future__ import print_function
 import collections
 import copy
 import hashlib
+import json
 import os
+import threading
+import time
 import types
 import tensorflow as tf
 from typing import Any, Dict, List, Optional, Set, Text, Type
@@ -40,6 +43,13 @@ EXECUTION_STATE_COMPLETE = 'complete'
 EXECUTION_STATE_NEW = 'new'
 # Context type, currently only run context is supported.
 _CONTEXT_TYPE_RUN = 'run'
+# Execution property holding the fingerprint used for cache lookup.
+_EXECUTION_PROPERTY_CACHE_KEY = 'cache_key'
+# Default maximum number of connections per connection config in a pool.
+_DEFAULT_POOL_SIZE = 8
+# Execution properties which do not participate in the cache key.
+_CACHE_KEY_EXCLUDED_PROPERTIES = frozenset(
+    ['state', 'run_id', _EXECUTION_PROPERTY_CACHE_KEY])
 
 
 def sqlite_metadata_connection_config(metadata_db_uri: Text
@@ -84,26 +94,173 @@ def mysql_metadata_connection_config(host: Text, port: int, database: Text,
           password=password))
 
 
+def _is_in_memory(connection_config: metadata_store_pb2.ConnectionConfig
+                 ) -> bool:
+  """Whether each connection made with the config is a separate database."""
+  return (connection_config.HasField('sqlite') and
+          not connection_config.sqlite.filename_uri)
+
+
+class MetadataStorePool(object):
+  """Pool of MetadataStore connections keyed by connection config.
+
+  At most `max_size` connections are handed out per connection config at the
+  same time; further acquisitions block until a connection is released. Idle
+  connections are health checked before being reused and replaced by a new
+  connection if the check fails.
+  """
+
+  def __init__(self, max_size: int = _DEFAULT_POOL_SIZE):
+    if max_size < 1:
+      raise ValueError('max_size must be positive, got %s' % max_size)
+    self._max_size = max_size
+    self._lock = threading.Lock()
+    # Connection config key -> idle MetadataStore objects.
+    self._idle_stores = collections.defaultdict(list)
+    # Connection config key -> semaphore bounding connections handed out.
+    self._semaphores = {}
+    self._stats = collections.defaultdict(float)
+
+  def _get_semaphore(self, key: bytes) -> threading.BoundedSemaphore:
+    with self._lock:
+      if key not in self._semaphores:
+        self._semaphores[key] = threading.BoundedSemaphore(self._max_size)
+      return self._semaphores[key]
+
+  def _is_healthy(self, store: metadata_store.MetadataStore) -> bool:
+    try:
+      store.get_context_type(_CONTEXT_TYPE_RUN)
+    except tf.errors.NotFoundError:
+      pass
+    except Exception as e:  # pylint: disable=broad-except
+      tf.logging.warning('Discarding unhealthy metadata connection: %s', e)
+      return False
+    return True
+
+  def acquire(self, connection_config: metadata_store_pb2.ConnectionConfig
+             ) -> metadata_store.MetadataStore:
+    """Gets a connection for the config, reusing an idle one if possible."""
+    key = connection_config.SerializeToString(deterministic=True)
+    start_time = time.time()
+    self._get_semaphore(key).acquire()
+    wait_secs = time.time() - start_time
+    with self._lock:
+      self._stats['acquired'] += 1
+      self._stats['total_wait_secs'] += wait_secs
+      self._stats['max_wait_secs'] = max(self._stats['max_wait_secs'],
+                                         wait_secs)
+      store = self._idle_stores[key].pop() if self._idle_stores[key] else None
+    try:
+      if store is not None:
+        if self._is_healthy(store):
+          with self._lock:
+            self._stats['reused'] += 1
+          return store
+        with self._lock:
+          self._stats['discarded'] += 1
+      store = metadata_store.MetadataStore(connection_config)
+      with self._lock:
+        self._stats['created'] += 1
+      return store
+    except:  # pylint: disable=bare-except
+      self._get_semaphore(key).release()
+      raise
+
+  def release(self, connection_config: metadata_store_pb2.ConnectionConfig,
+              store: metadata_store.MetadataStore) -> None:
+    """Returns a connection obtained by acquire() to the pool."""
+    key = connection_config.SerializeToString(deterministic=True)
+    with self._lock:
+      self._idle_stores[key].append(store)
+    self._get_semaphore(key).release()
+
+  def clear(self) -> None:
+    """Drops all idle connections."""
+    with self._lock:
+      self._idle_stores.clear()
+
+  def stats(self) -> Dict[Text, float]:
+    """Returns counters of the pool.
+
+    Returns:
+      A dict with number of connections `acquired`, `created`, `reused` and
+      `discarded` by health check, plus `total_wait_secs` and `max_wait_secs`
+      spent waiting for a connection to become available.
+    """
+    with self._lock:
+      result = dict.fromkeys(['acquired', 'created', 'reused', 'discarded',
+                              'total_wait_secs', 'max_wait_secs'], 0)
+      result.update(self._stats)
+      return result
+
+
+_DEFAULT_POOL = MetadataStorePool()
+
+
+def get_default_pool() -> MetadataStorePool:
+  """Returns the process-level MetadataStorePool."""
+  return _DEFAULT_POOL
+
+
+_RUN_CONTEXT_IDS_LOCK = threading.Lock()
+# Connection config key -> memo of run context name to context id, shared by
+# all Metadata handles of the process, as launchers create a handle for each
+# driver and publisher.
+_RUN_CONTEXT_IDS = {}  # type: Dict[bytes, Dict[Text, int]]
+
+
+def _get_run_context_ids(connection_config: metadata_store_pb2.ConnectionConfig
+                        ) -> Dict[Text, int]:
+  """Returns the process-level run context id memo of a connection config."""
+  key = connection_config.SerializeToString(deterministic=True)
+  with _RUN_CONTEXT_IDS_LOCK:
+    return _RUN_CONTEXT_IDS.setdefault(key, {})
+
+
 # TODO(ruoyu): Figure out the story mutable UDFs. We should not reuse previous
 # run when having different UDFs.
 class Metadata(object):
   """Helper class to handle metadata I/O."""
 
   def __init__(self,
-               connection_config: metadata_store_pb2.ConnectionConfig) -> None:
+               connection_config: metadata_store_pb2.ConnectionConfig,
+               pool: Optional[MetadataStorePool] = None) -> None:
+    """Initializes a Metadata handle.
+
+    Args:
+      connection_config: ML metadata connection config.
+      pool: optional MetadataStorePool to take the connection from. In-memory
+        sqlite connections are never pooled as every connection is a separate
+        database.
+    """
     self._connection_config = connection_config
+    self._pool = None if _is_in_memory(connection_config) else pool
     self._store = None
+    # Memo of run context name to context id. Contexts are never renamed, so
+    # entries stay valid for the lifetime of the store. In-memory sqlite
+    # connections are separate databases, so their memo is per handle.
+    if _is_in_memory(connection_config):
+      self._run_context_ids = {}  # type: Dict[Text, int]
+    else:
+      self._run_context_ids = _get_run_context_ids(connection_config)
+    # Names of memoized run contexts checked against the store by this handle.
+    # The store behind a connection config may be recreated, e.g. when its
+    # sqlite file is deleted, leaving the process-level memo stale.
+    self._verified_run_context_names = set()  # type: Set[Text]
 
   def __enter__(self) -> 'Metadata':
-    # TODO(ruoyu): Establishing a connection pool instead of newing
-    # a connection every time. Until then, check self._store before usage
-    # in every method.
-    self._store = metadata_store.MetadataStore(self._connection_config)
+    # TODO(ruoyu): Check self._store before usage in every method.
+    if self._pool:
+      self._store = self._pool.acquire(self._connection_config)
+    else:
+      self._store = metadata_store.MetadataStore(self._connection_config)
     return self
 
   def __exit__(self, exc_type: Optional[Type[Exception]],
                exc_value: Optional[Exception],
                exc_tb: Optional[types.TracebackType]) -> None:
+    if self._pool:
+      self._pool.release(self._connection_config, self._store)
     self._store = None
 
   @property
@@ -203,6 +360,13 @@ class Metadata(object):
       execution_type = self._store.get_execution_type(type_name)
       if execution_type is None:
         raise RuntimeError('Execution type is None for %s.' % type_name)
+      # Types registered before cache keys were introduced need the property
+      # added before executions carrying it can be stored.
+      if _EXECUTION_PROPERTY_CACHE_KEY not in execution_type.properties:
+        execution_type.properties[
+            _EXECUTION_PROPERTY_CACHE_KEY] = metadata_store_pb2.STRING
+        return self._store.put_execution_type(
+            execution_type=execution_type, can_add_fields=True)
       return execution_type.id
     except tf.errors.NotFoundError:
       execution_type = metadata_store_pb2.ExecutionType(name=type_name)
@@ -216,6 +380,8 @@ class Metadata(object):
       execution_type.properties['pipeline_root'] = metadata_store_pb2.STRING
       execution_type.properties['run_id'] = metadata_store_pb2.STRING
       execution_type.properties['component_id'] = metadata_store_pb2.STRING
+      execution_type.properties[
+          _EXECUTION_PROPERTY_CACHE_KEY] = metadata_store_pb2.STRING
 
       return self._store.put_execution_type(
           execution_type=execution_type, can_add_fields=True)
@@ -261,16 +427,51 @@ class Metadata(object):
     tf.logging.info('Prepared EXECUTION:\n {}'.format(execution))
     return execution
 
+  def _get_cache_key(self, execution: metadata_store_pb2.Execution,
+                     input_artifacts: Dict[Text, List[Artifact]]) -> Text:
+    """Computes a stable fingerprint of an execution and its inputs.
+
+    The fingerprint covers the execution type, all execution properties except
+    the run specific ones (state and run id) and the sorted ids of the input
+    artifacts, which is exactly what makes two executions interchangeable for
+    caching purposes.
+
+    Args:
+      execution: the prepared execution.
+      input_artifacts: inputs used by the execution with id ready.
+
+    Returns:
+      Hex digest of the fingerprint.
+    """
+    properties = {}
+    for k, v in execution.properties.items():
+      if k not in _CACHE_KEY_EXCLUDED_PROPERTIES:
+        properties[k] = v.string_value
+    input_ids = sorted(
+        single_input.artifact.id
+        for input_list in input_artifacts.values()
+        for single_input in input_list)
+    fingerprint = json.dumps(
+        {
+            'type_id': execution.type_id,
+            'properties': properties,
+            'input_artifact_ids': input_ids,
+        },
+        sort_keys=True)
+    return hashlib.sha256(tf.compat.as_bytes(fingerprint)).hexdigest()
+
   def _update_execution_state(self, execution: metadata_store_pb2.Execution,
                               new_state: Text) -> None:
     execution.properties['state'].string_value = tf.compat.as_text(new_state)
     self._store.put_executions([execution])
 
-  def register_execution(self,
-                         exec_properties: Dict[Text, Any],
-                         pipeline_info: data_types.PipelineInfo,
-                         component_info: data_types.ComponentInfo,
-                         run_context_id: Optional[int] = None) -> int:
+  def register_execution(
+      self,
+      exec_properties: Dict[Text, Any],
+      pipeline_info: data_types.PipelineInfo,
+      component_info: data_types.ComponentInfo,
+      run_context_id: Optional[int] = None,
+      input_artifacts: Optional[Dict[Text, List[Artifact]]] = None) -> int:
     """Create a new execution in metadata.
 
     Args:
@@ -279,12 +480,19 @@ class Metadata(object):
       component_info: optional component info of the execution.
       run_context_id: context id for current run, link it with execution if
         provided.
+      input_artifacts: optional resolved inputs of the execution. If provided,
+        a cache key is recorded with the execution so that later runs can find
+        it without comparing every execution of the same type.
 
     Returns:
       execution id of the new execution.
     """
     execution = self._prepare_execution(EXECUTION_STATE_NEW, exec_properties,
                                         pipeline_info, component_info)
+    if input_artifacts is not None:
+      execution.properties[
+          _EXECUTION_PROPERTY_CACHE_KEY].string_value = self._get_cache_key(
+              execution, input_artifacts)
     [execution_id] = self._store.put_executions([execution])
 
     if run_context_id:
@@ -381,14 +589,21 @@ class Metadata(object):
       for single_input in input_list:
         input_ids.add(single_input.artifact.id)
 
+    if not candidate_execution_ids:
+      tf.logging.info('No execution matching type id and input artifacts found')
+      return None
+
+    # Fetches the events of all candidates in a single round trip.
+    execution_id_to_input_ids = collections.defaultdict(set)
+    for event in self._store.get_events_by_execution_ids(
+        candidate_execution_ids):
+      if event.type in [
+          metadata_store_pb2.Event.INPUT, metadata_store_pb2.Event.DECLARED_INPUT
+      ]:
+        execution_id_to_input_ids[event.execution_id].add(event.artifact_id)
+
     for execution_id in candidate_execution_ids:
-      events = self._store.get_events_by_execution_ids([execution_id])
-      execution_input_ids = set([
-          event.artifact_id for event in events if event.type in [
-              metadata_store_pb2.Event.INPUT,
-              metadata_store_pb2.Event.DECLARED_INPUT
-          ]
-      ])
+      execution_input_ids = execution_id_to_input_ids[execution_id]
       if input_ids == execution_input_ids:
         tf.logging.info(
             'Found matching execution with all input artifacts: %s' %
@@ -431,19 +646,36 @@ class Metadata(object):
         'Checking previous run for execution_type_name %s and input_artifacts %s',
         component_info.component_type, input_artifacts)
 
-    # Ids of candidate executions which share the same execution property as
-    # current.
-    candidate_execution_ids = []
     expected_previous_execution = self._prepare_execution(
         EXECUTION_STATE_COMPLETE,
         exec_properties,
         pipeline_info=pipeline_info,
         component_info=component_info)
+    cache_key = self._get_cache_key(expected_previous_execution,
+                                    input_artifacts)
+
+    # Executions recorded with a cache key are matched by comparing a single
+    # property. Executions recorded before cache keys existed fall back to
+    # comparing the full execution and its input events.
+    cached_execution_id = None
+    # Ids of candidate executions which share the same execution property as
+    # current.
+    candidate_execution_ids = []
     for execution in self._store.get_executions_by_type(
         component_info.component_type):
-      if self._is_eligible_previous_execution(
+      if _EXECUTION_PROPERTY_CACHE_KEY in execution.properties:
+        if (execution.properties[_EXECUTION_PROPERTY_CACHE_KEY].string_value
+            == cache_key and execution.properties['state'].string_value ==
+            EXECUTION_STATE_COMPLETE):
+          cached_execution_id = max(cached_execution_id or 0, execution.id)
+      elif self._is_eligible_previous_execution(
           copy.deepcopy(expected_previous_execution), copy.deepcopy(execution)):
         candidate_execution_ids.append(execution.id)
+    if cached_execution_id:
+      tf.logging.info('Found execution with matching cache key: %s' %
+                      cached_execution_id)
+      return cached_execution_id
+
     candidate_execution_ids.sort(reverse=True)
     candidate_execution_ids = candidate_execution_ids[0:min(
         len(candidate_execution_ids), MAX_EXECUTIONS_FOR_CACHE)]
@@ -469,13 +701,23 @@ class Metadata(object):
       RuntimeError: path change without clean metadata.
     """
 
+    output_events = [
+        event for event in self._store.get_events_by_execution_ids(
+            [execution_id]) if event.type == metadata_store_pb2.Event.OUTPUT
+    ]
+    # Fetches all output artifacts in a single round trip.
+    artifacts_by_id = {}
+    if output_events:
+      artifacts_by_id = {
+          artifact.id: artifact for artifact in self._store.get_artifacts_by_id(
+              list(set(event.artifact_id for event in output_events)))
+      }
     name_to_index_to_artifacts = collections.defaultdict(dict)
-    for event in self._store.get_events_by_execution_ids([execution_id]):
-      if event.type == metadata_store_pb2.Event.OUTPUT:
-        [artifact] = self._store.get_artifacts_by_id([event.artifact_id])
-        output_key = event.path.steps[0].key
-        output_index = event.path.steps[1].index
-        name_to_index_to_artifacts[output_key][output_index] = artifact
+    for event in output_events:
+      output_key = event.path.steps[0].key
+      output_index = event.path.steps[1].index
+      name_to_index_to_artifacts[output_key][output_index] = artifacts_by_id[
+          event.artifact_id]
     for output_name, output_list in output_dict.items():
       if output_name not in name_to_index_to_artifacts:
         raise RuntimeError('Unmatched output name from previous execution.')
@@ -487,6 +729,102 @@ class Metadata(object):
         output.set_artifact(index_to_artifacts[index])
     return dict(output_dict)
 
+  def get_previous_output_artifacts(
+      self, output_key: Text, pipeline_info: data_types.PipelineInfo,
+      component_info: data_types.ComponentInfo
+  ) -> List[metadata_store_pb2.Artifact]:
+    """Gets published outputs of previous executions of a component.
+
+    Only the completed executions of the component type with the same pipeline
+    name, pipeline root and component id are considered, so the cost is
+    proportional to the history of the component rather than to all artifacts
+    of the output type.
+
+    Args:
+      output_key: the name of the output.
+      pipeline_info: info of the current pipeline run.
+      component_info: info of the current component.
+
+    Returns:
+      Published artifacts output under the key, ordered by id.
+    """
+    try:
+      executions = self._store.get_executions_by_type(
+          component_info.component_type)
+    except tf.errors.NotFoundError:
+      return []
+    execution_ids = [
+        execution.id
+        for execution in executions
+        if execution.properties['state'].string_value ==
+        EXECUTION_STATE_COMPLETE and
+        execution.properties['pipeline_name'].string_value ==
+        pipeline_info.pipeline_name and
+        execution.properties['pipeline_root'].string_value ==
+        pipeline_info.pipeline_root and
+        execution.properties['component_id'].string_value ==
+        component_info.component_id
+    ]
+    if not execution_ids:
+      return []
+    artifact_ids = set(
+        event.artifact_id
+        for event in self._store.get_events_by_execution_ids(execution_ids)
+        if event.type == metadata_store_pb2.Event.OUTPUT and
+        event.path.steps[0].key == output_key)
+    if not artifact_ids:
+      return []
+    return sorted([
+        artifact
+        for artifact in self._store.get_artifacts_by_id(list(artifact_ids))
+        if artifact.properties['state'].string_value == ArtifactState.PUBLISHED
+    ],
+                  key=lambda artifact: artifact.id)
+
+  def _get_producer_execution(
+      self, pipeline_name: Text, run_id: Text,
+      component_id: Text) -> Optional[metadata_store_pb2.Execution]:
+    """Gets the latest execution of a component in a pipeline run.
+
+    The executions are looked up through the run context first, so the cost is
+    proportional to the size of the run rather than the whole store. Executions
+    which were registered without a run context are only found by scanning all
+    executions.
+
+    Args:
+      pipeline_name: the name of the pipeline.
+      run_id: the run id of the pipeline run.
+      component_id: the id of the component.
+
+    Returns:
+      The matching execution with the largest id, or None if not found.
+    """
+
+    def _latest_match(
+        executions: List[metadata_store_pb2.Execution]
+    ) -> Optional[metadata_store_pb2.Execution]:
+      result = None
+      for execution in executions:
+        if (execution.properties['pipeline_name'].string_value == pipeline_name
+            and execution.properties['run_id'].string_value == run_id and
+            execution.properties['component_id'].string_value == component_id
+            and (result is None or execution.id > result.id)):
+          result = execution
+      return result
+
+    run_context_id = self._get_run_context_id(
+        data_types.PipelineInfo(
+            pipeline_name=pipeline_name, pipeline_root='', run_id=run_id))
+    if run_context_id:
+      producer_execution = _latest_match(
+          self._store.get_executions_by_context(run_context_id))
+      if producer_execution:
+        return producer_execution
+    tf.logging.info(
+        'Execution of %s not found in run context, scanning all executions.',
+        component_id)
+    return _latest_match(self._store.get_executions())
+
   def search_artifacts(self, artifact_name: Text, pipeline_name: Text,
                        run_id: Text,
                        producer_component_id: Text) -> List[Artifact]:
@@ -506,14 +844,9 @@ class Metadata(object):
     Raises:
       RuntimeError: when no matching execution is found given producer info.
     """
-    producer_execution = None
     matching_artifact_ids = set()
-    for execution in self._store.get_executions():
-      if (execution.properties['pipeline_name'].string_value == pipeline_name
-          and execution.properties['run_id'].string_value == run_id and
-          execution.properties['component_id'].string_value ==
-          producer_component_id):
-        producer_execution = execution
+    producer_execution = self._get_producer_execution(pipeline_name, run_id,
+                                                      producer_component_id)
     if not producer_execution:
       raise RuntimeError('Cannot find matching execution with pipeline name %s,'
                          'run id %s and component id %s' %
@@ -542,7 +875,7 @@ class Metadata(object):
     """
     result = []
     # TODO(b/139092990): support get_contexts_by_property.
-    for context in self._store.get_contexts_by_type(_CONTEXT_TYPE_RUN):
+    for context in self._get_run_contexts():
       if context.properties['pipeline_name'].string_value == pipeline_name:
         result.append(context.properties['run_id'].string_value)
     return result
@@ -555,10 +888,13 @@ class Metadata(object):
       pipeline_info: target pipeline's information.
 
     Returns:
-      A Dict of component id to its state mapping.
+      A Dict of component id to its state mapping. Empty if the run is not
+      found.
     """
     run_context_id = self._get_run_context_id(pipeline_info)
     result = {}
+    if run_context_id is None:
+      return result
     for execution in self._store.get_executions_by_context(run_context_id):
       result[execution.properties['component_id']
              .string_value] = execution.properties['state'].string_value
@@ -605,11 +941,60 @@ class Metadata(object):
       a matched context id or None.
     """
     # TODO(b/139092990): support get_contexts_by_name.
-    for context in self._store.get_contexts_by_type(_CONTEXT_TYPE_RUN):
-      if context.name == pipeline_info.run_context_name:
-        return context.id
+    context_name = pipeline_info.run_context_name
+    context_id = self._get_memoized_run_context_id(context_name)
+    if context_id is None:
+      # Refreshes the whole memo so that lookups of other runs made through
+      # this handle are served without another scan.
+      self._get_run_contexts()
+      context_id = self._run_context_ids.get(context_name)
+    return context_id
+
+  def _get_memoized_run_context_id(self, context_name: Text) -> Optional[int]:
+    """Gets the memoized id of a run context if it is still in the store.
+
+    The first lookup of a memoized id through this handle checks the context
+    with the id in the store. If it is missing or has another name, the store
+    was recreated, so the memo is cleared.
+
+    Args:
+      context_name: name of the run context.
+
+    Returns:
+      The id of the run context, or None if not memoized or stale.
+    """
+    context_id = self._run_context_ids.get(context_name)
+    if context_id is None or context_name in self._verified_run_context_names:
+      return context_id
+    try:
+      contexts = self._store.get_contexts_by_id([context_id])
+    except tf.errors.NotFoundError:
+      contexts = []
+    if contexts and contexts[0].name == context_name:
+      self._verified_run_context_names.add(context_name)
+      return context_id
+    tf.logging.info('Run context %s is not in the store anymore, clearing '
+                    'memoized run context ids.' % context_name)
+    self._run_context_ids.clear()
+    self._verified_run_context_names.clear()
     return None
 
+  def _memoize_run_context_id(self, context_name: Text,
+                              context_id: int) -> None:
+    """Memoizes the id of a run context read from or written to the store."""
+    self._run_context_ids[context_name] = context_id
+    self._verified_run_context_names.add(context_name)
+
+  def _get_run_contexts(self) -> List[metadata_store_pb2.Context]:
+    """Gets all run contexts and refreshes the run context id memo."""
+    try:
+      contexts = self._store.get_contexts_by_type(_CONTEXT_TYPE_RUN)
+    except tf.errors.NotFoundError:
+      return []
+    for context in contexts:
+      self._memoize_run_context_id(context.name, context.id)
+    return contexts
+
   def register_run_context_if_not_exists(
       self, pipeline_info: data_types.PipelineInfo) -> int:
     """Create or get the context for current pipeline run.
@@ -620,6 +1005,10 @@ class Metadata(object):
     Returns:
       context id of the current run.
     """
+    run_context_id = self._get_memoized_run_context_id(
+        pipeline_info.run_context_name)
+    if run_context_id is not None:
+      return run_context_id
     try:
       run_context_id = self._register_run_context(pipeline_info)
       tf.logging.info('Created run context %s.' %
@@ -633,4 +1022,5 @@ class Metadata(object):
 
     tf.logging.info('ID of run context %s is %s.' %
                     (pipeline_info.run_context_name, run_context_id))
+    self._memoize_run_context_id(pipeline_info.run_context_name, run_context_id)
     return run_context_id
@@ -18,6 +18,7 @@ from __future__ import division
 from __future__ import print_function
 
 # Standard Imports
+import os
 import mock
 import tensorflow as tf
 from ml_metadata.proto import metadata_store_pb2
@@ -286,29 +287,126 @@ class MetadataTest(tf.test.TestCase):
       self.assertEqual(previous_artifact.id, current_artifact.id)
       self.assertEqual(previous_artifact.type_id, current_artifact.type_id)
 
+  def testPreviousExecutionByCacheKey(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      exec_properties = {'log_root': 'path'}
+      input_artifact = standard_artifacts.Examples()
+      m.publish_artifacts([input_artifact])
+      input_artifacts = {'input': [input_artifact]}
+      eid = m.register_execution(
+          exec_properties=exec_properties,
+          pipeline_info=self._pipeline_info,
+          component_info=self._component_info,
+          input_artifacts=input_artifacts)
+      [execution] = m.store.get_executions_by_id([eid])
+      self.assertTrue(execution.properties['cache_key'].string_value)
+
+      # Executions which are not complete are never used as cache.
+      self.assertEqual(
+          None,
+          m.previous_execution(
+              input_artifacts=input_artifacts,
+              exec_properties=exec_properties,
+              pipeline_info=self._pipeline_info2,
+              component_info=self._component_info))
+
+      output_artifact = standard_artifacts.Examples()
+      m.publish_execution(eid, input_artifacts, {'output': [output_artifact]})
+      # Run id does not participate in the cache key.
+      self.assertEqual(
+          eid,
+          m.previous_execution(
+              input_artifacts=input_artifacts,
+              exec_properties=exec_properties,
+              pipeline_info=self._pipeline_info2,
+              component_info=self._component_info))
+      self.assertEqual(
+          None,
+          m.previous_execution(
+              input_artifacts=input_artifacts,
+              exec_properties={'log_root': 'other_path'},
+              pipeline_info=self._pipeline_info,
+              component_info=self._component_info))
+      other_input_artifact = standard_artifacts.Examples()
+      m.publish_artifacts([other_input_artifact])
+      self.assertEqual(
+          None,
+          m.previous_execution(
+              input_artifacts={'input': [other_input_artifact]},
+              exec_properties=exec_properties,
+              pipeline_info=self._pipeline_info,
+              component_info=self._component_info))
+
+  def testGetPreviousOutputArtifacts(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      self.assertEqual([],
+                       m.get_previous_output_artifacts('output',
+                                                       self._pipeline_info,
+                                                       self._component_info))
+      output_ids = []
+      for pipeline_info, component_info in [
+          (self._pipeline_info, self._component_info),
+          (self._pipeline_info2, self._component_info),
+          (self._pipeline_info3, self._component_info),
+          (self._pipeline_info, data_types.ComponentInfo(
+              component_type='a.b.c', component_id='other_component')),
+      ]:
+        eid = m.register_execution(
+            exec_properties={},
+            pipeline_info=pipeline_info,
+            component_info=component_info)
+        output_artifact = standard_artifacts.Examples()
+        m.publish_execution(eid, {}, {
+            'output': [output_artifact],
+            'other_output': [standard_artifacts.Examples()]
+        })
+        output_ids.append(output_artifact.id)
+      # Executions which are not complete are ignored.
+      m.register_execution(
+          exec_properties={},
+          pipeline_info=self._pipeline_info,
+          component_info=self._component_info)
+
+      # Outputs of other runs of the same pipeline are included, outputs of
+      # other pipelines and components are not.
+      self.assertEqual(output_ids[:2], [
+          artifact.id for artifact in m.get_previous_output_artifacts(
+              'output', self._pipeline_info, self._component_info)
+      ])
+
   def testGetCachedExecutionIds(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
       mock_store = mock.Mock()
-      mock_store.get_events_by_execution_ids.side_effect = [
-          [
-              metadata_store_pb2.Event(
-                  artifact_id=1, type=metadata_store_pb2.Event.INPUT)
-          ],
-          [
-              metadata_store_pb2.Event(
-                  artifact_id=1, type=metadata_store_pb2.Event.INPUT),
-              metadata_store_pb2.Event(
-                  artifact_id=2, type=metadata_store_pb2.Event.INPUT),
-              metadata_store_pb2.Event(
-                  artifact_id=3, type=metadata_store_pb2.Event.INPUT)
-          ],
-          [
-              metadata_store_pb2.Event(
-                  artifact_id=1, type=metadata_store_pb2.Event.INPUT),
-              metadata_store_pb2.Event(
-                  artifact_id=2, type=metadata_store_pb2.Event.INPUT),
-          ],
-      ]
+      mock_store.get_events_by_execution_ids.side_effect = [[
+          metadata_store_pb2.Event(
+              execution_id=3,
+              artifact_id=1,
+              type=metadata_store_pb2.Event.INPUT),
+          metadata_store_pb2.Event(
+              execution_id=2,
+              artifact_id=1,
+              type=metadata_store_pb2.Event.INPUT),
+          metadata_store_pb2.Event(
+              execution_id=2,
+              artifact_id=2,
+              type=metadata_store_pb2.Event.INPUT),
+          metadata_store_pb2.Event(
+              execution_id=2,
+              artifact_id=3,
+              type=metadata_store_pb2.Event.INPUT),
+          metadata_store_pb2.Event(
+              execution_id=1,
+              artifact_id=1,
+              type=metadata_store_pb2.Event.INPUT),
+          metadata_store_pb2.Event(
+              execution_id=1,
+              artifact_id=2,
+              type=metadata_store_pb2.Event.INPUT),
+          metadata_store_pb2.Event(
+              execution_id=1,
+              artifact_id=3,
+              type=metadata_store_pb2.Event.OUTPUT),
+      ]]
       m._store = mock_store
 
       input_one = standard_artifacts.Examples()
@@ -322,6 +420,8 @@ class MetadataTest(tf.test.TestCase):
       }
 
       self.assertEqual(1, m._get_cached_execution_id(input_dict, [3, 2, 1]))
+      # All candidates are resolved with a single events query.
+      mock_store.get_events_by_execution_ids.assert_called_once_with([3, 2, 1])
 
   def testSearchArtifacts(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
@@ -344,6 +444,26 @@ class MetadataTest(tf.test.TestCase):
           producer_component_id=self._component_info.component_id)
       self.assertEqual(artifact.uri, output_artifact.uri)
 
+  def testSearchArtifactsInRunContext(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      context_id = m.register_run_context_if_not_exists(self._pipeline_info)
+      eid = m.register_execution(
+          exec_properties={},
+          pipeline_info=self._pipeline_info,
+          component_info=self._component_info,
+          run_context_id=context_id)
+      output_artifact = types.Artifact(type_name='MyOutputArtifact')
+      output_artifact.uri = 'my/uri'
+      m.publish_execution(eid, {}, {'output': [output_artifact]})
+      with mock.patch.object(m.store, 'get_executions') as mock_get_executions:
+        [artifact] = m.search_artifacts(
+            artifact_name='output',
+            pipeline_name=self._pipeline_info.pipeline_name,
+            run_id=self._pipeline_info.run_id,
+            producer_component_id=self._component_info.component_id)
+        mock_get_executions.assert_not_called()
+      self.assertEqual(artifact.uri, output_artifact.uri)
+
   def testPublishSkippedExecution(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
       exec_properties = {'log_root': 'path'}
@@ -444,6 +564,85 @@ class MetadataTest(tf.test.TestCase):
       self.assertEqual(cid3, m._get_run_context_id(self._pipeline_info3))
       self.assertEqual(None, m._get_run_context_id(self._pipeline_info4))
 
+  def testContextIdMemo(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      cid1 = m.register_run_context_if_not_exists(self._pipeline_info)
+      cid2 = m.register_run_context_if_not_exists(self._pipeline_info2)
+
+      # Without memo, run contexts are scanned once and later lookups are
+      # served from the memo.
+      m._run_context_ids.clear()
+      with mock.patch.object(
+          m.store, 'get_contexts_by_type',
+          wraps=m.store.get_contexts_by_type) as mock_get_contexts_by_type:
+        self.assertEqual(cid1, m._get_run_context_id(self._pipeline_info))
+        self.assertEqual(cid2, m._get_run_context_id(self._pipeline_info2))
+        self.assertEqual(
+            cid1, m.register_run_context_if_not_exists(self._pipeline_info))
+        self.assertEqual(1, mock_get_contexts_by_type.call_count)
+
+  def testContextIdMemoAcrossHandles(self):
+    connection_config = metadata.sqlite_metadata_connection_config(
+        os.path.join(self.get_temp_dir(), self._testMethodName, 'metadata.db'))
+    with metadata.Metadata(connection_config) as m:
+      context_id = m.register_run_context_if_not_exists(self._pipeline_info)
+
+    # A new handle, e.g. of the next component's driver, is served from the
+    # process-level memo without registering or scanning contexts.
+    with metadata.Metadata(connection_config) as m:
+      with mock.patch.object(
+          m.store, 'get_contexts_by_type',
+          wraps=m.store.get_contexts_by_type) as mock_get_contexts_by_type:
+        with mock.patch.object(
+            m.store, 'put_contexts',
+            wraps=m.store.put_contexts) as mock_put_contexts:
+          self.assertEqual(
+              context_id,
+              m.register_run_context_if_not_exists(self._pipeline_info))
+          mock_get_contexts_by_type.assert_not_called()
+          mock_put_contexts.assert_not_called()
+
+  def testContextIdMemoWithRecreatedStore(self):
+    db_path = os.path.join(self.get_temp_dir(), self._testMethodName,
+                           'metadata.db')
+    connection_config = metadata.sqlite_metadata_connection_config(db_path)
+    with metadata.Metadata(connection_config) as m:
+      m.register_run_context_if_not_exists(self._pipeline_info)
+
+    # The store is recreated, and the id of the memoized context is taken by
+    # another context.
+    tf.io.gfile.remove(db_path)
+    with metadata.Metadata(connection_config) as m:
+      other_context_id = m.register_run_context_if_not_exists(
+          self._pipeline_info2)
+      context_id = m.register_run_context_if_not_exists(self._pipeline_info)
+      self.assertNotEqual(other_context_id, context_id)
+      [context] = m.store.get_contexts_by_id([context_id])
+      self.assertEqual(self._pipeline_info.run_context_name, context.name)
+      self.assertEqual(context_id, m._get_run_context_id(self._pipeline_info))
+
+  def testMetadataStorePool(self):
+    connection_config = metadata.sqlite_metadata_connection_config(
+        os.path.join(self.get_temp_dir(), self._testMethodName, 'metadata.db'))
+    pool = metadata.MetadataStorePool(max_size=2)
+    with metadata.Metadata(connection_config, pool=pool) as m:
+      first_store = m.store
+      context_id = m.register_run_context_if_not_exists(self._pipeline_info)
+    with metadata.Metadata(connection_config, pool=pool) as m:
+      self.assertIs(first_store, m.store)
+      self.assertEqual(context_id, m._get_run_context_id(self._pipeline_info))
+    stats = pool.stats()
+    self.assertEqual(2, stats['acquired'])
+    self.assertEqual(1, stats['created'])
+    self.assertEqual(1, stats['reused'])
+    self.assertEqual(0, stats['discarded'])
+
+  def testMetadataStorePoolSkipsInMemory(self):
+    pool = metadata.MetadataStorePool()
+    with metadata.Metadata(self._connection_config, pool=pool):
+      pass
+    self.assertEqual(0, pool.stats()['acquired'])
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -24,6 +24,17 @@ from typing import Dict, List, Text
 
 from tfx.types.artifact import Artifact
 
+# Custom property of Examples artifacts holding the compression of their
+# TFRecord files, the name of an example_gen_pb2.Output.Compression value.
+# Examples without it are GZIP compressed.
+COMPRESSION_PROPERTY_NAME = 'compression'
+# TFRecord compression type, as accepted by tf.data.TFRecordDataset, of each
+# compression.
+_TFRECORD_COMPRESSION_TYPES = {
+    'GZIP': 'GZIP',
+    'UNCOMPRESSED': '',
+    'ZLIB': 'ZLIB',
+}
 
 # TODO(ruoyu): Deprecate this function since it is no longer needed.
 def parse_artifact_dict(json_str: Text) -> Dict[Text, List[Artifact]]:
@@ -109,3 +120,74 @@ def get_split_uri(artifact_list: List[Artifact], split: Text) -> Text:
     ValueError: If number with matching split in artifact_list is not one.
   """
   return _get_split_instance(artifact_list, split).uri
+
+
+def _get_split_instances(artifact_list: List[Artifact],
+                         split: Text) -> List[Artifact]:
+  """Get all instances of Artifact with matching split from given list.
+
+  Args:
+    artifact_list: A list of Artifact objects.
+    split: Name of split.
+
+  Returns:
+    The Artifact objects in artifact_list with matching split.
+
+  Raises:
+    ValueError: If no Artifact in artifact_list matches split.
+  """
+  matched = [x for x in artifact_list if x.split == split]
+  if not matched:
+    raise ValueError('0 elements matches split {}'.format(split))
+  return matched
+
+
+def get_split_uris(artifact_list: List[Artifact], split: Text) -> List[Text]:
+  """Get the uris of all Artifacts with matching split from given list.
+
+  A split has an Artifact for each span when produced by an ExampleGen with a
+  range config, see example_gen_pb2.RangeConfig.
+
+  Args:
+    artifact_list: A list of Artifact objects.
+    split: Name of split.
+
+  Returns:
+    The uris of Artifact objects in artifact_list with matching split.
+
+  Raises:
+    ValueError: If no Artifact in artifact_list matches split.
+  """
+  return [x.uri for x in _get_split_instances(artifact_list, split)]
+
+
+def get_split_compression_type(artifact_list: List[Artifact],
+                               split: Text) -> Text:
+  """Get the TFRecord compression type of Artifacts with matching split.
+
+  Args:
+    artifact_list: A list of Examples Artifact objects, possibly with an
+      Artifact for each span of a split.
+    split: Name of split.
+
+  Returns:
+    The compression type of TFRecord files of the Artifact objects in
+    artifact_list with matching split, one of 'GZIP', 'ZLIB' and '' for
+    uncompressed files, as accepted by tf.data.TFRecordDataset.
+
+  Raises:
+    ValueError: If no Artifact in artifact_list matches split, or Artifacts
+      with matching split have different compression types.
+  """
+  compression_types = set()
+  for artifact in _get_split_instances(artifact_list, split):
+    if COMPRESSION_PROPERTY_NAME not in artifact.artifact.custom_properties:
+      compression_types.add(_TFRECORD_COMPRESSION_TYPES['GZIP'])
+    else:
+      compression_types.add(_TFRECORD_COMPRESSION_TYPES[
+          artifact.artifact.custom_properties[COMPRESSION_PROPERTY_NAME]
+          .string_value])
+  if len(compression_types) != 1:
+    raise ValueError('Split {} has different compression types {}'.format(
+        split, sorted(compression_types)))
+  return compression_types.pop()
@@ -66,6 +66,38 @@ class ArtifactUtilsTest(tf.test.TestCase):
     self.assertEqual('/tmp/eval',
                      artifact_utils.get_split_uri(split_list, 'eval'))
 
+  def testGetSplitCompressionType(self):
+    split_list = [
+        artifact.Artifact('MyTypeName', split=split)
+        for split in ['train', 'eval']
+    ]
+    # Examples without compression property are GZIP compressed.
+    self.assertEqual(
+        'GZIP', artifact_utils.get_split_compression_type(split_list, 'train'))
+    split_list[1].set_string_custom_property(
+        artifact_utils.COMPRESSION_PROPERTY_NAME, 'UNCOMPRESSED')
+    self.assertEqual(
+        '', artifact_utils.get_split_compression_type(split_list, 'eval'))
+
+    # All spans of a split must have the same compression.
+    split_list.append(artifact.Artifact('MyTypeName', split='eval'))
+    with self.assertRaises(ValueError):
+      artifact_utils.get_split_compression_type(split_list, 'eval')
+
+  def testGetSplitUris(self):
+    split_list = []
+    for split, span in [('train', 1), ('eval', 1), ('train', 2)]:
+      instance = artifact.Artifact('MyTypeName', split=split)
+      instance.uri = '/tmp/{}/{}'.format(span, split)
+      split_list.append(instance)
+
+    self.assertEqual(['/tmp/1/train', '/tmp/2/train'],
+                     artifact_utils.get_split_uris(split_list, 'train'))
+    self.assertEqual(['/tmp/1/eval'],
+                     artifact_utils.get_split_uris(split_list, 'eval'))
+    with self.assertRaises(ValueError):
+      artifact_utils.get_split_uris(split_list, 'test')
+
 
 if __name__ == '__main__':
   tf.test.main()
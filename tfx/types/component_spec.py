@@ -172,6 +172,8 @@ class ComponentSpec(with_metaclass(abc.ABCMeta, json_utils.Jsonable)):
       value = self._raw_args[arg_name]
       inputs[arg_name] = value
     for arg_name, arg in self.OUTPUTS.items():
+      if arg.optional and not self._raw_args.get(arg_name):
+        continue
       value = self._raw_args[arg_name]
       outputs[arg_name] = value
 
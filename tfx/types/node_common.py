@@ -41,6 +41,11 @@ class _PropertyDictWrapper(json_utils.Jsonable):
   def __getitem__(self, key):
     if key in self._compat_aliases:
       key = self._compat_aliases[key]
+    if key not in self._data:
+      # Optional channels, e.g. outputs a component is configured not to
+      # produce, are absent.
+      raise KeyError('{} is not available, available keys are: {}.'.format(
+          key, sorted(self._data)))
     return self._data[key]
 
   def __getattr__(self, key):
@@ -57,5 +57,9 @@ class Schema(artifact.Artifact):
   TYPE_NAME = 'SchemaPath'
 
 
+class TransformCache(artifact.Artifact):
+  TYPE_NAME = 'TransformCachePath'
+
+
 class TransformGraph(artifact.Artifact):
   TYPE_NAME = 'TransformPath'
@@ -22,6 +22,7 @@ from typing import Any, Dict, Text
 from tfx.proto import evaluator_pb2
 from tfx.proto import example_gen_pb2
 from tfx.proto import pusher_pb2
+from tfx.proto import statistics_gen_pb2
 from tfx.proto import trainer_pb2
 from tfx.types import standard_artifacts
 from tfx.types.component_spec import ChannelParameter
@@ -185,7 +186,13 @@ class SchemaGenSpec(ComponentSpec):
 class StatisticsGenSpec(ComponentSpec):
   """StatisticsGen component spec."""
 
-  PARAMETERS = {}
+  PARAMETERS = {
+      'stats_options':
+          ExecutionParameter(
+              type=statistics_gen_pb2.StatsOptions, optional=True),
+      'single_pass': ExecutionParameter(type=bool, optional=True),
+      'incremental': ExecutionParameter(type=bool, optional=True),
+  }
   INPUTS = {
       # TODO(b/139281215): this will be renamed to 'examples' in the future.
       'input_data': ChannelParameter(type=standard_artifacts.Examples),
@@ -243,17 +250,26 @@ class TransformSpec(ComponentSpec):
   PARAMETERS = {
       'module_file': ExecutionParameter(type=(str, Text), optional=True),
       'preprocessing_fn': ExecutionParameter(type=(str, Text), optional=True),
+      'analyzer_cache': ExecutionParameter(type=bool, optional=True),
+      'mode': ExecutionParameter(type=(str, Text), optional=True),
+      'materialize': ExecutionParameter(type=bool, optional=True),
   }
   INPUTS = {
       # TODO(b/139281215): this will be renamed to 'examples' in the future.
       'input_data': ChannelParameter(type=standard_artifacts.Examples),
       'schema': ChannelParameter(type=standard_artifacts.Schema),
+      'input_transform_graph':
+          ChannelParameter(
+              type=standard_artifacts.TransformGraph, optional=True),
   }
   OUTPUTS = {
       'transform_output':
           ChannelParameter(type=standard_artifacts.TransformGraph),
       'transformed_examples':
-          ChannelParameter(type=standard_artifacts.Examples),
+          ChannelParameter(type=standard_artifacts.Examples, optional=True),
+      'cache_output_path':
+          ChannelParameter(
+              type=standard_artifacts.TransformCache, optional=True),
   }
   # TODO(b/139281215): these input / output names will be renamed in the future.
   # These compatibility aliases are provided for forwards compatibility.
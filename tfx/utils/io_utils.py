@@ -16,9 +16,13 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from concurrent import futures
+import hashlib
+import json
 import os
+import uuid
 import tensorflow as tf
-from typing import List, Text
+from typing import Any, Dict, List, Optional, Text, Tuple
 
 from google.protobuf import text_format
 from google.protobuf.message import Message
@@ -29,6 +33,12 @@ from tensorflow_metadata.proto.v0 import schema_pb2
 # Nano seconds per second.
 NANO_PER_SEC = 1000 * 1000 * 1000
 
+# Default number of threads used for parallel file system operations.
+_DEFAULT_MAX_WORKERS = 16
+
+# Bytes read at a time when computing content digest of a file.
+_READ_CHUNK_BYTES = 8 * 1024 * 1024
+
 # If path starts with one of those, consider files are in remote filesystem.
 _REMOTE_FS_PREFIX = ['gs://', 'hdfs://', 's3://']
 
@@ -53,21 +63,103 @@ def copy_file(src: Text, dst: Text, overwrite: bool = False):
   tf.gfile.Copy(src, dst, overwrite=overwrite)
 
 
-def copy_dir(src: Text, dst: Text) -> None:
-  """Copies the whole directory recursively from source to destination."""
-
-  if tf.gfile.Exists(dst):
-    tf.gfile.DeleteRecursively(dst)
+def _list_dir_recursively(path: Text) -> Tuple[List[Text], List[Text]]:
+  """Lists relative paths of all sub directories and files under a path."""
+  dirs = []
+  files = []
+  for dir_name, sub_dirs, leaf_files in tf.io.gfile.walk(path):
+    relative_dir = os.path.relpath(dir_name, path)
+    dirs.extend(os.path.join(relative_dir, d) for d in sub_dirs)
+    files.extend(os.path.join(relative_dir, f) for f in leaf_files)
+  return ([os.path.normpath(d) for d in dirs],
+          [os.path.normpath(f) for f in files])
+
+
+def _is_local(path: Text) -> bool:
+  return '://' not in path
+
+
+def _copy_file(src: Text, dst: Text, hard_link: bool = False) -> None:
+  """Copies a file, hard linking it instead if asked and both are local."""
+  if hard_link and _is_local(src) and _is_local(dst):
+    try:
+      if os.path.lexists(dst):
+        os.remove(dst)
+      os.link(src, dst)
+      return
+    except OSError:
+      # E.g. across file systems, fall back to copy.
+      pass
+  tf.io.gfile.copy(src, dst, overwrite=True)
+
+
+def _is_same_file(src: Text, dst: Text) -> bool:
+  """Returns whether two files of the same size have the same content."""
+  if _is_local(src) and _is_local(dst) and os.path.samefile(src, dst):
+    return True
+  return _content_digest(src) == _content_digest(dst)
+
+
+def copy_dir(src: Text,
+             dst: Text,
+             max_workers: int = _DEFAULT_MAX_WORKERS,
+             sync: bool = False,
+             hard_link: bool = False) -> None:
+  """Copies the whole directory recursively from source to destination.
+
+  Files are copied on a thread pool. By default the destination is deleted
+  first, so that it ends up with exactly the files of the source.
+
+  Args:
+    src: source directory.
+    dst: destination directory.
+    max_workers: maximum number of files copied at the same time.
+    sync: if true, the destination is updated in place instead: files with the
+      same content in source and destination are not copied again, and files
+      not in source are deleted.
+    hard_link: if true, local files are hard linked instead of copied if
+      possible, so source files must not be modified in place afterwards.
+  """
+  src_dirs, src_files = _list_dir_recursively(src)
+  dst_files = set()
+  if sync and tf.io.gfile.isdir(dst):
+    dst_files = set(_list_dir_recursively(dst)[1])
+    for stale_file in dst_files.difference(src_files):
+      tf.io.gfile.remove(os.path.join(dst, stale_file))
+  elif tf.io.gfile.exists(dst):
+    tf.io.gfile.rmtree(dst)
   tf.io.gfile.makedirs(dst)
-
-  for dir_name, sub_dirs, leaf_files in tf.gfile.Walk(src):
-    for leaf_file in leaf_files:
-      leaf_file_path = os.path.join(dir_name, leaf_file)
-      new_file_path = os.path.join(dir_name.replace(src, dst, 1), leaf_file)
-      tf.gfile.Copy(leaf_file_path, new_file_path)
-
-    for sub_dir in sub_dirs:
-      tf.io.gfile.makedirs(os.path.join(dst, sub_dir))
+  for src_dir in src_dirs:
+    tf.io.gfile.makedirs(os.path.join(dst, src_dir))
+
+  existing_files = [f for f in src_files if f in dst_files]
+  src_stats = _stat_files([os.path.join(src, f) for f in existing_files],
+                          max_workers)
+  dst_stats = _stat_files([os.path.join(dst, f) for f in existing_files],
+                          max_workers)
+  same_size_files = [
+      f for f, src_stat, dst_stat in zip(existing_files, src_stats, dst_stats)
+      if src_stat.length == dst_stat.length
+  ]
+
+  def _is_identical(relative_path: Text) -> bool:
+    return _is_same_file(
+        os.path.join(src, relative_path), os.path.join(dst, relative_path))
+
+  def _copy(relative_path: Text) -> None:
+    _copy_file(
+        os.path.join(src, relative_path), os.path.join(dst, relative_path),
+        hard_link)
+
+  with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    identical_files = set(
+        f for f, identical in zip(
+            same_size_files, executor.map(_is_identical, same_size_files))
+        if identical)
+    # Consumes the results so that errors are raised.
+    list(
+        executor.map(_copy,
+                     [f for f in src_files if f not in identical_files]))
 
 
 def get_only_uri_in_dir(dir_path: Text) -> Text:
@@ -127,7 +219,18 @@ def all_files_pattern(file_pattern: Text) -> Text:
   return '{}*'.format(file_pattern)
 
 
-def generate_fingerprint(split_name: Text, file_pattern: Text) -> Text:
+def _stat_files(file_paths: List[Text],
+                max_workers: int = _DEFAULT_MAX_WORKERS) -> List[Any]:
+  """Stats files on a thread pool, results are in the order of file_paths."""
+  if len(file_paths) <= 1:
+    return [tf.io.gfile.stat(f) for f in file_paths]
+  with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    return list(executor.map(tf.io.gfile.stat, file_paths))
+
+
+def generate_fingerprint(split_name: Text,
+                         file_pattern: Text,
+                         max_workers: int = _DEFAULT_MAX_WORKERS) -> Text:
   """Generates a fingerprint for all files that match the pattern."""
   files = tf.io.gfile.glob(file_pattern)
   total_bytes = 0
@@ -136,8 +239,7 @@ def generate_fingerprint(split_name: Text, file_pattern: Text) -> Text:
   # independent.
   xor_checksum = 0
   sum_checksum = 0
-  for f in files:
-    stat = tf.io.gfile.stat(f)
+  for stat in _stat_files(files, max_workers):
     total_bytes += stat.length
     # Take mtime only up to second-granularity.
     mtime = int(stat.mtime_nsec / NANO_PER_SEC)
@@ -148,6 +250,87 @@ def generate_fingerprint(split_name: Text, file_pattern: Text) -> Text:
       split_name, len(files), total_bytes, xor_checksum, sum_checksum)
 
 
+def _content_digest(file_path: Text) -> Text:
+  """Computes the sha256 digest of the content of a file."""
+  digest = hashlib.sha256()
+  with tf.io.gfile.GFile(file_path, 'rb') as f:
+    while True:
+      chunk = f.read(_READ_CHUNK_BYTES)
+      if not chunk:
+        break
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+def _read_digest_cache(cache_file: Text) -> Dict[Text, List[Any]]:
+  """Reads path -> [size, mtime_nsec, digest] entries, empty if missing."""
+  if not tf.io.gfile.exists(cache_file):
+    return {}
+  try:
+    return json.loads(file_io.read_file_to_string(cache_file))
+  except ValueError:
+    tf.logging.warning('Ignoring corrupted digest cache %s.', cache_file)
+    return {}
+
+
+def _write_digest_cache(cache_file: Text,
+                        entries: Dict[Text, List[Any]]) -> None:
+  """Atomically replaces the digest cache with given entries."""
+  tmp_file = '%s.tmp-%s' % (cache_file, uuid.uuid4().hex)
+  write_string_file(tmp_file, json.dumps(entries, sort_keys=True))
+  tf.io.gfile.rename(tmp_file, cache_file, overwrite=True)
+
+
+def generate_content_fingerprint(
+    split_name: Text,
+    file_pattern: Text,
+    digest_cache_file: Optional[Text] = None,
+    max_workers: int = _DEFAULT_MAX_WORKERS) -> Text:
+  """Generates a fingerprint from the content of files that match the pattern.
+
+  Unlike generate_fingerprint, the fingerprint only changes when the content of
+  the files changes. Files are read in parallel. If digest_cache_file is given,
+  digests are kept there keyed by path, size and mtime, so that files which are
+  unchanged since a previous call are not read again. The cache only holds the
+  files currently matching the pattern, so entries of deleted or renamed files
+  are dropped.
+
+  Args:
+    split_name: name of the split.
+    file_pattern: glob pattern of the files.
+    digest_cache_file: optional path of the file caching digests, dedicated to
+      the pattern.
+    max_workers: maximum number of files read at the same time.
+
+  Returns:
+    The fingerprint.
+  """
+  files = tf.io.gfile.glob(file_pattern)
+  cached_entries = (
+      _read_digest_cache(digest_cache_file) if digest_cache_file else {})
+
+  def _get_entry(file_path: Text) -> List[Any]:
+    stat = tf.io.gfile.stat(file_path)
+    entry = cached_entries.get(file_path)
+    if entry and entry[0] == stat.length and entry[1] == stat.mtime_nsec:
+      return entry
+    return [stat.length, stat.mtime_nsec, _content_digest(file_path)]
+
+  with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    entries = dict(zip(files, executor.map(_get_entry, files)))
+
+  if digest_cache_file and entries != cached_entries:
+    _write_digest_cache(digest_cache_file, entries)
+
+  total_bytes = sum(entry[0] for entry in entries.values())
+  # Digests are sorted so that the fingerprint is order-independent.
+  content_digest = hashlib.sha256(
+      tf.compat.as_bytes('\n'.join(
+          sorted(entry[2] for entry in entries.values())))).hexdigest()
+  return 'split:%s,num_files:%d,total_bytes:%d,content_sha256:%s' % (
+      split_name, len(files), total_bytes, content_digest)
+
+
 class SchemaReader(object):
   """Schema reader."""
 
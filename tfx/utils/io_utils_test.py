@@ -17,6 +17,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import json
 import os
 # Standard Imports
 import mock
@@ -68,6 +69,52 @@ class IoUtilsTest(tf.test.TestCase):
     self.assertEqual('testing', f.read())
     self.assertEqual(7, f.tell())
 
+  def testCopyDirSync(self):
+    src = os.path.join(self._base_dir, 'src')
+    dst = os.path.join(self._base_dir, 'dst')
+    io_utils.write_string_file(os.path.join(src, 'file'), 'testing')
+    io_utils.write_string_file(os.path.join(src, 'sub', 'file'), 'sub')
+    tf.io.gfile.makedirs(os.path.join(src, 'empty'))
+    io_utils.write_string_file(os.path.join(dst, 'stale'), 'stale')
+
+    io_utils.copy_dir(src, dst, sync=True)
+    self.assertCountEqual(['file', 'sub', 'empty'], tf.io.gfile.listdir(dst))
+    self.assertEqual('sub',
+                     file_io.read_file_to_string(os.path.join(dst, 'sub',
+                                                              'file')))
+
+    # Identical files are not copied again.
+    with mock.patch.object(io_utils, '_copy_file') as mock_copy_file:
+      io_utils.copy_dir(src, dst, sync=True)
+      mock_copy_file.assert_not_called()
+
+    # Files of the same size with a different content are copied.
+    io_utils.write_string_file(os.path.join(dst, 'file'), 'TESTING')
+    io_utils.copy_dir(src, dst, sync=True)
+    self.assertEqual('testing',
+                     file_io.read_file_to_string(os.path.join(dst, 'file')))
+
+  def testCopyDirReplacesDestination(self):
+    src = os.path.join(self._base_dir, 'src')
+    dst = os.path.join(self._base_dir, 'dst')
+    io_utils.write_string_file(os.path.join(src, 'file'), 'testing')
+    io_utils.write_string_file(os.path.join(dst, 'stale'), 'stale')
+    io_utils.copy_dir(src, dst)
+    self.assertEqual(['file'], tf.io.gfile.listdir(dst))
+    # Files are copied, not hard linked, by default.
+    self.assertNotEqual(
+        os.stat(os.path.join(src, 'file')).st_ino,
+        os.stat(os.path.join(dst, 'file')).st_ino)
+
+  def testCopyDirHardLinksLocalFiles(self):
+    src = os.path.join(self._base_dir, 'src')
+    dst = os.path.join(self._base_dir, 'dst')
+    io_utils.write_string_file(os.path.join(src, 'file'), 'testing')
+    io_utils.copy_dir(src, dst, hard_link=True)
+    self.assertEqual(
+        os.stat(os.path.join(src, 'file')).st_ino,
+        os.stat(os.path.join(dst, 'file')).st_ino)
+
   def testGetOnlyFileInDir(self):
     file_path = os.path.join(self._base_dir, 'file', 'path')
     io_utils.write_string_file(file_path, 'testing')
@@ -111,6 +158,43 @@ class IoUtilsTest(tf.test.TestCase):
         'split:split,num_files:2,total_bytes:15,xor_checksum:2,sum_checksum:4',
         fingerprint)
 
+  def testGeneratesContentFingerprint(self):
+    d1_path = os.path.join(self._base_dir, 'fp', 'data1')
+    io_utils.write_string_file(d1_path, 'testing')
+    d2_path = os.path.join(self._base_dir, 'fp', 'data2')
+    io_utils.write_string_file(d2_path, 'testing2')
+    pattern = os.path.join(self._base_dir, 'fp', '*')
+    cache_file = os.path.join(self._base_dir, 'cache', 'digests.json')
+    fingerprint = io_utils.generate_content_fingerprint(
+        'split', pattern, cache_file)
+    self.assertStartsWith(fingerprint,
+                          'split:split,num_files:2,total_bytes:15,')
+    self.assertTrue(tf.gfile.Exists(cache_file))
+
+    # Touching files does not change the fingerprint.
+    os.utime(d1_path, (0, 1))
+    self.assertEqual(
+        fingerprint,
+        io_utils.generate_content_fingerprint('split', pattern, cache_file))
+
+    # Unchanged files are served from the cache without being read.
+    with mock.patch.object(io_utils, '_content_digest') as mock_digest:
+      self.assertEqual(
+          fingerprint,
+          io_utils.generate_content_fingerprint('split', pattern, cache_file))
+      mock_digest.assert_not_called()
+
+    io_utils.write_string_file(d2_path, 'testing3')
+    self.assertNotEqual(
+        fingerprint,
+        io_utils.generate_content_fingerprint('split', pattern, cache_file))
+
+    # Entries of deleted files are pruned from the cache.
+    tf.gfile.Remove(d2_path)
+    io_utils.generate_content_fingerprint('split', pattern, cache_file)
+    self.assertEqual([d1_path],
+                     list(json.loads(file_io.read_file_to_string(cache_file))))
+
 
 if __name__ == '__main__':
   tf.test.main()
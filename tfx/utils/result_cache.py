@@ -0,0 +1,237 @@
+# Copyright 2019 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Content addressed cache of executor results.
+
+An executor whose outputs are a pure function of the content of its input
+artifacts and its execution properties can look up its outputs by a digest of
+those, and copy them from the cache instead of computing them again.
+
+The cache is a directory with an entry for each key, holding the files of each
+output artifact, their size and the time the entry was last used. The total
+size of entries is tracked in the cache directory, and once it exceeds the size
+bound, least recently used entries are evicted.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import hashlib
+import json
+import os
+import time
+import uuid
+
+import tensorflow as tf
+from typing import Any, Dict, List, Text, Tuple
+from tfx import types
+
+# Default bound of the total size of cache entries.
+_DEFAULT_MAX_SIZE_BYTES = 1 << 30
+# File of an entry holding the time it was last used. An entry is complete
+# once this file exists.
+_LAST_USED_FILE_NAME = '_last_used'
+# File of an entry holding the total size of its files.
+_SIZE_FILE_NAME = '_size'
+# File of the cache directory holding the total size of entries, updated when
+# saving entries and recomputed when evicting.
+_TOTAL_SIZE_FILE_NAME = '_total_size'
+# Size of chunks files are read by when computing digests.
+_READ_CHUNK_SIZE = 1 << 20
+
+
+def _list_files(uri: Text) -> List[Tuple[Text, Text]]:
+  """Lists (relative path, path) of all files under a uri, sorted."""
+  if not tf.io.gfile.isdir(uri):
+    return [('', uri)] if tf.io.gfile.exists(uri) else []
+  files = []
+  for dir_name, _, leaf_files in tf.io.gfile.walk(uri):
+    for leaf_file in leaf_files:
+      path = os.path.join(dir_name, leaf_file)
+      files.append((os.path.relpath(path, uri), path))
+  return sorted(files)
+
+
+def _copy_files(src: Text, dst: Text) -> int:
+  """Copies all files under src to dst, overwriting existing files.
+
+  Args:
+    src: file or directory to copy.
+    dst: destination of the copy.
+
+  Returns:
+    Total size of the files copied.
+  """
+  size = 0
+  for relative_path, path in _list_files(src):
+    new_path = os.path.join(dst, relative_path)
+    tf.io.gfile.makedirs(os.path.dirname(new_path))
+    tf.io.gfile.copy(path, new_path, overwrite=True)
+    size += tf.io.gfile.stat(new_path).length
+  return size
+
+
+def _read_number(path: Text) -> float:
+  """Reads a number written to a file, 0 if the file does not exist."""
+  if not tf.io.gfile.exists(path):
+    return 0
+  with tf.io.gfile.GFile(path) as f:
+    return float(f.read() or 0)
+
+
+def _write_number(path: Text, value: float) -> None:
+  with tf.io.gfile.GFile(path, 'w') as f:
+    f.write(repr(value))
+
+
+class ResultCache(object):
+  """Content addressed cache of executor outputs with bounded size."""
+
+  def __init__(self, cache_dir: Text,
+               max_size_bytes: int = _DEFAULT_MAX_SIZE_BYTES):
+    """Constructs a cache.
+
+    Args:
+      cache_dir: directory holding the cache entries, e.g. under the pipeline
+        root.
+      max_size_bytes: bound of the total size of cache entries.
+    """
+    self._cache_dir = cache_dir
+    self._max_size_bytes = max_size_bytes
+
+  def get_key(self, namespace: Text,
+              input_dict: Dict[Text, List[types.Artifact]],
+              exec_properties: Dict[Text, Any]) -> Text:
+    """Returns the digest of the content of inputs and execution properties.
+
+    Args:
+      namespace: identifies the computation, e.g. the executor class and the
+        version of libraries its results depend on.
+      input_dict: Input dict from input key to a list of Artifacts. Artifacts
+        are identified by their type, split and the content of their files,
+        not by their uri.
+      exec_properties: A dict of execution properties. Values which are not
+        JSON serializable are identified by their string form.
+
+    Returns:
+      Hex digest identifying the outputs.
+    """
+    digest = hashlib.sha256()
+    digest.update(tf.compat.as_bytes(namespace))
+    digest.update(
+        tf.compat.as_bytes(
+            json.dumps(exec_properties, sort_keys=True, default=str)))
+    for input_key in sorted(input_dict):
+      for artifact in input_dict[input_key] or []:
+        digest.update(
+            tf.compat.as_bytes('\0'.join(
+                [input_key, artifact.type_name, artifact.split])))
+        for relative_path, path in _list_files(artifact.uri):
+          digest.update(tf.compat.as_bytes('\0' + relative_path + '\0'))
+          with tf.io.gfile.GFile(path, 'rb') as f:
+            for chunk in iter(lambda f=f: f.read(_READ_CHUNK_SIZE), b''):
+              digest.update(chunk)
+    return digest.hexdigest()
+
+  def _get_entry_dir(self, key: Text) -> Text:
+    return os.path.join(self._cache_dir, key)
+
+  def _touch(self, entry_dir: Text) -> None:
+    _write_number(os.path.join(entry_dir, _LAST_USED_FILE_NAME), time.time())
+
+  def restore(self, key: Text,
+              output_dict: Dict[Text, List[types.Artifact]]) -> bool:
+    """Copies cached outputs of a key to output artifacts if any.
+
+    Args:
+      key: key of the outputs, see get_key.
+      output_dict: Output dict from output key to a list of Artifacts, with the
+        same keys and number of artifacts as the outputs saved.
+
+    Returns:
+      Whether the outputs are restored from the cache.
+    """
+    entry_dir = self._get_entry_dir(key)
+    if not tf.io.gfile.exists(os.path.join(entry_dir, _LAST_USED_FILE_NAME)):
+      return False
+    for output_key, artifacts in output_dict.items():
+      for index, artifact in enumerate(artifacts):
+        _copy_files(
+            os.path.join(entry_dir, output_key, str(index)), artifact.uri)
+    self._touch(entry_dir)
+    return True
+
+  def save(self, key: Text,
+           output_dict: Dict[Text, List[types.Artifact]]) -> None:
+    """Saves outputs of a key to the cache, evicting entries if needed.
+
+    Entries are only listed for eviction once the tracked total size exceeds
+    the size bound.
+
+    Args:
+      key: key of the outputs, see get_key.
+      output_dict: Output dict from output key to a list of Artifacts.
+    """
+    entry_dir = self._get_entry_dir(key)
+    if tf.io.gfile.exists(entry_dir):
+      return
+    # Outputs are written to a temporary entry first, so that concurrent
+    # executions never restore a partial entry.
+    tmp_entry_dir = '{}.tmp-{}'.format(entry_dir, uuid.uuid4().hex)
+    size = 0
+    for output_key, artifacts in output_dict.items():
+      for index, artifact in enumerate(artifacts):
+        size += _copy_files(artifact.uri,
+                            os.path.join(tmp_entry_dir, output_key, str(index)))
+    tf.io.gfile.makedirs(tmp_entry_dir)
+    _write_number(os.path.join(tmp_entry_dir, _SIZE_FILE_NAME), size)
+    self._touch(tmp_entry_dir)
+    try:
+      tf.io.gfile.rename(tmp_entry_dir, entry_dir)
+    except tf.errors.OpError:
+      # Saved by a concurrent execution.
+      tf.io.gfile.rmtree(tmp_entry_dir)
+      return
+    # Concurrent updates may lose sizes, which only delays eviction until the
+    # total is recomputed.
+    total_size_path = os.path.join(self._cache_dir, _TOTAL_SIZE_FILE_NAME)
+    total_size = _read_number(total_size_path) + size
+    if total_size > self._max_size_bytes:
+      total_size = self._evict()
+    _write_number(total_size_path, total_size)
+
+  def _evict(self) -> float:
+    """Evicts least recently used entries until the size bound is met.
+
+    Returns:
+      Total size of the remaining entries.
+    """
+    entries = []
+    total_size = 0
+    for name in tf.io.gfile.listdir(self._cache_dir):
+      entry_dir = os.path.join(self._cache_dir, name.rstrip('/'))
+      last_used_path = os.path.join(entry_dir, _LAST_USED_FILE_NAME)
+      if not tf.io.gfile.exists(last_used_path):
+        continue
+      last_used = _read_number(last_used_path)
+      size = _read_number(os.path.join(entry_dir, _SIZE_FILE_NAME))
+      entries.append((last_used, size, entry_dir))
+      total_size += size
+    for _, size, entry_dir in sorted(entries):
+      if total_size <= self._max_size_bytes:
+        break
+      tf.logging.info('Evicting cache entry {}.'.format(entry_dir))
+      tf.io.gfile.rmtree(entry_dir)
+      total_size -= size
+    return total_size
@@ -0,0 +1,131 @@
+# Copyright 2019 Google LLC. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tfx.utils.result_cache."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import mock
+import tensorflow as tf
+from tfx.types import standard_artifacts
+from tfx.utils import io_utils
+from tfx.utils import result_cache
+
+
+class ResultCacheTest(tf.test.TestCase):
+
+  def setUp(self):
+    super(ResultCacheTest, self).setUp()
+    self._base_dir = os.path.join(self.get_temp_dir(), self._testMethodName)
+    self._cache_dir = os.path.join(self._base_dir, 'cache')
+
+  def _create_stats(self, name, content):
+    stats = standard_artifacts.ExampleStatistics(split='train')
+    stats.uri = os.path.join(self._base_dir, name, '')
+    io_utils.write_string_file(
+        os.path.join(stats.uri, 'stats_tfrecord'), content)
+    return stats
+
+  def _create_schema(self, name):
+    schema = standard_artifacts.Schema()
+    schema.uri = os.path.join(self._base_dir, name, '')
+    return schema
+
+  def testGetKey(self):
+    cache = result_cache.ResultCache(self._cache_dir)
+    key = cache.get_key('ns', {'stats': [self._create_stats('a', 'x')]},
+                        {'p': 1})
+    # Artifacts with the same content at different uris have the same key.
+    self.assertEqual(
+        key,
+        cache.get_key('ns', {'stats': [self._create_stats('b', 'x')]},
+                      {'p': 1}))
+    self.assertNotEqual(
+        key,
+        cache.get_key('ns', {'stats': [self._create_stats('c', 'y')]},
+                      {'p': 1}))
+    self.assertNotEqual(
+        key,
+        cache.get_key('ns', {'stats': [self._create_stats('d', 'x')]},
+                      {'p': 2}))
+    self.assertNotEqual(
+        key,
+        cache.get_key('other', {'stats': [self._create_stats('e', 'x')]},
+                      {'p': 1}))
+
+  def testGetKeyWithUnserializableProperties(self):
+    cache = result_cache.ResultCache(self._cache_dir)
+    stats = self._create_stats('a', 'x')
+    key = cache.get_key('ns', {'stats': [stats]}, {'a': 1, 'b': object})
+    self.assertEqual(
+        key, cache.get_key('ns', {'stats': [stats]}, {'b': object, 'a': 1}))
+    self.assertNotEqual(
+        key, cache.get_key('ns', {'stats': [stats]}, {'a': 1, 'b': int}))
+
+  def testSaveAndRestore(self):
+    cache = result_cache.ResultCache(self._cache_dir)
+    key = cache.get_key('ns', {'stats': [self._create_stats('a', 'x')]}, {})
+    output = self._create_schema('output1')
+    self.assertFalse(cache.restore(key, {'output': [output]}))
+
+    io_utils.write_string_file(
+        os.path.join(output.uri, 'schema.pbtxt'), 'schema')
+    cache.save(key, {'output': [output]})
+
+    restored = self._create_schema('output2')
+    self.assertTrue(cache.restore(key, {'output': [restored]}))
+    self.assertEqual(
+        'schema',
+        tf.io.gfile.GFile(os.path.join(restored.uri, 'schema.pbtxt')).read())
+
+  def testEviction(self):
+    # Bound fits two entries of 100 bytes.
+    cache = result_cache.ResultCache(self._cache_dir, max_size_bytes=250)
+    keys = []
+    for name in ['a', 'b', 'c']:
+      key = cache.get_key('ns', {'stats': [self._create_stats(name, name)]},
+                          {})
+      output = self._create_schema('output_' + name)
+      io_utils.write_string_file(
+          os.path.join(output.uri, 'schema.pbtxt'), 'x' * 100)
+      cache.save(key, {'output': [output]})
+      keys.append(key)
+      # Using the first entry makes it the most recently used.
+      cache.restore(keys[0], {'output': [self._create_schema('restored')]})
+
+    self.assertTrue(
+        cache.restore(keys[0], {'output': [self._create_schema('restored')]}))
+    self.assertFalse(
+        cache.restore(keys[1], {'output': [self._create_schema('restored')]}))
+    self.assertTrue(
+        cache.restore(keys[2], {'output': [self._create_schema('restored')]}))
+
+  def testNoEvictionUnderSizeBound(self):
+    cache = result_cache.ResultCache(self._cache_dir, max_size_bytes=250)
+    for name in ['a', 'b']:
+      key = cache.get_key('ns', {'stats': [self._create_stats(name, name)]},
+                          {})
+      output = self._create_schema('output_' + name)
+      io_utils.write_string_file(
+          os.path.join(output.uri, 'schema.pbtxt'), 'x' * 100)
+      # Entries are not listed while the total size is under the bound.
+      with mock.patch.object(
+          cache, '_evict', side_effect=AssertionError('Entries are listed')):
+        cache.save(key, {'output': [output]})
+
+
+if __name__ == '__main__':
+  tf.test.main()